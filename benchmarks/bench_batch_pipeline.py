@@ -0,0 +1,69 @@
+"""
+Serial StockAnalyzer.stockBatch vs batch_pipeline.run_batch, fully offline.
+
+    python benchmarks/bench_batch_pipeline.py --tickers 40 --latency 0.3
+
+Uses FakeProvider with an artificial per-request latency and writes all
+output into a temporary directory.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stockinsight.batch_pipeline import run_batch
+from stockinsight.cli import get_third_friday
+from stockinsight.stock_analyzer import StockAnalyzer
+from fixtures import FakeProvider
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.3, help='seconds added to every fake request')
+    parser.add_argument('--start-date', default='2023-06-01')
+    parser.add_argument('--io-workers', type=int, default=8)
+    parser.add_argument('--cpu-workers', type=int, default=None)
+    parser.add_argument('--skip-serial', action='store_true')
+    args = parser.parse_args()
+
+    tickers = [f'SYN{i:03d}' for i in range(args.tickers)]
+    # download_option needs an expiry, like run_stockanalysis.py passes
+    expiry = get_third_friday()
+    provider = FakeProvider(latency=args.latency)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+
+        if not args.skip_serial:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                StockAnalyzer.stockBatch(tickers, args.start_date, expiry=expiry, provider=provider)
+            print(f"serial stockBatch: {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        results = run_batch(tickers, args.start_date, expiry=expiry, provider=provider,
+                            io_workers=args.io_workers, cpu_workers=args.cpu_workers)
+        print(f"run_batch:         {time.perf_counter() - start:.2f}s")
+
+    failed = [r for r in results if r.status != 'ok']
+    print(f"{len(results) - len(failed)} ok, {len(failed)} failed")
+    for result in failed:
+        print(f"  {result.ticker}: {result.failed_stage}: {result.error}")
+
+    # Mean latency of every stage across tickers
+    stages = {}
+    for result in results:
+        for stage, seconds in result.timings.items():
+            stages.setdefault(stage, []).append(seconds)
+    for stage, values in stages.items():
+        print(f"  {stage:<22} mean {sum(values) / len(values):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+BeautifulSoup (the original eco_calendar.py parsing loop) vs the lxml
+calendar_parser.parse_events on a large synthetic calendar page. That both
+give the same events is checked in tests/test_calendar_parser.py.
+
+    python benchmarks/bench_calendar_parser.py --rows 1000 10000
+    python benchmarks/bench_calendar_parser.py --page saved_calendar.html
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stockinsight.calendar_parser import parse_events
+from fixtures import parse_events_bs4, synthetic_page
+
+
+def timed(func, page):
+    start = time.perf_counter()
+    result = func(page)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000])
+    parser.add_argument('--page', help='saved calendar page to parse instead of synthetic ones')
+    args = parser.parse_args()
+
+    if args.page:
+        with open(args.page, encoding='utf-8') as f:
+            pages = [(args.page, f.read())]
+    else:
+        pages = [(f'{rows} rows', synthetic_page(rows)) for rows in args.rows]
+
+    for label, page in pages:
+        bs4_time, _ = timed(parse_events_bs4, page)
+        lxml_time, result = timed(parse_events, page)
+        print(f"{label:>14}: bs4 {bs4_time:.3f}s, lxml {lxml_time:.3f}s ({bs4_time / lxml_time:.1f}x), "
+              f"{len(result)} events")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Seconds per chart: the original plot_stock_data vs ChartRenderer presets.
+
+    python benchmarks/bench_charts.py --charts 5 --bars 300
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stockinsight.chart_renderer import PRESETS, ChartRenderer
+from stockinsight.stock_analyzer import StockAnalyzer
+from fixtures import synthetic_ohlcv
+
+
+def make_analyzer(ticker, bars, renderer=None):
+    analyzer = StockAnalyzer(ticker, '2000-01-01', renderer=renderer)
+    rng = np.random.default_rng(bars)
+    analyzer.stock_data = synthetic_ohlcv(pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=bars, name='Date'), rng)
+    analyzer.calculate_indicators()
+    return analyzer
+
+
+def per_chart(analyzers, renderer=None):
+    start = time.perf_counter()
+    for analyzer in analyzers:
+        analyzer.plot_stock_data(f'{analyzer.ticker}_plot')
+    if renderer is not None:
+        renderer.wait()
+    return (time.perf_counter() - start) / len(analyzers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--charts', type=int, default=5)
+    parser.add_argument('--bars', type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        tickers = [f'SYN{i:03d}' for i in range(args.charts)]
+
+        baseline = per_chart([make_analyzer(t, args.bars) for t in tickers])
+        print(f"{'plot_stock_data (original)':<32} {baseline:>8.3f} s/chart")
+
+        for preset in PRESETS:
+            for mode in ('sync', 'background'):
+                renderer = ChartRenderer(preset, mode=mode)
+                seconds = per_chart([make_analyzer(t, args.bars, renderer) for t in tickers], renderer)
+                print(f"{f'ChartRenderer {preset}/{mode}':<32} {seconds:>8.3f} s/chart  ({baseline / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
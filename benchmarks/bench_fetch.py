@@ -0,0 +1,101 @@
+"""
+The fetch layer against a local stub server that injects latency, 503s and
+429s: tickers lost by run_batch with and without retries (every path also
+fails its first --fail-first requests, so faults are certain), merging of
+duplicate in-flight requests, the token-bucket rate, and pooled vs fresh
+connections.
+
+    python benchmarks/bench_fetch.py --tickers 50 --error-rate 0.2 --latency 0.02
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stockinsight.batch_pipeline import run_batch
+from stockinsight.fetch import HttpProvider, ResilientProvider
+from fixtures import FakeProvider, StubServer
+
+EXPIRY = '2030-01-18'
+STAGES = ('download_data', 'download_option')
+
+
+def batch(args, tickers, retries):
+    # A fresh server per run, so both runs meet the same faults
+    with StubServer(FakeProvider(), latency=args.latency, error_rate=args.error_rate,
+                    throttle_rate=args.throttle_rate, fail_first=args.fail_first) as server:
+        return timed_batch(server, tickers, retries, args.workers)
+
+
+def timed_batch(server, tickers, retries, workers):
+    provider = ResilientProvider(HttpProvider(server.url, pool_size=workers), retries=retries, backoff=0.05, seed=0)
+    start = time.perf_counter()
+    results = run_batch(tickers, '2022-01-01', '2024-01-01', EXPIRY, provider, stages=STAGES, io_workers=workers,
+                        use_processes=False, bulk=False)
+    seconds = time.perf_counter() - start
+    failed = [result for result in results if result.status != 'ok']
+    print(f"retries={retries}: {len(tickers) - len(failed)}/{len(tickers)} tickers ok in {seconds:.2f}s; "
+          f"{provider.report()}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.15)
+    parser.add_argument('--throttle-rate', type=float, default=0.05)
+    parser.add_argument('--fail-first', type=int, default=1, help='503s at the start of every path')
+    args = parser.parse_args()
+    os.chdir(tempfile.mkdtemp())
+    tickers = [f'T{i:03d}' for i in range(args.tickers)]
+
+    print(f"stub server: {args.latency * 1000:.0f}ms latency, {args.error_rate:.0%} 503s, "
+          f"{args.throttle_rate:.0%} 429s, first {args.fail_first} request(s) of every path 503")
+    lost = batch(args, tickers, 0)
+    assert lost or not (args.fail_first or args.error_rate or args.throttle_rate), "no faults were injected"
+    failed = batch(args, tickers, args.fail_first + 5)
+    assert not failed, [(result.ticker, result.error) for result in failed]
+
+    # Many threads asking for the same chain at once: one upstream request
+    with StubServer(FakeProvider(), latency=0.2) as server:
+        provider = ResilientProvider(HttpProvider(server.url))
+        with ThreadPoolExecutor(16) as pool:
+            chains = list(pool.map(lambda _: provider.option_chain('AAA', EXPIRY), range(16)))
+        assert all(chain.calls.equals(chains[0].calls) for chain in chains)
+        assert len({id(chain.calls) for chain in chains}) == len(chains), "callers must get their own frames"
+        print(f"16 concurrent identical option_chain calls: {sum(server.hits.values())} upstream request(s), "
+              f"{provider.stats['coalesced']} coalesced")
+
+    with StubServer(FakeProvider()) as server:
+        rate, burst, n = 20.0, 5, 45
+        provider = ResilientProvider(HttpProvider(server.url), rate=rate, burst=burst)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda i: provider.option_expiries(f'T{i:03d}'), range(n)))
+        seconds = time.perf_counter() - start
+        print(f"token bucket {rate:.0f}/s, burst {burst}: {n} requests in {seconds:.2f}s "
+              f"(expected >= {(n - burst) / rate:.2f}s), {n / seconds:.1f} requests/s")
+
+        import requests
+        n = 300
+        start = time.perf_counter()
+        for i in range(n):
+            requests.get(f'{server.url}/expiries/T{i % 10:03d}', timeout=10).raise_for_status()
+        fresh = time.perf_counter() - start
+        provider = HttpProvider(server.url)
+        start = time.perf_counter()
+        for i in range(n):
+            provider.option_expiries(f'T{i % 10:03d}')
+        pooled = time.perf_counter() - start
+        print(f"{n} requests: new connection each {fresh * 1000 / n:.2f}ms/request, "
+              f"pooled session {pooled * 1000 / n:.2f}ms/request")
+
+
+if __name__ == "__main__":
+    main()
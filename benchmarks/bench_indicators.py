@@ -0,0 +1,64 @@
+"""
+Per-bar cost of IndicatorState.update vs a full ta recompute, plus a check
+that streaming every bar reproduces the ta columns.
+
+    python benchmarks/bench_indicators.py --bars 500 5000 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stockinsight.indicator_engine import INDICATOR_COLUMNS, IndicatorState, compute_indicators
+from fixtures import synthetic_ohlcv
+
+
+def stream_all(stock_data):
+    state = IndicatorState()
+    rows = [state.update(h, l, c, v) for h, l, c, v in zip(stock_data['High'].to_numpy(dtype=float),
+                                                          stock_data['Low'].to_numpy(dtype=float),
+                                                          stock_data['Close'].to_numpy(dtype=float),
+                                                          stock_data['Volume'].to_numpy(dtype=float))]
+    return pd.DataFrame(rows, index=stock_data.index, columns=INDICATOR_COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bars', type=int, nargs='+', default=[500, 5_000, 50_000])
+    parser.add_argument('--updates', type=int, default=1_000, help='bars appended when timing update()')
+    args = parser.parse_args()
+
+    print(f"{'bars':>8} {'full recompute ms':>18} {'update us/bar':>14} {'max abs diff':>13}")
+    for n in args.bars:
+        rng = np.random.default_rng(n)
+        stock_data = synthetic_ohlcv(pd.bdate_range('1990-01-01', periods=n + args.updates, name='Date'), rng)
+        history, tail = stock_data.iloc[:n], stock_data.iloc[n:]
+
+        # Streaming has to agree with ta over the whole series
+        expected = compute_indicators(stock_data)
+        diff = (stream_all(stock_data) - expected).abs().max().max()
+
+        start = time.perf_counter()
+        compute_indicators(history)
+        full_ms = (time.perf_counter() - start) * 1000
+
+        state = IndicatorState.from_history(history)
+        bars = list(zip(tail['High'].to_numpy(dtype=float), tail['Low'].to_numpy(dtype=float),
+                        tail['Close'].to_numpy(dtype=float), tail['Volume'].to_numpy(dtype=float)))
+        start = time.perf_counter()
+        for h, l, c, v in bars:
+            last = state.update(h, l, c, v)
+        update_us = (time.perf_counter() - start) / len(bars) * 1e6
+
+        # Resuming from history must land on the same final values as ta
+        resumed_diff = max(abs(last[col] - expected[col].iloc[-1]) for col in INDICATOR_COLUMNS)
+        print(f"{n:>8} {full_ms:>18.2f} {update_us:>14.2f} {max(diff, resumed_diff):>13.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Bytes per row of the frames a StockAnalyzer holds, default vs compact=True,
+plus the pickled size shipped to run_batch's CPU workers and a check that
+the CSV output carries the same values.
+
+    python benchmarks/bench_memory.py --tickers 20 --start 2015-01-01
+"""
+import argparse
+import io
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stockinsight.compact import expand, memory_bytes
+from stockinsight.stock_analyzer import StockAnalyzer
+from fixtures import FakeProvider
+
+EXPIRY = '2030-01-18'
+
+
+def analyze(ticker, start, provider, compact):
+    analyzer = StockAnalyzer(ticker, start, expiry=EXPIRY, provider=provider, compact=compact)
+    analyzer.download_data()
+    analyzer.calculate_indicators()
+    analyzer.download_option()
+    analyzer.download_option_surface(max_workers=1)
+    analyzer.provider = analyzer.option_chain = None
+    return analyzer
+
+
+def csv_text(frame):
+    buffer = io.StringIO()
+    frame.to_csv(buffer)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', type=int, default=20)
+    parser.add_argument('--start', default='2015-01-01')
+    args = parser.parse_args()
+
+    tickers = [f'T{i:03d}' for i in range(args.tickers)]
+    provider = FakeProvider()
+    os.chdir(tempfile.mkdtemp())
+
+    sizes = {}
+    for compact in (False, True):
+        start = time.perf_counter()
+        analyzers = [analyze(ticker, args.start, provider, compact) for ticker in tickers]
+        seconds = time.perf_counter() - start
+        for label, get in (('stock_data', lambda a: a.stock_data), ('calls', lambda a: a.calls),
+                           ('puts', lambda a: a.puts), ('option_surface', lambda a: a.option_surface)):
+            rows = sum(len(get(a)) for a in analyzers)
+            sizes.setdefault(label, []).append((sum(memory_bytes(get(a)) for a in analyzers), rows))
+        sizes.setdefault('pickled analyzer', []).append((sum(len(pickle.dumps(a)) for a in analyzers), len(analyzers)))
+        sizes.setdefault('analysis seconds', []).append(seconds)
+        if compact:
+            compact_analyzers = analyzers
+        else:
+            default_analyzers = analyzers
+
+    print(f"{args.tickers} tickers from {args.start}")
+    print(f"{'':<18} {'default B/row':>14} {'compact B/row':>14} {'saved':>7}")
+    for label, ((before, rows), (after, _)) in ((k, v) for k, v in sizes.items() if k != 'analysis seconds'):
+        print(f"{label:<18} {before / rows:>14,.1f} {after / rows:>14,.1f} {1 - after / before:>7.0%}")
+    print(f"analysis time: default {sizes['analysis seconds'][0]:.2f}s, compact {sizes['analysis seconds'][1]:.2f}s")
+
+    # Same CSV layout, values equal to float32 precision
+    a, b = default_analyzers[0], compact_analyzers[0]
+    for label, (default, compact) in (('stock_data', (a.stock_data, b.stock_data)), ('calls', (a.calls, b.calls))):
+        default_csv = pd.read_csv(io.StringIO(csv_text(default)), index_col=0)
+        compact_csv = pd.read_csv(io.StringIO(csv_text(expand(compact))), index_col=0)
+        assert list(default_csv.columns) == list(compact_csv.columns), label
+        numeric = default_csv.select_dtypes('number').columns
+        error = np.nanmax(np.abs(compact_csv[numeric] / default_csv[numeric] - 1).to_numpy())
+        same_text = (default_csv.drop(columns=numeric) == compact_csv.drop(columns=numeric)).all().all()
+        print(f"{label} CSV: same columns, max relative error {error:.1e}, text columns equal: {same_text}")
+
+    summaries = [analyzer.summary() for analyzer in compact_analyzers]
+    per_row = np.mean([sys.getsizeof(a.stock_data.iloc[-1]) for a in default_analyzers])
+    print(f"{summaries[0]!r}: {sys.getsizeof(summaries[0])} bytes, vs {per_row:,.0f} for the last row as a Series")
+
+
+if __name__ == "__main__":
+    main()
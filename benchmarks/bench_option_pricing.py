@@ -0,0 +1,91 @@
+"""
+Compare the row-wise DataFrame.apply Black-Scholes path used by the original
+StockAnalyzer.download_option against option_pricing.black_scholes_batch.
+
+    python benchmarks/bench_option_pricing.py --sizes 10000 100000 1000000
+
+The row-wise path is only timed up to --max-rowwise strikes; beyond that its
+time is extrapolated from the measured per-row cost.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stockinsight.stock_analyzer import StockAnalyzer
+from stockinsight.option_pricing import black_scholes_batch, itm_probability
+
+
+def make_chain(n, spot=100.0, seed=0):
+    rng = np.random.default_rng(seed)
+    chain = pd.DataFrame({
+        'strike': np.round(rng.uniform(spot * 0.5, spot * 1.8, n), 1),
+        'impliedVolatility': rng.uniform(0.0, 1.2, n),
+    })
+    # A few zero-IV rows, like the junk Yahoo sometimes returns
+    chain.loc[chain.sample(frac=0.01, random_state=seed).index, 'impliedVolatility'] = 0.0
+    chain['last_price'] = spot
+    chain['expiry_date'] = pd.Timestamp(datetime.now() + timedelta(days=30))
+    return chain
+
+
+def rowwise(chain, analyzer):
+    return chain.apply(lambda row: analyzer.black_scholes(
+        S = row['last_price'],
+        K = row['strike'],
+        T = (row['expiry_date'] - datetime.now()).days / 365,
+        sigma = row['impliedVolatility'],
+        optionType = 'call'
+        ), axis=1)
+
+
+def vectorized(chain):
+    T = (chain['expiry_date'].iloc[0] - datetime.now()).days / 365
+    return itm_probability(chain['last_price'].to_numpy(), chain['strike'].to_numpy(), T,
+                           chain['impliedVolatility'].to_numpy(), 'call')
+
+
+def timed(func, *args, repeat=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--max-rowwise', type=int, default=100_000)
+    args = parser.parse_args()
+
+    analyzer = StockAnalyzer.__new__(StockAnalyzer)
+    print(f"{'strikes':>10} {'row-wise s':>12} {'ITM only s':>12} {'full+greeks s':>14} {'speedup':>9}")
+    for n in args.sizes:
+        chain = make_chain(n)
+
+        rowwise_n = min(n, args.max_rowwise)
+        row_time, row_result = timed(rowwise, chain.iloc[:rowwise_n], analyzer, repeat=1)
+        row_time = row_time * n / rowwise_n
+        estimated = '*' if rowwise_n < n else ' '
+
+        vec_time, vec_result = timed(vectorized, chain)
+        T = (chain['expiry_date'].iloc[0] - datetime.now()).days / 365
+        full_time, _ = timed(black_scholes_batch, chain['last_price'].to_numpy(), chain['strike'].to_numpy(),
+                             T, chain['impliedVolatility'].to_numpy(), 'call')
+
+        np.testing.assert_allclose(vec_result[:rowwise_n], row_result.to_numpy(), rtol=1e-9, atol=1e-12)
+        print(f"{n:>10} {row_time:>11.3f}{estimated} {vec_time:>12.4f} {full_time:>14.4f} {row_time / vec_time:>8.0f}x")
+    print("* extrapolated from the first --max-rowwise strikes")
+
+
+if __name__ == "__main__":
+    main()
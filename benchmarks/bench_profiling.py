@@ -0,0 +1,72 @@
+"""
+Cost of the per-stage instrumentation: run_batch on offline fake data with
+no Profiler, with the default wall/CPU/RSS/rows metrics, with tracemalloc
+peaks and with cProfile, then the stage summary, the JSON lines and Prometheus outputs and
+the top functions of the slowest ticker's profile.
+
+    python benchmarks/bench_profiling.py --tickers 20 --stages download_data calculate_indicators stock_to_csv
+"""
+import argparse
+import contextlib
+import io
+import os
+import pstats
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stockinsight.batch_pipeline import DEFAULT_STAGES, run_batch
+from stockinsight.profiling import Profiler, summarize, write_jsonl, write_prometheus
+from fixtures import FakeProvider
+
+EXPIRY = '2030-01-18'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', type=int, default=20)
+    parser.add_argument('--start-date', default='2015-01-01')
+    parser.add_argument('--stages', nargs='+', default=[s for s in DEFAULT_STAGES if s != 'plot_stock_data'])
+    args = parser.parse_args()
+    os.chdir(tempfile.mkdtemp())
+    tickers = [f'T{i:03d}' for i in range(args.tickers)]
+
+    configs = (('no profiler', None),
+               ('wall/cpu/rss/rows', Profiler()),
+               ('+ tracemalloc', Profiler(trace_memory=True)),
+               ('+ cProfile top 3', Profiler(profile_top=3, profile_dir='profiles')))
+    baseline = None
+    for label, profiler in configs:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = run_batch(tickers, args.start_date, None, EXPIRY, FakeProvider(), stages=args.stages,
+                                io_workers=4, use_processes=False, bulk=False, profiler=profiler)
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        assert all(result.status == 'ok' for result in results), [r.error for r in results if r.error]
+        print(f"{label:<18} {seconds:6.2f}s ({seconds / baseline - 1:+.0%})")
+        if profiler is not None and profiler.trace_memory:
+            measured = results
+
+    print()
+    print(summarize(measured))
+
+    write_jsonl(measured, 'metrics.jsonl')
+    write_prometheus(measured, 'metrics.prom')
+    with open('metrics.jsonl') as f:
+        lines = f.readlines()
+    with open('metrics.prom') as f:
+        samples = [line for line in f if not line.startswith('#')]
+    print(f"\nmetrics.jsonl: {len(lines)} lines, e.g. {lines[0].strip()}")
+    print(f"metrics.prom: {len(samples)} samples, e.g. {samples[0].strip()}")
+
+    profiles = sorted(os.listdir('profiles'))
+    print(f"\nprofiles written for {', '.join(p[:-5] for p in profiles)}; top functions of {profiles[0]}:")
+    stats = pstats.Stats(os.path.join('profiles', profiles[0]), stream=sys.stdout)
+    stats.sort_stats('cumulative').print_stats(8)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+One StockAnalyzer-style ta recompute per ticker vs the panel screener, on a
+synthetic price cache, plus a check that both select the same tickers and
+agree on the indicator values.
+
+    python benchmarks/bench_screener.py --tickers 2000 --bars 1500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stockinsight.indicator_engine import INDICATOR_COLUMNS, compute_indicators
+from stockinsight.price_cache import PriceCache
+from stockinsight.screener import load_panel, panel_indicators, screen
+from fixtures import synthetic_ohlcv
+
+EXPRESSION = 'RSI < 45 and Close > SMA200'
+
+
+def build_cache(root, n_tickers, bars):
+    cache = PriceCache(root)
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=bars, name='Date')
+    tickers = []
+    for i in range(n_tickers):
+        rng = np.random.default_rng(i)
+        # Staggered listing dates, so columns start at different rows
+        first = int(rng.integers(0, bars // 4))
+        ticker = f'SYN{i:04d}'
+        cache.save(ticker, synthetic_ohlcv(index[first:], rng))
+        tickers.append(ticker)
+    return cache, tickers
+
+
+def per_ticker(cache, tickers):
+    # What answering the query with one frame per ticker costs
+    matches = []
+    for ticker in tickers:
+        stock_data = cache.load(ticker)
+        values = compute_indicators(stock_data).iloc[-1]
+        if values['RSI'] < 45 and stock_data['Close'].iloc[-1] > values['SMA200']:
+            matches.append(ticker)
+    return matches
+
+
+def max_diff(cache, tickers):
+    panel = load_panel(cache, tickers)
+    values = panel_indicators(panel)
+    worst = 0.0
+    for col, ticker in enumerate(panel.tickers):
+        stock_data = cache.load(ticker)
+        expected = compute_indicators(stock_data)
+        rows = panel.dates.get_indexer(stock_data.index)
+        for name in INDICATOR_COLUMNS:
+            diff = np.nanmax(np.abs(values[name][rows, col] - expected[name].to_numpy()), initial=0.0)
+            worst = max(worst, diff)
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--bars', type=int, default=1500)
+    parser.add_argument('--chunk-size', type=int, default=250)
+    parser.add_argument('--check', type=int, default=20, help='tickers compared column by column against ta')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        cache, tickers = build_cache(root, args.tickers, args.bars)
+
+        start = time.perf_counter()
+        expected = per_ticker(cache, tickers)
+        baseline = time.perf_counter() - start
+        print(f"{'per-ticker ta recompute':<28} {baseline:>8.2f}s")
+
+        start = time.perf_counter()
+        result = screen(cache, tickers, EXPRESSION, rank_by='RSI', chunk_size=args.chunk_size)
+        seconds = time.perf_counter() - start
+        print(f"{'panel screener':<28} {seconds:>8.2f}s  ({baseline / seconds:.1f}x)")
+
+        same = sorted(expected) == sorted(result.index)
+        print(f"{len(result)} matches, same selection: {same}, "
+              f"max abs diff vs ta: {max_diff(cache, tickers[:args.check]):.2e}")
+
+
+if __name__ == "__main__":
+    main()
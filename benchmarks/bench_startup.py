@@ -0,0 +1,69 @@
+"""
+Startup cost of the CLI and package entry points, measured with
+'python -X importtime' in fresh interpreters.
+
+    python benchmarks/bench_startup.py --repeat 5
+
+The 'eager imports' row is what loading the old stock_analyzer.py cost:
+every heavy dependency imported at module load.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('yfinance', 'ta', 'scipy', 'matplotlib', 'mplfinance', 'selenium', 'bs4', 'lxml', 'requests')
+
+CASES = [
+    ('eager imports (old stock_analyzer.py)',
+     ['-c', 'import yfinance, ta, numpy, pandas, scipy.stats, matplotlib.pyplot, matplotlib.dates, '
+            'mplfinance.original_flavor']),
+    ('python -m stockinsight --help', ['-m', 'stockinsight', '--help']),
+    ('python -m stockinsight analyze --help', ['-m', 'stockinsight', 'analyze', '--help']),
+    ('import stockinsight', ['-c', 'import stockinsight']),
+    ('CSV-only stages (no plotting)',
+     ['-c', 'from stockinsight.stock_analyzer import StockAnalyzer; '
+            'from stockinsight.indicator_engine import compute_indicators; '
+            'from stockinsight.batch_pipeline import run_batch']),
+]
+
+
+def measure(args):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+
+    total_us = 0
+    heavy = set()
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        top = name.strip().split('.')[0]
+        if top in HEAVY:
+            heavy.add(top)
+    return wall, total_us / 1e6, heavy, proc.returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<40} {'wall s':>8} {'imports s':>10}  heavy modules loaded")
+    for label, case_args in CASES:
+        runs = [measure(case_args) for _ in range(args.repeat)]
+        wall = statistics.median(run[0] for run in runs)
+        imports = statistics.median(run[1] for run in runs)
+        heavy = ', '.join(sorted(runs[-1][2])) or '-'
+        failed = ' (failed)' if runs[-1][3] not in (0,) else ''
+        print(f"{label:<40} {wall:>8.3f} {imports:>10.3f}  {heavy}{failed}")
+
+
+if __name__ == "__main__":
+    main()
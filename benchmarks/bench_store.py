@@ -0,0 +1,159 @@
+"""
+Analytics store vs CSV files: a synthetic universe of daily option chains,
+prices and economic events is written both as the CSV outputs (one chain
+file per ticker and day, one calendar CSV) and into the SQLite store, then
+the same questions are answered from each, and the answers compared:
+
+- IV around events: mean near-the-money IV per ticker and chain date within
+  3 days of every high-importance USD event;
+- one ticker's prices and indicators over a quarter.
+
+    python benchmarks/bench_store.py --tickers 50 --days 60
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stockinsight.calendar_parser import DATE_FORMAT, parse_events
+from stockinsight.indicator_engine import compute_indicators
+from stockinsight.option_pricing import itm_probability
+from stockinsight.store import AnalyticsStore
+from fixtures import synthetic_chain, synthetic_ohlcv, synthetic_page
+
+EXPIRY = '2030-01-18'
+DAYS = 3
+
+
+def chain(ticker, side, spot, day, rng):
+    # What download_option leaves in self.calls / self.puts
+    frame = synthetic_chain(ticker, EXPIRY, spot, side[0].upper(), rng, n_strikes=80)
+    frame = frame.drop(['lastPrice', 'change', 'percentChange', 'inTheMoney', 'contractSize', 'currency'], axis=1)
+    frame = frame[(frame['strike'] > spot * 0.5) & (frame['strike'] < spot * 1.8)].copy()
+    frame['last_price'] = spot
+    frame['expiry_date'] = pd.to_datetime(EXPIRY)
+    T = (pd.to_datetime(EXPIRY) - day).days / 365
+    frame['InTheMoney_probability'] = itm_probability(spot, frame['strike'].to_numpy(), T,
+                                                      frame['impliedVolatility'].to_numpy(), side)
+    return frame
+
+
+def iv_from_csv(root):
+    """The CSV route: parse every chain file and the calendar, then join in pandas."""
+    events = pd.concat([pd.read_csv(path) for path in glob.glob(os.path.join(root, '*_economicEvents.csv'))])
+    events['day'] = pd.to_datetime(events['Date'], format=DATE_FORMAT)
+    events = events[(events['Currency'] == 'USD') & (events['Importance'] >= 3)]
+
+    frames = []
+    for path in glob.glob(os.path.join(root, '*', '*', '*_*_*.csv')):
+        day = os.path.basename(os.path.dirname(os.path.dirname(path)))
+        frame = pd.read_csv(path, index_col=0)
+        frames.append(frame.assign(ticker=os.path.basename(path).split('_')[0], date=pd.Timestamp(day)))
+    options = pd.concat(frames, ignore_index=True)
+    near = options[(options['strike'] / options['last_price'] - 1).abs() <= 0.05]
+    iv = near.groupby(['ticker', 'date'])['impliedVolatility'].agg(['mean', 'count']).reset_index()
+
+    joined = []
+    for offset in range(-DAYS, DAYS + 1):
+        shifted = events.assign(date=events['day'] + pd.Timedelta(days=offset), days_from_event=offset)
+        joined.append(shifted.merge(iv, on='date'))
+    return pd.concat(joined, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', type=int, default=50)
+    parser.add_argument('--days', type=int, default=60, help='daily chain snapshots per ticker')
+    parser.add_argument('--bars', type=int, default=750, help='price history per ticker')
+    parser.add_argument('--events', type=int, default=3000, help='calendar rows (one every 37 minutes)')
+    args = parser.parse_args()
+    root = tempfile.mkdtemp()
+    os.chdir(root)
+    rng = np.random.default_rng(0)
+    tickers = [f'T{i:03d}' for i in range(args.tickers)]
+    days = pd.bdate_range(end=pd.Timestamp('2026-06-30'), periods=args.days)
+    store = AnalyticsStore(os.path.join(root, 'analytics.db'))
+    csv_seconds = store_seconds = 0.0
+
+    events = parse_events(synthetic_page(args.events, start=datetime.combine(days[0].date(), datetime.min.time())),
+                          date_format=None)
+    start = time.perf_counter()
+    events.assign(Date=events['Date'].dt.strftime(DATE_FORMAT)).to_csv('calendar_economicEvents.csv', index=False)
+    csv_seconds += time.perf_counter() - start
+    start = time.perf_counter()
+    store.append_events(events)
+    store_seconds += time.perf_counter() - start
+
+    prices = {}
+    option_rows = 0
+    for ticker in tickers:
+        stock_data = synthetic_ohlcv(pd.bdate_range(end=days[-1], periods=args.bars, name='Date'), rng)
+        stock_data = stock_data.join(compute_indicators(stock_data))
+        prices[ticker] = stock_data
+        start = time.perf_counter()
+        stock_data.to_csv(f'{ticker}_stock_data.csv')
+        csv_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        store.append_prices(ticker, stock_data)
+        store_seconds += time.perf_counter() - start
+
+        for day in days:
+            spot = float(stock_data.loc[day, 'Close'])
+            calls, puts = chain(ticker, 'call', spot, day, rng), chain(ticker, 'put', spot, day, rng)
+            option_rows += len(calls) + len(puts)
+            directory = os.path.join(root, day.strftime('%Y-%m-%d'), ticker)
+            os.makedirs(directory, exist_ok=True)
+            start = time.perf_counter()
+            calls.to_csv(os.path.join(directory, f'{ticker}_calls_{EXPIRY}.csv'))
+            puts.to_csv(os.path.join(directory, f'{ticker}_puts_{EXPIRY}.csv'))
+            csv_seconds += time.perf_counter() - start
+            start = time.perf_counter()
+            store.append_options(ticker, calls, puts, as_of=day)
+            store_seconds += time.perf_counter() - start
+
+    print(f"{args.tickers} tickers x {args.days} chain days ({option_rows:,} option rows, "
+          f"{args.tickers * args.bars:,} price rows, {args.events:,} events)")
+    print(f"Writing: CSV {csv_seconds:.2f}s, store {store_seconds:.2f}s "
+          f"({os.path.getsize(store.path) / 2 ** 20:.1f} MB)")
+
+    start = time.perf_counter()
+    from_csv = iv_from_csv(root)
+    csv_query = time.perf_counter() - start
+    start = time.perf_counter()
+    from_store = store.iv_around_events(days=DAYS)
+    store_query = time.perf_counter() - start
+
+    # Calendar CSV dates are days only, so compare per event day, event, ticker and chain date
+    keys = ['day', 'Event', 'ticker', 'date', 'days_from_event']
+    expected = from_csv.drop_duplicates(keys).sort_values(keys)
+    actual = from_store.assign(day=from_store['event_time'].dt.normalize(), Event=from_store['event'])
+    actual = actual.drop_duplicates(keys).sort_values(keys)
+    assert len(expected) == len(actual), (len(expected), len(actual))
+    assert (expected[keys].to_numpy() == actual[keys].to_numpy()).all()
+    diff = np.abs(expected['mean'].to_numpy() - actual['implied_volatility'].to_numpy()).max()
+    print(f"IV around high-importance USD events ({len(from_store):,} rows): CSV {csv_query * 1000:,.0f} ms, "
+          f"store {store_query * 1000:,.1f} ms ({csv_query / store_query:,.0f}x), max IV difference {diff:.1e}")
+
+    ticker, quarter = tickers[len(tickers) // 2], (days[-1] - pd.Timedelta(days=91), days[-1])
+    start = time.perf_counter()
+    frame = pd.read_csv(f'{ticker}_stock_data.csv', index_col=0, parse_dates=True)
+    from_csv = frame[(frame.index >= quarter[0]) & (frame.index < quarter[1])]
+    csv_query = time.perf_counter() - start
+    start = time.perf_counter()
+    from_store = store.prices(ticker, *quarter)
+    store_query = time.perf_counter() - start
+    assert np.allclose(from_csv['RSI'].to_numpy(), from_store['rsi'].to_numpy(), equal_nan=True)
+    print(f"One ticker's quarter of prices ({len(from_store)} rows): CSV {csv_query * 1000:.1f} ms, "
+          f"store {store_query * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Tick-to-update latency of the streaming service: hundreds of synthetic
+tickers are loaded, a replay of random-walk ticks over two sessions is
+applied as fast as possible while a client polls the HTTP API, and the
+live indicators and ITM probabilities are checked against a full ta
+recompute and itm_probability on the same bars. The last line is the cost
+per tick of rerunning the batch computation instead.
+
+    python benchmarks/bench_streaming.py --tickers 500 --ticks 200000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+from datetime import date, datetime, time as dtime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stockinsight.data_providers import DataProvider, Options
+from stockinsight.indicator_engine import INDICATOR_COLUMNS, compute_indicators
+from stockinsight.monte_carlo import time_to_expiry
+from stockinsight.option_pricing import itm_probability
+from stockinsight.streaming import ReplaySource, StreamService, load, write_ticks
+from fixtures import synthetic_chain, synthetic_ohlcv, synthetic_ticks
+
+EXPIRY = '2030-01-18'
+
+
+class BenchProvider(DataProvider):
+    """A year of synthetic bars up to yesterday and a 60-strike chain per ticker."""
+
+    def __init__(self, bars=300):
+        self.index = pd.bdate_range(end=date.today() - timedelta(days=1), periods=bars, name='Date')
+
+    def _rng(self, ticker):
+        return np.random.default_rng(zlib.crc32(ticker.encode()))
+
+    def download(self, ticker, start, end):
+        return synthetic_ohlcv(self.index, self._rng(ticker))
+
+    def option_chain(self, ticker, expiry):
+        rng = self._rng(ticker)
+        spot = synthetic_ohlcv(self.index, rng)['Close'].iloc[-1]
+        return Options(calls=synthetic_chain(ticker, expiry, spot, 'C', rng),
+                       puts=synthetic_chain(ticker, expiry, spot, 'P', rng),
+                       underlying={'regularMarketPrice': spot})
+
+
+async def get(reader, writer, path):
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    length = next(int(line.split(b':')[1]) for line in head.split(b'\r\n') if line.lower().startswith(b'content-length'))
+    return json.loads(await reader.readexactly(length))
+
+
+async def poll(service, tickers, done, timings):
+    # One keep-alive client asking for a ticker's full snapshot (and the stats) while ticks stream in
+    reader, writer = await asyncio.open_connection('127.0.0.1', service.port)
+    i = 0
+    while not done.is_set():
+        start = time.perf_counter()
+        await get(reader, writer, f'/snapshot/{tickers[i % len(tickers)]}')
+        await get(reader, writer, '/stats')
+        timings.append((time.perf_counter() - start) / 2)
+        i += 1
+        await asyncio.sleep(0.01)
+    writer.close()
+
+
+async def replay(service, tickers):
+    await service.start()
+    done, timings = asyncio.Event(), []
+    client = asyncio.create_task(poll(service, tickers, done, timings))
+    start = time.perf_counter()
+    await service.consume()
+    seconds = time.perf_counter() - start
+    done.set()
+    await client
+    await service.stop()
+    return seconds, timings
+
+
+def session_bars(ticks, ticker):
+    frame = pd.DataFrame([tick for tick in ticks if tick.ticker == ticker], columns=['time', 'ticker', 'price', 'volume'])
+    frame['Date'] = pd.to_datetime(frame['time']).dt.normalize()
+    grouped = frame.groupby('Date')
+    return pd.DataFrame({'Open': grouped['price'].first(), 'High': grouped['price'].max(), 'Low': grouped['price'].min(),
+                         'Close': grouped['price'].last(), 'Adj Close': grouped['price'].last(),
+                         'Volume': grouped['volume'].sum()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', type=int, default=300)
+    parser.add_argument('--ticks', type=int, default=100_000, help='ticks per session')
+    parser.add_argument('--sessions', type=int, default=2)
+    args = parser.parse_args()
+    os.chdir(tempfile.mkdtemp())
+    provider = BenchProvider()
+    tickers = [f'T{i:04d}' for i in range(args.tickers)]
+
+    start = time.perf_counter()
+    live, errors = load(tickers, provider, '2000-01-01', EXPIRY)
+    assert not errors, errors
+    histories = {ticker: provider.download(ticker, None, None) for ticker in tickers}
+    print(f"Loaded {len(live)} tickers with {sum(len(t.strikes) for t in live.values())} strikes "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    ticks, spots = [], {ticker: t.price for ticker, t in live.items()}
+    for session in range(args.sessions):
+        opening = datetime.combine(date.today() + timedelta(days=session), dtime(9, 30))
+        day = synthetic_ticks(spots, args.ticks, opening, interval=6.5 * 3600 / args.ticks, seed=session)
+        spots.update({tick.ticker: tick.price for tick in day})
+        ticks += day
+    write_ticks(ticks, 'ticks.csv')
+
+    service = StreamService(live, ReplaySource('ticks.csv'), port=0)
+    seconds, timings = asyncio.run(replay(service, tickers))
+    latency = service.latency_ms()
+    print(f"Applied {service.stats['ticks']:,} ticks over {args.sessions} sessions in {seconds:.2f}s "
+          f"({service.stats['ticks'] / seconds:,.0f} ticks/s including the replay reader)")
+    print(f"Tick-to-update latency: p50 {latency['p50']:.3f} ms, p99 {latency['p99']:.3f} ms, max {latency['max']:.3f} ms")
+    print(f"API while streaming: {len(timings)} snapshot/stats requests, median {statistics.median(timings) * 1000:.2f} ms")
+
+    # The live state must agree with recomputing everything over history + the sessions' bars
+    indicator_diff = probability_diff = 0.0
+    for ticker in tickers[:5]:
+        t = live[ticker]
+        bars = pd.concat([histories[ticker], session_bars(ticks, ticker)])
+        expected = compute_indicators(bars).iloc[-1]
+        indicator_diff = max(indicator_diff, *(abs(t.values[col] - expected[col]) for col in INDICATOR_COLUMNS))
+        T = time_to_expiry(EXPIRY, t.time.replace(second=0, microsecond=0))
+        probabilities = itm_probability(t.price, t.strikes, T, t.sigma, t.option_type)
+        probability_diff = max(probability_diff, np.abs(probabilities - t.itm_probability).max())
+    print(f"Max difference vs full recompute: indicators {indicator_diff:.2e}, ITM probability {probability_diff:.2e}")
+
+    # What each tick costs when the batch computation is simply rerun on the latest bars
+    t = live[tickers[0]]
+    bars = pd.concat([histories[tickers[0]], session_bars(ticks, tickers[0])])
+    start = time.perf_counter()
+    for _ in range(20):
+        compute_indicators(bars)
+        itm_probability(t.price, t.strikes, t.T, t.sigma, t.option_type)
+    rerun_ms = (time.perf_counter() - start) / 20 * 1000
+    print(f"Rerunning indicators and probabilities per tick instead: {rerun_ms:.2f} ms "
+          f"({rerun_ms / latency['p50']:,.0f}x the streaming p50)")
+
+
+if __name__ == "__main__":
+    main()
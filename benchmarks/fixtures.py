@@ -0,0 +1,320 @@
+"""
+Synthetic data for the benchmarks and tests: deterministic OHLCV histories
+and option chains, an offline provider serving them, a local HTTP server
+with injected faults, investing.com calendar pages (and the BeautifulSoup
+loop calendar_parser replaced, as a reference) and tick streams.
+Benchmarks import it as a sibling module ('from fixtures import ...'),
+which works because Python puts a script's own directory on sys.path;
+tests/conftest.py adds the directory for pytest.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stockinsight.data_providers import DataProvider, Options, split_grouped
+from stockinsight.streaming import Tick
+
+SYNTHETIC_CURRENCIES = [('United States', 'USA', 'USD'), ('Euro Zone', 'Europe', 'EUR'), ('Japan', 'Japan', 'JPY'),
+                        ('United Kingdom', 'UK', 'GBP'), ('China', 'China', 'CNY')]
+SYNTHETIC_EVENTS = ['CPI (MoM)', 'Nonfarm Payrolls', 'Retail Sales (YoY)', 'GDP (QoQ)', 'Interest Rate Decision',
+                    'Manufacturing PMI', 'Unemployment Rate', 'Crude Oil Inventories']
+
+
+class FakeProvider(DataProvider):
+    """
+    Offline provider generating deterministic synthetic data per ticker.
+
+    latency adds a sleep to every call to mimic network time, and tickers
+    listed in fail raise on download so error handling can be exercised.
+    """
+
+    def __init__(self, latency=0.0, fail=()):
+        self.latency = latency
+        self.fail = set(fail)
+
+    def _rng(self, ticker):
+        return np.random.default_rng(zlib.crc32(ticker.encode()))
+
+    def _check(self, ticker):
+        if self.latency:
+            time.sleep(self.latency)
+        if ticker in self.fail:
+            raise ConnectionError(f"Simulated download failure for {ticker}")
+
+    def history(self, ticker):
+        # One fixed walk per ticker, so every date range and the option spot agree
+        index = pd.bdate_range('2000-01-03', date.today(), name='Date')
+        return synthetic_ohlcv(index, self._rng(ticker))
+
+    def download(self, ticker, start, end):
+        self._check(ticker)
+        data = self.history(ticker)
+        return data[(data.index >= pd.Timestamp(start)) & (data.index < pd.Timestamp(end))]
+
+    def download_many(self, tickers, start, end):
+        # One simulated round trip for the whole batch, split like a Yahoo grouped download
+        if self.latency:
+            time.sleep(self.latency)
+        tickers = [ticker for ticker in tickers if ticker not in self.fail]
+        if not tickers:
+            return {}
+        data = pd.concat({ticker: self.history(ticker) for ticker in tickers}, axis=1)
+        data = data[(data.index >= pd.Timestamp(start)) & (data.index < pd.Timestamp(end))]
+        return split_grouped(data, tickers)
+
+    def option_chain(self, ticker, expiry):
+        self._check(ticker)
+        rng = self._rng(ticker)
+        spot = self.history(ticker)['Close'].iloc[-1]
+        return Options(calls=synthetic_chain(ticker, expiry, spot, 'C', rng),
+                       puts=synthetic_chain(ticker, expiry, spot, 'P', rng),
+                       underlying={'regularMarketPrice': spot})
+
+    def option_expiries(self, ticker):
+        self._check(ticker)
+        # Monthly expiries (third Friday) for the next year
+        months = pd.date_range(date.today().replace(day=1), periods=12, freq='MS')
+        return [(month + pd.offsets.WeekOfMonth(week=2, weekday=4)).date().isoformat() for month in months]
+
+
+class StubServer:
+    """
+    Local HTTP price server for exercising fetch.HttpProvider and
+    ResilientProvider offline. Serves provider's data (e.g. a FakeProvider)
+    on 127.0.0.1 and injects faults: every request sleeps latency seconds, a
+    share error_rate of them answers 503 and a share throttle_rate answers
+    429 with a Retry-After of retry_after seconds. fail_first makes the
+    first n requests for each path fail with 503, for deterministic retry
+    checks. hits counts requests per path (query included).
+
+        with StubServer(FakeProvider(), latency=0.05, error_rate=0.2) as server:
+            provider = ResilientProvider(HttpProvider(server.url))
+    """
+
+    def __init__(self, provider, latency=0.0, error_rate=0.0, throttle_rate=0.0, retry_after=0, fail_first=0,
+                 seed=0):
+        self.provider = provider
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.fail_first = fail_first
+        self.hits = Counter()
+        self.statuses = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without this keep-alive clients hit delayed ACKs
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stub._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _fault(self, path):
+        with self._lock:
+            self.hits[path] += 1
+            if self.hits[path] <= self.fail_first:
+                return 503
+            draw = self._random.random()
+        if draw < self.throttle_rate:
+            return 429
+        if draw < self.throttle_rate + self.error_rate:
+            return 503
+        return None
+
+    def _body(self, kind, ticker, query):
+        if kind == 'history':
+            frame = self.provider.download(ticker, query['start'], query['end'])
+            return 'text/csv', frame.to_csv().encode()
+        if kind == 'options':
+            chain = self.provider.option_chain(ticker, query['expiry'])
+            payload = {side: json.loads(getattr(chain, side).to_json(orient='records', date_format='iso'))
+                       for side in ('calls', 'puts')}
+            payload['underlying'] = {key: float(value) for key, value in chain.underlying.items()}
+            return 'application/json', json.dumps(payload).encode()
+        if kind == 'expiries':
+            return 'application/json', json.dumps(self.provider.option_expiries(ticker)).encode()
+        raise KeyError(kind)
+
+    def _handle(self, handler):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(handler.path)
+        status = self._fault(handler.path)
+        headers = {'Retry-After': str(self.retry_after)} if status == 429 else {}
+        body, content_type = b'', 'text/plain'
+        if status is None:
+            try:
+                _, kind, ticker = url.path.split('/')
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                content_type, body = self._body(kind, ticker, query)
+                status = 200
+            except (KeyError, ValueError) as e:
+                status, body = 404, str(e).encode()
+            except ConnectionError as e:
+                status, body = 503, str(e).encode()
+        with self._lock:
+            self.statuses[status] += 1
+        handler.send_response(status)
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+def synthetic_ohlcv(index, rng, start_price=100.0):
+    # Geometric random walk with plausible intraday ranges and volume
+    n = len(index)
+    close = start_price * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+    open_ = close * np.exp(rng.normal(0, 0.005, n))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, n))
+    return pd.DataFrame({
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Adj Close': close,
+        'Volume': rng.integers(1_000_000, 50_000_000, n),
+    }, index=index)
+
+
+def synthetic_chain(ticker, expiry, spot, right, rng, n_strikes=60):
+    strikes = np.round(np.linspace(spot * 0.4, spot * 2.0, n_strikes), 1)
+    last = np.maximum(spot - strikes if right == 'C' else strikes - spot, 0) + rng.uniform(0.05, 3, n_strikes)
+    expiry_code = datetime.strptime(expiry, '%Y-%m-%d').strftime('%y%m%d') if expiry else '000000'
+    return pd.DataFrame({
+        'contractSymbol': [f'{ticker}{expiry_code}{right}{round(k * 1000):08d}' for k in strikes],
+        'lastTradeDate': pd.Timestamp.now(tz='UTC').floor('min'),
+        'strike': strikes,
+        'lastPrice': last,
+        'bid': last * 0.98,
+        'ask': last * 1.02,
+        'change': rng.normal(0, 0.5, n_strikes),
+        'percentChange': rng.normal(0, 5, n_strikes),
+        'volume': rng.integers(0, 5000, n_strikes).astype(float),
+        'openInterest': rng.integers(0, 20000, n_strikes),
+        'impliedVolatility': rng.uniform(0.15, 0.9, n_strikes),
+        'inTheMoney': spot > strikes if right == 'C' else spot < strikes,
+        'contractSize': 'REGULAR',
+        'currency': 'USD',
+    })
+
+
+def synthetic_page(rows, seed=0, start=datetime(2024, 1, 1)):
+    """
+    An investing.com calendar page with rows events in the same markup as
+    the live site, one every 37 minutes from start, for offline parsing
+    benchmarks. Deterministic for a given seed.
+    """
+    rng = random.Random(seed)
+    body = []
+    for i in range(rows):
+        event_id = 500000 + i
+        when = start + timedelta(minutes=37 * i)
+        country, flag, currency = rng.choice(SYNTHETIC_CURRENCIES)
+        actual = f'{rng.uniform(-2, 5):.1f}%' if rng.random() > 0.2 else '&nbsp;'
+        body.append(
+            f'<tr id="eventRowId_{event_id}" class="js-event-item" event_attr_ID="{i}" '
+            f'data-event-datetime="{when:%Y/%m/%d %H:%M:%S}">'
+            f'<td class="first left time js-time" title="">{when:%H:%M}</td>'
+            f'<td class="left flagCur noWrap"><span title="{country}" class=" ceFlags {flag}" data-img_key="{flag}">&nbsp;</span> {currency}</td>'
+            f'<td class="left textNum sentiment noWrap" title="Moderate Volatility Expected" data-img_key="bull{rng.randint(1, 3)}">'
+            f'<i class="grayFullBullishIcon"></i><i class="grayFullBullishIcon"></i><i class="grayEmptyBullishIcon"></i></td>'
+            f'<td class="left event" title=""><a href="/economic-calendar/event-{i}" target="_blank">  {rng.choice(SYNTHETIC_EVENTS)}  </a></td>'
+            f'<td class="bold act blackFont event-{event_id}-actual" title="" id="eventActual_{event_id}">{actual}</td>'
+            f'<td class="fore event-{event_id}-forecast" id="eventForecast_{event_id}">{rng.uniform(-2, 5):.1f}%</td>'
+            f'<td class="prev blackFont event-{event_id}-previous" id="eventPrevious_{event_id}"><span title="">{rng.uniform(-2, 5):.1f}%</span></td>'
+            f'<td class="alert js-injected-user-alert-container" data-name="x" data-event-id="{event_id}"><span></span></td>'
+            f'</tr>')
+    return ('<html><body><table id="economicCalendarData"><tbody>' + ''.join(body) +
+            '</tbody></table></body></html>')
+
+
+def parse_events_bs4(page_source):
+    # The parsing loop eco_calendar.py used before calendar_parser
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(page_source, "html.parser")
+    result = []
+    for bl in soup.find_all(class_="js-event-item"):
+        event_id = bl['id'].split('_')[-1]
+        actual = bl.find(id={f"eventActual_{event_id}"})
+        forecast = bl.find(id={f"eventForecast_{event_id}"})
+        previous = bl.find(id=f"eventPrevious_{event_id}")
+        result.append({
+            'Date': pd.to_datetime(bl['data-event-datetime']).strftime('%d/%b/%Y'),
+            'Currency': bl.find(class_="left flagCur noWrap").text.split(' ')[-1],
+            'Importance': int(bl.find(class_="left textNum sentiment noWrap").get('data-img_key', '')[-1]),
+            'Event': bl.find(class_="left event").get_text(strip=True),
+            'Actual': actual.get_text(strip=True) if actual else 'NULL',
+            'Forecast': forecast.get_text(strip=True) if forecast else 'NULL',
+            'Previous': previous.get_text(strip=True) if previous else 'NULL',
+        })
+    return pd.DataFrame(result)
+
+
+def synthetic_ticks(spots, n_ticks, start, interval=0.01, seed=0):
+    """
+    n_ticks random-walk ticks spread over the tickers in spots (ticker ->
+    starting price), interval seconds apart from start, for replays and
+    benchmarks without a feed.
+    """
+    rng = np.random.default_rng(seed)
+    tickers = list(spots)
+    owner = rng.integers(0, len(tickers), n_ticks)
+    steps = rng.normal(0, 0.0005, n_ticks)
+    prices = np.empty(n_ticks)
+    for i, ticker in enumerate(tickers):
+        mine = owner == i
+        prices[mine] = spots[ticker] * np.exp(np.cumsum(steps[mine]))
+    volumes = rng.integers(1, 50, n_ticks) * 100
+    return [Tick(start + timedelta(seconds=interval * i), tickers[owner[i]], float(prices[i]), float(volumes[i]))
+            for i in range(n_ticks)]
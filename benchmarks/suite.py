@@ -0,0 +1,313 @@
+"""
+Offline benchmark suite: every hot path of the pipeline timed on synthetic
+OHLCV histories, option chains and calendar pages of a fixed size, and
+compared with the stored baseline (benchmarks/baseline.json).
+
+    python benchmarks/suite.py                          # compare with the baseline, exit 1 on a regression
+    python benchmarks/suite.py --save                   # store this run as the baseline
+    python benchmarks/suite.py --size full --only indicators calendar
+
+A case regresses when its fastest run (the least disturbed by other load)
+is more than --tolerance slower than the baseline's, and stays that slow
+when it is timed again after the whole pass, up to --confirm more times.
+Data is generated from a fixed seed per case, so runs are comparable
+across machines and case selections; timings are only comparable on the
+same machine, which is why the baseline records it.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stockinsight.data_providers import DataProvider, Options
+from fixtures import synthetic_chain, synthetic_ohlcv, synthetic_page
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+EXPIRY = '2030-01-18'
+MIN_SAMPLE_SECONDS = 0.5
+
+# Data sizes per suite size; every case reads what it needs
+SIZES = {
+    'quick': {'bars': 1_000, 'strikes': 5_000, 'chain_strikes': 200, 'calendar_rows': 1_000, 'tickers': 50,
+              'paths': 20_000, 'repeat': 5},
+    'full': {'bars': 5_000, 'strikes': 100_000, 'chain_strikes': 1_000, 'calendar_rows': 10_000, 'tickers': 500,
+             'paths': 200_000, 'repeat': 7},
+}
+
+CASES = {}
+
+
+def case(name, repeat=None):
+    """Register a case: fn(size, rng) returns (callable to time, items per call, unit)."""
+    def register(fn):
+        CASES[name] = (fn, repeat)
+        return fn
+    return register
+
+
+def history(bars, rng):
+    index = pd.bdate_range(end=pd.Timestamp('2026-01-02'), periods=bars, name='Date')
+    return synthetic_ohlcv(index, rng)
+
+
+class SuiteProvider(DataProvider):
+    """Serves one synthetic history and chain of the suite's size."""
+
+    def __init__(self, size, rng):
+        self.data = history(size['bars'], rng)
+        spot = self.data['Close'].iloc[-1]
+        self.chain = Options(calls=synthetic_chain('SYN', EXPIRY, spot, 'C', rng, n_strikes=size['chain_strikes']),
+                             puts=synthetic_chain('SYN', EXPIRY, spot, 'P', rng, n_strikes=size['chain_strikes']),
+                             underlying={'regularMarketPrice': spot})
+
+    def download(self, ticker, start, end):
+        return self.data.copy()
+
+    def option_chain(self, ticker, expiry):
+        return self.chain
+
+
+def analyzer(size, rng, indicators=True, options=False):
+    from stockinsight.stock_analyzer import StockAnalyzer
+    a = StockAnalyzer('SYN', '2000-01-01', expiry=EXPIRY, provider=SuiteProvider(size, rng))
+    a.download_data()
+    if indicators:
+        a.calculate_indicators()
+    if options:
+        a.download_option()
+    return a
+
+
+@case('indicators.compute')
+def indicators_compute(size, rng):
+    from stockinsight.indicator_engine import compute_indicators
+    data = history(size['bars'], rng)
+    return lambda: compute_indicators(data), size['bars'], 'bars'
+
+
+@case('indicators.update')
+def indicators_update(size, rng):
+    from stockinsight.indicator_engine import IndicatorState
+    data = history(size['bars'], rng)
+    bars = list(zip(*(data[col].to_numpy(dtype=float) for col in ('High', 'Low', 'Close', 'Volume'))))
+
+    def stream():
+        state = IndicatorState()
+        for bar in bars:
+            state.update(*bar)
+    return stream, size['bars'], 'bars'
+
+
+@case('indicators.panel')
+def indicators_panel(size, rng):
+    from stockinsight.screener import panel_from_frames, panel_indicators
+    bars = max(250, size['bars'] // 4)
+    panel = panel_from_frames({f'T{i:04d}': history(bars, rng) for i in range(size['tickers'])})
+    return lambda: panel_indicators(panel), size['tickers'] * bars, 'bars'
+
+
+@case('options.itm_probability')
+def options_itm_probability(size, rng):
+    from stockinsight.option_pricing import itm_probability
+    n = size['strikes']
+    K = rng.uniform(50, 150, n)
+    sigma = rng.uniform(0.1, 0.9, n)
+    option_type = np.where(rng.random(n) < 0.5, 'call', 'put')
+    return lambda: itm_probability(100.0, K, 30 / 365, sigma, option_type), n, 'strikes'
+
+
+@case('options.implied_volatility')
+def options_implied_volatility(size, rng):
+    from stockinsight.implied_vol import implied_volatility
+    from stockinsight.option_pricing import black_scholes_batch
+    n = size['strikes']
+    K = rng.uniform(60, 160, n)
+    T = rng.uniform(7, 365, n) / 365
+    option_type = np.where(K >= 100, 'call', 'put')
+    price = black_scholes_batch(100.0, K, T, rng.uniform(0.1, 0.9, n), option_type)['price']
+    return lambda: implied_volatility(price, 100.0, K, T, option_type), n, 'strikes'
+
+
+@case('options.download_option')
+def options_download_option(size, rng):
+    a = analyzer(size, rng, indicators=False)
+    return a.download_option, 2 * size['chain_strikes'], 'strikes'
+
+
+@case('options.monte_carlo')
+def options_monte_carlo(size, rng):
+    from stockinsight.monte_carlo import simulate, single_legs
+    calls = synthetic_chain('SYN', EXPIRY, 100.0, 'C', rng, n_strikes=50)
+    strategies, sigma = single_legs(calls, 'call')
+    return lambda: simulate(100.0, 30 / 365, sigma, strategies, n_paths=size['paths']), size['paths'], 'paths'
+
+
+@case('backtest.sweep')
+def backtest_sweep(size, rng):
+    from stockinsight.backtest import sweep
+    from stockinsight.screener import panel_from_frames
+    bars = max(250, size['bars'] // 4)
+    panel = panel_from_frames({f'T{i:04d}': history(bars, rng) for i in range(size['tickers'])})
+    grid = {'rsi_window': [7, 14], 'rsi_lower': [20, 30], 'rsi_upper': [70, 80]}
+    return lambda: sweep(panel, 'rsi_bands', grid, use_processes=False), 8 * size['tickers'], 'backtests'
+
+
+@case('csv.stock_to_csv')
+def csv_stock(size, rng):
+    a = analyzer(size, rng)
+    return lambda: a.stock_to_csv('suite_stock'), size['bars'], 'rows'
+
+
+@case('csv.option_to_csv')
+def csv_option(size, rng):
+    a = analyzer(size, rng, indicators=False, options=True)
+    return lambda: a.option_to_csv('suite'), len(a.calls) + len(a.puts), 'rows'
+
+
+@case('plot.chart_renderer', repeat=3)
+def plot_renderer(size, rng):
+    from stockinsight.chart_renderer import ChartRenderer
+    a = analyzer(size, rng)
+    a.renderer = ChartRenderer('small')
+    return lambda: a.plot_stock_data('suite_plot'), 1, 'charts'
+
+
+@case('plot.plot_stock_data', repeat=1)
+def plot_original(size, rng):
+    a = analyzer(size, rng)
+    return lambda: a.plot_stock_data('suite_plot'), 1, 'charts'
+
+
+@case('calendar.parse_events')
+def calendar_parse(size, rng):
+    from stockinsight.calendar_parser import parse_events
+    page = synthetic_page(size['calendar_rows'], seed=int(rng.integers(1 << 31)))
+    return lambda: parse_events(page), size['calendar_rows'], 'events'
+
+
+def run_case(name, size, repeat):
+    fn, max_repeat = CASES[name]
+    rng = np.random.default_rng(zlib.crc32(name.encode()))
+    call, items, unit = fn(size, rng)
+    # Warm-up (imports, caches, figure templates); it also sizes the loop so every sample
+    # lasts at least MIN_SAMPLE_SECONDS and millisecond cases are not dominated by noise
+    start = time.perf_counter()
+    call()
+    loops = max(1, int(MIN_SAMPLE_SECONDS / max(time.perf_counter() - start, 1e-9)))
+    times = []
+    for _ in range(min(repeat, max_repeat or repeat)):
+        start = time.perf_counter()
+        for _ in range(loops):
+            call()
+        times.append((time.perf_counter() - start) / loops)
+    return {'median': statistics.median(times), 'min': min(times), 'loops': loops, 'items': items, 'unit': unit}
+
+
+def slowdown(result, stored):
+    # Fastest run against the baseline's fastest: the least disturbed by other load on the machine
+    return result['min'] / stored['min'] - 1 if stored else float('-inf')
+
+
+def report_line(name, result, stored, tolerance):
+    rate = result['items'] / result['median']
+    line = (f"{name:<28} {result['median']:>8.4f}s {result['min']:>8.4f}s "
+            f"{rate:>14,.{0 if rate >= 100 else 2}f} {result['unit'] + '/s':<7}")
+    if stored:
+        change = slowdown(result, stored)
+        line += f" {stored['min']:>8.4f}s {change:>+8.0%}{'  REGRESSION?' if change > tolerance else ''}"
+    return line
+
+
+def environment():
+    import matplotlib
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+            'matplotlib': matplotlib.__version__, 'platform': platform.platform(), 'machine': platform.machine(),
+            'cpu_count': os.cpu_count()}
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {'environment': {}, 'sizes': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', default='quick', choices=list(SIZES))
+    parser.add_argument('--only', nargs='+', metavar='PREFIX', help='run the cases starting with these names')
+    parser.add_argument('--repeat', type=int, help='timed runs per case (default: per size)')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown vs the baseline (default: 25%%)')
+    parser.add_argument('--confirm', type=int, default=3,
+                        help='times slower cases are re-run after the pass before they count as regressions (default: 3)')
+    parser.add_argument('--save', action='store_true', help='write the results into the baseline')
+    args = parser.parse_args()
+
+    size = SIZES[args.size]
+    repeat = args.repeat or size['repeat']
+    names = [name for name in CASES if not args.only or name.startswith(tuple(args.only))]
+    baseline = load_baseline(args.baseline)
+    stored = baseline['sizes'].get(args.size, {})
+    env = environment()
+    changed = {key: (baseline['environment'].get(key), value) for key, value in env.items()
+               if baseline['environment'] and baseline['environment'].get(key) != value}
+    if changed:
+        print("Baseline was recorded on a different setup; compare with care: " +
+              ', '.join(f"{key} {old} -> {new}" for key, (old, new) in changed.items()))
+
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            print(f"{'case':<28} {'median':>9} {'min':>9} {'throughput':>22} {'base min':>9} {'change':>8}")
+            for name in names:
+                results[name] = run_case(name, size, repeat)
+                print(report_line(name, results[name], stored.get(name), args.tolerance))
+
+            # A slow phase of a shared machine can last longer than one case, so cases that look
+            # slower are timed again after the whole pass; they regress only if every run is slow
+            for attempt in range(args.confirm):
+                suspects = [name for name in names if slowdown(results[name], stored.get(name)) > args.tolerance]
+                if not suspects:
+                    break
+                print(f"Timing {len(suspects)} slower case(s) again ({attempt + 1}/{args.confirm})")
+                for name in suspects:
+                    rerun = run_case(name, size, repeat)
+                    if rerun['min'] < results[name]['min']:
+                        results[name] = rerun
+                    print(report_line(name, results[name], stored.get(name), args.tolerance))
+        finally:
+            os.chdir(cwd)
+
+    regressions = [name for name in names if slowdown(results[name], stored.get(name)) > args.tolerance]
+    if args.save:
+        baseline['environment'] = env
+        baseline['sizes'].setdefault(args.size, {}).update(
+            {name: {key: value for key, value in result.items() if key != 'loops'} for name, result in results.items()})
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline saved to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} case(s) more than {args.tolerance:.0%} slower than the baseline: "
+              f"{', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,8 +38,8 @@ for /f "tokens=1,2 delims=:" %%a in (%ec_date_file%) do (
     if "%%a"=="end_date" set ec_end_date=%%b
 )
 
-REM Run the economic calendar script
-python eco_calendar.py %ec_start_date% %ec_end_date%
+REM Run the economic calendar download
+python -m stockinsight calendar %ec_start_date% %ec_end_date%
 
 REM Deactivate the virtual environment
 conda deactivate
@@ -0,0 +1,65 @@
+"""
+Stock Insight: stock data, technical indicators, option probabilities and
+economic events.
+
+Submodules import their heavy dependencies (yfinance, ta, scipy,
+matplotlib, selenium) only when the stage that needs them runs, and the
+names below are resolved on first access, so importing the package (or
+running the CLI) stays cheap.
+"""
+import importlib
+
+_EXPORTS = {
+    'StockAnalyzer': 'stock_analyzer',
+    'run_batch': 'batch_pipeline',
+    'TickerResult': 'batch_pipeline',
+    'Profiler': 'profiling',
+    'DataProvider': 'data_providers',
+    'YahooProvider': 'data_providers',
+    'CsvProvider': 'data_providers',
+    'PriceCache': 'price_cache',
+    'AnalyticsStore': 'store',
+    'CachedProvider': 'price_cache',
+    'ResilientProvider': 'fetch',
+    'HttpProvider': 'fetch',
+    'IndicatorState': 'indicator_engine',
+    'IndicatorStore': 'indicator_engine',
+    'StreamService': 'streaming',
+    'LiveTicker': 'streaming',
+    'ReplaySource': 'streaming',
+    'PollingSource': 'streaming',
+    'ChartRenderer': 'chart_renderer',
+    'TickerSummary': 'compact',
+    'compact_chain': 'compact',
+    'compact_stock_data': 'compact',
+    'black_scholes_batch': 'option_pricing',
+    'itm_probability': 'option_pricing',
+    'ItmPricer': 'option_pricing',
+    'profit_probability': 'option_pricing',
+    'implied_volatility': 'implied_vol',
+    'VolSurface': 'implied_vol',
+    'Leg': 'monte_carlo',
+    'simulate': 'monte_carlo',
+    'fetch_surface': 'option_surface',
+    'load_surface': 'option_surface',
+    'screen': 'screener',
+    'load_panel': 'screener',
+    'backtest': 'backtest',
+    'sweep': 'backtest',
+    'parse_events': 'calendar_parser',
+    'fetch_events': 'eco_calendar',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,200 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .screener import Panel, evaluate, panel_indicators
+
+# Entry and exit expressions over the calculate_indicators columns, filled in
+# from the parameters. Without an exit the position is held while the entry
+# condition is true; with one it is held from an entry bar until an exit bar.
+STRATEGIES = {
+    'ema_cross': ('EMA{ema_window} > SMA{sma_windows[0]}', None),
+    'golden_cross': ('SMA{sma_windows[0]} > SMA{sma_windows[1]}', None),
+    'trend': ('Close > SMA{sma_windows[1]}', None),
+    'rsi_bands': ('RSI < {rsi_lower}', 'RSI > {rsi_upper}'),
+    'fib_retracement': ('Close < Fib_0_618', 'Close > Fib_0_236'),
+}
+
+# Parameters of panel_indicators; changing one means recomputing the indicators
+INDICATOR_PARAMS = {'ema_window': 24, 'sma_windows': (50, 200), 'rsi_window': 14, 'mfi_window': 14, 'fib_window': 30}
+# Parameters that only change the entry/exit thresholds
+RULE_PARAMS = {'rsi_lower': 30, 'rsi_upper': 70}
+
+METRICS = ['total_return', 'max_drawdown', 'sharpe', 'turnover', 'exposure', 'trades', 'hit_rate']
+
+
+def _rules(strategy):
+    if isinstance(strategy, str):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}'. Choose from {', '.join(STRATEGIES)}.")
+        return STRATEGIES[strategy]
+    entry, exit = strategy
+    return entry, exit
+
+
+def positions(values, entry, exit=None):
+    """
+    Long (1) / flat (0) position per bar and ticker, decided on each bar's
+    close. When entry and exit are both true on a bar, entry wins.
+    """
+    enter = evaluate(values, entry)
+    if exit is None:
+        return enter.astype(np.int8)
+    leave = evaluate(values, exit) & ~enter
+    # Every bar takes the state of the latest entry or exit bar at or before it
+    rows = np.where(enter | leave, np.arange(len(enter))[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return enter[rows, np.arange(enter.shape[1])].astype(np.int8)
+
+
+def _returns(close):
+    # Close-to-close return of each bar against the ticker's previous bar, 0 where there is none
+    rows = np.where(np.isnan(close), 0, np.arange(len(close))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    previous = np.full(close.shape, np.nan)
+    previous[1:] = close[rows, np.arange(close.shape[1])][:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = close / previous - 1
+    return np.where(np.isfinite(returns), returns, 0.0)
+
+
+def performance(close, position, cost=0.0, periods_per_year=252):
+    """
+    Metrics of holding position over close, one value per ticker (column).
+
+    A position decided on bar t earns the return of bar t + 1, so no bar
+    trades on information from its own close. cost is charged as a fraction
+    of equity on every change of position. turnover counts position
+    changes per year; hit_rate is the share of trades (entry to exit) that
+    made money.
+    """
+    returns = _returns(close)
+    held = np.zeros(close.shape)
+    held[1:] = position[:-1]
+    changes = np.abs(np.diff(held, axis=0, prepend=0.0))
+    strategy = held * returns - cost * changes
+
+    equity = np.cumprod(1 + strategy, axis=0)
+    drawdown = 1 - equity / np.maximum.accumulate(equity, axis=0)
+    bars = np.maximum((~np.isnan(close)).sum(axis=0), 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = strategy.mean(axis=0) / strategy.std(axis=0) * np.sqrt(periods_per_year)
+
+    # Trade returns: equity at each trade's last held bar over equity just before its first
+    log_equity = np.log(np.maximum(equity, 1e-300))
+    before = np.zeros(close.shape)
+    before[1:] = log_equity[:-1]
+    previous_held = np.zeros(close.shape)
+    previous_held[1:] = held[:-1]
+    next_held = np.zeros(close.shape)
+    next_held[:-1] = held[1:]
+    starts = (held == 1) & (previous_held == 0)
+    ends = (held == 1) & (next_held == 0)
+    rows = np.where(starts, np.arange(len(held))[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    trade_return = log_equity - before[rows, np.arange(held.shape[1])]
+    trades = ends.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hit_rate = (ends & (trade_return > 0)).sum(axis=0) / trades
+
+    return {
+        'total_return': equity[-1] - 1 if len(equity) else np.zeros(close.shape[1]),
+        'max_drawdown': drawdown.max(axis=0, initial=0.0),
+        'sharpe': np.where(np.isfinite(sharpe), sharpe, np.nan),
+        'turnover': changes.sum(axis=0) / bars * periods_per_year,
+        'exposure': held.sum(axis=0) / bars,
+        'trades': trades,
+        'hit_rate': hit_rate,
+    }
+
+
+def _split(params):
+    unknown = set(params) - set(INDICATOR_PARAMS) - set(RULE_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    indicator = {**INDICATOR_PARAMS, **{k: v for k, v in params.items() if k in INDICATOR_PARAMS}}
+    rule = {**RULE_PARAMS, **{k: v for k, v in params.items() if k in RULE_PARAMS}}
+    return indicator, rule
+
+
+def _run(panel, entry, exit, indicator, rule_sets, cost):
+    # Indicators once, then every rule set against them
+    values = {**panel.fields, **panel_indicators(panel, **indicator)}
+    frames = []
+    for rule in rule_sets:
+        params = {**indicator, **rule}
+        position = positions(values, entry.format(**params), exit.format(**params) if exit else None)
+        frame = pd.DataFrame(performance(panel.fields['Close'], position, cost),
+                             index=pd.Index(panel.tickers, name='Ticker'))
+        for name, value in reversed(params.items()):
+            frame.insert(0, name, [value] * len(frame))
+        frames.append(frame)
+    return pd.concat(frames)
+
+
+def backtest(panel, strategy='rsi_bands', cost=0.0, **params):
+    """
+    Backtest one strategy (a STRATEGIES name or an (entry, exit) pair of
+    expressions) on every ticker of the panel. Returns METRICS per ticker.
+    """
+    entry, exit = _rules(strategy)
+    indicator, rule = _split(params)
+    return _run(panel, entry, exit, indicator, [rule], cost)
+
+
+_panel = None
+
+
+def _init_worker(panel):
+    # Ship the panel once per worker process instead of once per task
+    global _panel
+    _panel = panel
+
+
+def _sweep_task(columns, entry, exit, indicator, rule_sets, cost):
+    panel = Panel(_panel.dates, _panel.tickers[columns],
+                  {field: np.ascontiguousarray(array[:, columns]) for field, array in _panel.fields.items()})
+    return _run(panel, entry, exit, indicator, rule_sets, cost)
+
+
+def sweep(panel, strategy, grid, cost=0.0, workers=None, chunk_size=250, use_processes=True):
+    """
+    Backtest every combination of the values in grid, e.g.
+    {'rsi_window': [7, 14, 21], 'fib_window': [20, 30, 60], 'rsi_lower': [20, 30]},
+    on every ticker of the panel.
+
+    Indicators are computed once per combination of indicator parameters
+    and chunk of chunk_size tickers; each such task evaluates all the
+    threshold parameters and runs in a pool of worker processes (in this
+    process when use_processes is False).
+
+    Returns one row per parameter combination and ticker.
+    """
+    entry, exit = _rules(strategy)
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    groups = {}
+    for combo in combos:
+        indicator, rule = _split(combo)
+        key = tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in indicator.items()))
+        groups.setdefault(key, (indicator, []))[1].append(rule)
+
+    tickers = np.array(panel.tickers)
+    panel = Panel(panel.dates, tickers, panel.fields)
+    chunks = [slice(offset, offset + chunk_size) for offset in range(0, len(tickers), chunk_size)]
+    tasks = [(columns, entry, exit, indicator, rule_sets, cost)
+             for indicator, rule_sets in groups.values() for columns in chunks]
+
+    if not use_processes:
+        _init_worker(panel)
+        frames = [_sweep_task(*task) for task in tasks]
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(panel,)) as pool:
+            frames = list(pool.map(_sweep_task, *zip(*tasks)))
+    if not frames:
+        return pd.DataFrame(columns=list(INDICATOR_PARAMS) + list(RULE_PARAMS) + METRICS)
+    return pd.concat(frames)
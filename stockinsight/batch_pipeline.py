@@ -0,0 +1,208 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+# Stage names match the StockAnalyzer methods, in the order stockBatch runs them
+DEFAULT_STAGES = ('download_data', 'calculate_indicators', 'stock_to_csv', 'plot_stock_data', 'download_option', 'option_to_csv')
+# The option surface (every expiry) is opt-in
+STAGES = DEFAULT_STAGES + ('download_option_surface', 'option_surface_to_file')
+FETCH_STAGES = ('download_data', 'download_option', 'download_option_surface')
+
+
+@dataclass
+class TickerResult:
+    ticker: str
+    status: str = 'ok'
+    error: str = None
+    failed_stage: str = None
+    timings: dict = field(default_factory=dict)
+    # Filled when run_batch gets a Profiler: StageMetrics per stage, and raw cProfile stats
+    metrics: dict = field(default_factory=dict)
+    profiles: list = field(default_factory=list, repr=False)
+
+    @property
+    def total_time(self):
+        return sum(self.timings.values())
+
+
+def _stage_args(stage, ticker):
+    return {
+        'stock_to_csv': (f"{ticker}_stock_data",),
+        'plot_stock_data': (f"{ticker}_stock_data_plot",),
+        'option_to_csv': (ticker,),
+    }.get(stage, ())
+
+
+def _fail(result, stage, exc):
+    # Keep the first failure; later stages are skipped anyway
+    if result.status == 'ok':
+        result.status = 'error'
+        result.failed_stage = stage
+        result.error = f"{type(exc).__name__}: {exc}"
+
+
+def _run_stage(analyzer, result, stage, profiler=None):
+    start = time.perf_counter()
+    try:
+        method = getattr(analyzer, stage)
+        args = _stage_args(stage, analyzer.ticker)
+        if profiler is not None:
+            profiler.run(analyzer, stage, lambda: method(*args), result)
+        else:
+            method(*args)
+        return True
+    except Exception as e:
+        _fail(result, stage, e)
+        return False
+    finally:
+        result.timings[stage] = time.perf_counter() - start
+
+
+def _fetch(analyzer, result, stages, profiler=None):
+    # Network-bound stages, run in the thread pool
+    if not _run_stage(analyzer, result, 'download_data', profiler):
+        return analyzer, result
+    for stage in ('download_option', 'download_option_surface'):
+        if stage in stages:
+            _run_stage(analyzer, result, stage, profiler)
+    return analyzer, result
+
+
+def _compute(analyzer, result, stages, profiler=None):
+    # CPU-bound stages, run in the process pool. Only the result travels back.
+    for stage in stages:
+        if stage in FETCH_STAGES:
+            continue
+        if stage == 'option_to_csv' and analyzer.option_chain is None:
+            continue
+        if stage == 'option_surface_to_file' and analyzer.option_surface is None:
+            continue
+        if not _run_stage(analyzer, result, stage, profiler):
+            break
+    if analyzer.renderer is not None and analyzer.renderer.mode == 'background':
+        # Let the chart render while the remaining stages ran, but report it with this ticker
+        start = time.perf_counter()
+        try:
+            analyzer.renderer.wait()
+        except Exception as e:
+            _fail(result, 'plot_stock_data', e)
+        result.timings['plot_wait'] = time.perf_counter() - start
+    return result
+
+
+def _init_worker():
+    # Worker processes never show windows; make sure pyplot renders off-screen
+    # without importing matplotlib in runs that never plot
+    os.environ['MPLBACKEND'] = 'Agg'
+
+
+def run_batch(tickers, start_date, end_date=None, expiry=None, provider=None, stages=DEFAULT_STAGES,
+              io_workers=8, cpu_workers=None, max_in_flight=None, use_processes=True, bulk=True,
+              cache=None, renderer=None, iv_source='yahoo', compact=False, rate_limit=None, retries=3,
+              profiler=None, store=None):
+    """
+    Concurrent version of StockAnalyzer.stockBatch.
+
+    Downloads run in a pool of io_workers threads while indicators, CSV
+    output and plotting run in a pool of cpu_workers processes (a single
+    thread when use_processes is False, since pyplot is not thread-safe).
+    At most max_in_flight tickers are held in memory at once; the next one
+    is only fetched when an earlier one finishes. With bulk, prices for the
+    whole batch are fetched in one grouped request before the pools start, so
+    download_data only picks up its ticker's frame. Passing a PriceCache
+    limits downloads to the bars missing from disk and lets indicators
+    resume from their saved state. A ChartRenderer replaces the per-ticker
+    figure with a reused template in every CPU worker. iv_source 'mid' or
+    'smoothed' recomputes option IVs from bid/ask mids (see StockAnalyzer).
+    compact keeps every ticker's frames in float32 with per-ticker constants
+    as metadata. Option chains and surfaces are compacted as they are
+    fetched; price frames only once calculate_indicators has run on the
+    float64 bars in the CPU worker, so they are pickled at full size.
+    Every request to the provider is capped at rate_limit per second and
+    retried up to retries times with jittered backoff, and duplicate
+    requests in flight are merged (see fetch.ResilientProvider). A
+    profiling.Profiler adds CPU time, peak memory and rows to every stage's
+    wall time (TickerResult.metrics) and can cProfile the slowest tickers.
+    With a store.AnalyticsStore, stock_to_csv and option_to_csv also append
+    their rows to it from the CPU workers.
+
+    Returns one TickerResult per ticker, in input order, carrying status,
+    error message and per-stage wall times instead of printing them.
+    """
+    # Imported here so the stage names above can be read without loading pandas
+    from .data_providers import YahooProvider, prefetch
+    from .fetch import resilient
+    from .price_cache import CachedProvider
+    from .indicator_engine import IndicatorStore
+    from .stock_analyzer import StockAnalyzer
+
+    cpu_workers = cpu_workers or os.cpu_count() or 1
+    if not use_processes:
+        cpu_workers = 1
+    max_in_flight = max_in_flight or 2 * (io_workers + cpu_workers)
+    stages = tuple(stage for stage in STAGES if stage in stages)
+    provider = resilient(provider if provider else YahooProvider(pool_size=io_workers), rate_limit, retries)
+    indicator_store = None
+    if cache is not None:
+        provider = CachedProvider(provider, cache)
+        indicator_store = IndicatorStore(cache)
+    if bulk:
+        provider = prefetch(provider, tickers, start_date, end_date)
+
+    results = [None] * len(tickers)
+    pending = iter(enumerate(tickers))
+    running = {}
+
+    if use_processes:
+        cpu_pool = ProcessPoolExecutor(cpu_workers, initializer=_init_worker)
+    else:
+        cpu_pool = ThreadPoolExecutor(cpu_workers)
+
+    with ThreadPoolExecutor(io_workers) as io_pool, cpu_pool:
+        def submit_next():
+            idx, ticker = next(pending, (None, None))
+            if idx is None:
+                return False
+            result = TickerResult(ticker)
+            try:
+                analyzer = StockAnalyzer(ticker, start_date, end_date, expiry, provider, indicator_store, renderer,
+                                         iv_source, compact, store)
+            except Exception as e:
+                _fail(result, 'init', e)
+                results[idx] = result
+                return True
+            running[io_pool.submit(_fetch, analyzer, result, stages, profiler)] = (idx, result)
+            return True
+
+        while len(running) < max_in_flight and submit_next():
+            pass
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx, result = running.pop(future)
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    # Only reached if the pool itself broke (e.g. a worker process died)
+                    _fail(result, 'compute', e)
+                    results[idx] = result
+                    continue
+
+                if isinstance(outcome, TickerResult):
+                    results[idx] = outcome
+                elif result.failed_stage == 'download_data':
+                    results[idx] = result
+                else:
+                    analyzer, result = outcome
+                    # The provider may hold the whole batch's prices; workers don't need it
+                    analyzer.provider = None
+                    running[cpu_pool.submit(_compute, analyzer, result, stages, profiler)] = (idx, result)
+
+            while len(running) < max_in_flight and submit_next():
+                pass
+
+    if profiler is not None and profiler.profile_top:
+        profiler.write_profiles(results)
+    return results
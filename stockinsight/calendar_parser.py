@@ -0,0 +1,69 @@
+import pandas as pd
+
+EVENT_COLUMNS = ['Date', 'Currency', 'Importance', 'Event', 'Actual', 'Forecast', 'Previous']
+# How event dates are written to the calendar CSV
+DATE_FORMAT = '%d/%b/%Y'
+# Cell id prefix -> output column, for the value cells of a row
+VALUE_CELLS = {'eventActual': 'Actual', 'eventForecast': 'Forecast', 'eventPrevious': 'Previous'}
+
+
+def _text(element):
+    # Same as BeautifulSoup's get_text(strip=True): strip every text node, then join
+    return ''.join(piece.strip() for piece in element.itertext())
+
+
+def parse_events(page_source, date_format=DATE_FORMAT):
+    """
+    Parse the economic calendar rows ('js-event-item') of a full page or of
+    the row fragment returned by the calendar service into a DataFrame with
+    EVENT_COLUMNS. Dates are formatted with date_format; with None they stay
+    full event timestamps (datetime64), as the analytics store keeps them.
+
+    Rows are found with a single XPath query and each row's cells are read
+    in one pass into per-column lists; the event dates are converted with
+    one vectorized pd.to_datetime call at the end.
+    """
+    import lxml.html
+
+    rows = []
+    if page_source and page_source.strip():
+        if '<table' not in page_source:
+            # Bare <tr> rows need a table around them to survive HTML parsing
+            page_source = f'<table>{page_source}</table>'
+        root = lxml.html.fromstring(page_source)
+        rows = root.xpath("//tr[contains(concat(' ', normalize-space(@class), ' '), ' js-event-item ')]")
+
+    columns = {name: [] for name in EVENT_COLUMNS}
+    for row in rows:
+        currency, importance, event = '', 0, ''
+        values = {'Actual': 'NULL', 'Forecast': 'NULL', 'Previous': 'NULL'}
+        for cell in row.iter('td'):
+            prefix = (cell.get('id') or '').split('_')[0]
+            if prefix in VALUE_CELLS:
+                values[VALUE_CELLS[prefix]] = _text(cell)
+                continue
+            classes = (cell.get('class') or '').split()
+            if 'flagCur' in classes:
+                # Currency code follows the flag, e.g. '\xa0 USD'
+                currency = cell.text_content().split(' ')[-1]
+            elif 'sentiment' in classes:
+                # 'bull1'/'bull2'/'bull3' cleaned as INT (1,2,3)
+                key = cell.get('data-img_key', '')
+                importance = int(key[-1]) if key[-1:].isdigit() else 0
+            elif 'event' in classes:
+                event = _text(cell)
+
+        columns['Date'].append(row.get('data-event-datetime'))
+        columns['Currency'].append(currency)
+        columns['Importance'].append(importance)
+        columns['Event'].append(event)
+        for name, value in values.items():
+            columns[name].append(value)
+
+    # Typed columns, so a page without events gives the same dtypes as any other
+    columns = {name: pd.Series(values, dtype=object) for name, values in columns.items()}
+    columns['Importance'] = columns['Importance'].astype('int64')
+    # One vectorized conversion for every row, then formatted (as '%d/%b/%Y' by default)
+    dates = pd.to_datetime(columns['Date'])
+    columns['Date'] = dates.dt.strftime(date_format) if date_format else dates
+    return pd.DataFrame(columns)
@@ -0,0 +1,249 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# (figsize in inches, dpi). 'full' matches the original plot_stock_data output.
+PRESETS = {
+    'full': ((40, 28), 100),
+    'medium': ((20, 14), 80),
+    'small': ((12, 8), 72),
+}
+FIB_RATIOS = [1.0, 0.786, 0.618, 0.5, 0.382, 0.236, 0]
+FIB_COLORS = ['red', 'orange', 'olivedrab', 'green', 'blue', 'purple', 'brown']
+CANDLE_WIDTH = 0.6
+
+# Templates are not thread-safe, so every thread (and process) builds its own
+_local = threading.local()
+_background = None
+_background_lock = threading.Lock()
+
+
+def _background_executor():
+    # One render thread per process, shared by every ChartRenderer
+    global _background
+    with _background_lock:
+        if _background is None:
+            _background = ThreadPoolExecutor(1, thread_name_prefix='chart')
+        return _background
+
+
+def get_template(figsize, dpi):
+    templates = getattr(_local, 'templates', None)
+    if templates is None:
+        templates = _local.templates = {}
+    key = (tuple(figsize), dpi)
+    if key not in templates:
+        templates[key] = ChartTemplate(figsize, dpi)
+    return templates[key]
+
+
+class ChartTemplate:
+    """
+    Pre-built three-panel figure with the same layout as plot_stock_data.
+
+    Every artist is created once; draw() swaps in a new ticker's data by
+    updating collections, lines and texts in place. Candles are a single
+    PolyCollection of bodies plus a LineCollection of wicks instead of one
+    patch per bar. Uses the object-oriented Figure API, so no pyplot state
+    is involved.
+    """
+
+    def __init__(self, figsize, dpi):
+        import matplotlib.dates as mdates
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.collections import LineCollection, PolyCollection
+        from matplotlib.figure import Figure
+
+        self.dpi = dpi
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        ax1, ax2, ax3 = self.fig.subplots(3, 1, gridspec_kw={'height_ratios': [4, 1, 1]})
+        self.axes = (ax1, ax2, ax3)
+        self._laid_out = False
+        note_style = dict(xytext=(14, 20), textcoords='offset points', fontsize=16, color='red',
+                          bbox=dict(facecolor='white', edgecolor='red', boxstyle='round'))
+
+        # Price panel
+        self.wicks = ax1.add_collection(LineCollection([], linewidths=1))
+        self.bodies = ax1.add_collection(PolyCollection([], linewidths=0.5))
+        self.averages = {name: ax1.plot([], [], label=name, linestyle='--')[0] for name in ('EMA24', 'SMA50', 'SMA200')}
+        self.fib_lines = []
+        self.fib_texts = []
+        for ratio, color in zip(FIB_RATIOS, FIB_COLORS):
+            self.fib_lines.append(ax1.axhline(y=0, label=f'Fibonacci Retracement {ratio*100:.1f}%', color=color, linestyle=':'))
+            self.fib_texts.append(ax1.text(0, 0, '', fontsize=16, color=color, va='center', ha='right',
+                                           bbox=dict(facecolor='white', edgecolor=color, boxstyle='round')))
+        self.price_marker = ax1.plot([], [], marker='o', markersize=8, color='red')[0]
+        self.price_note = ax1.annotate('', xy=(0, 0), **note_style)
+        ax1.set_ylabel('Price')
+        ax1.legend(loc='upper left')
+
+        # RSI panel
+        self.rsi_line = ax2.plot([], [], label='RSI', color='purple')[0]
+        ax2.axhline(y=70, color='red', linestyle='--', label='Overbought')
+        ax2.axhline(y=30, color='green', linestyle='--', label='Oversold')
+        self.rsi_fills = []
+        self.rsi_marker = ax2.plot([], [], marker='o', markersize=8, color='red')[0]
+        self.rsi_note = ax2.annotate('', xy=(0, 0), **note_style)
+        ax2.set_ylabel('RSI')
+        ax2.set_ylim(0, 100)
+        ax2.legend(loc='upper left')
+
+        # Volume panel
+        self.volume_bars = ax3.add_collection(PolyCollection([], facecolors='gray'))
+        self.volume_line = ax3.plot([], [], color='blue')[0]
+        self.volume_marker = ax3.plot([], [], marker='o', markersize=8, color='red')[0]
+        self.volume_note = ax3.annotate('', xy=(0, 0), **note_style)
+        ax3.set_ylabel('Volume')
+        ax3.tick_params(axis='x', labelrotation=45)
+
+        for ax in self.axes:
+            ax.grid(True)
+            ax.xaxis.set_major_locator(mdates.MonthLocator())
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%m %Y'))
+
+    def draw(self, ticker, x, open_, high, low, close, volume, averages, rsi, fib_levels):
+        ax1, ax2, ax3 = self.axes
+        half = CANDLE_WIDTH / 2
+        left, right = x - half, x + half
+        up = close >= open_
+        colors = np.where(up[:, None], np.array([[0, 0.5, 0, 1]]), np.array([[1, 0, 0, 1]]))
+
+        self.wicks.set_segments(np.stack([np.column_stack([x, low]), np.column_stack([x, high])], axis=1))
+        self.wicks.set_color(colors)
+        self.bodies.set_verts(np.stack([np.column_stack([left, open_]), np.column_stack([left, close]),
+                                        np.column_stack([right, close]), np.column_stack([right, open_])], axis=1))
+        self.bodies.set_facecolor(colors)
+        self.bodies.set_edgecolor(colors)
+        for name, line in self.averages.items():
+            line.set_data(x, averages[name])
+
+        label_x = x[-29] if len(x) >= 29 else x[0]
+        for ratio, line, text in zip(FIB_RATIOS, self.fib_lines, self.fib_texts):
+            level = fib_levels[f'Fib_{ratio}']
+            line.set_ydata([level, level])
+            text.set_position((label_x, level))
+            text.set_text(f'{level:.2f}')
+
+        last_x = x[-1]
+        last_date = _num2date(last_x)
+        self.price_marker.set_data([last_x], [close[-1]])
+        self.price_note.xy = (last_x, close[-1])
+        self.price_note.set_text(f'Date: {last_date}\nLast Close: {close[-1]:.2f}')
+        ax1.set_title(f'Stock Data and Indicators for {ticker}')
+        levels = list(fib_levels.values())
+        price_low, price_high = min(np.nanmin(low), *levels), max(np.nanmax(high), *levels)
+        pad = (price_high - price_low) * 0.05 or 1.0
+        ax1.set_ylim(price_low - pad, price_high + pad)
+
+        self.rsi_line.set_data(x, rsi)
+        for fill in self.rsi_fills:
+            fill.remove()
+        self.rsi_fills = [
+            ax2.fill_between(x, rsi, 70, where=(rsi >= 70), alpha=0.5, color='red'),
+            ax2.fill_between(x, rsi, 30, where=(rsi <= 30), alpha=0.5, color='green'),
+        ]
+        self.rsi_marker.set_data([last_x], [rsi[-1]])
+        self.rsi_note.xy = (last_x, rsi[-1])
+        self.rsi_note.set_text(f'Date: {last_date}\nLast RSI: {rsi[-1]:.2f}')
+
+        zeros = np.zeros_like(volume)
+        self.volume_bars.set_verts(np.stack([np.column_stack([left, zeros]), np.column_stack([left, volume]),
+                                             np.column_stack([right, volume]), np.column_stack([right, zeros])], axis=1))
+        self.volume_line.set_data(x, volume)
+        self.volume_marker.set_data([last_x], [volume[-1]])
+        self.volume_note.xy = (last_x, volume[-1])
+        self.volume_note.set_text(f'Date: {last_date}\nLast Volume: {volume[-1]:.2f}')
+        ax3.set_ylim(0, np.nanmax(volume) * 1.1 if len(volume) else 1)
+
+        for ax in self.axes:
+            ax.set_xlim(x[0], x[-1])
+
+        # The layout only depends on fonts and labels, so work it out once
+        if not self._laid_out:
+            self.fig.tight_layout()
+            self._laid_out = True
+
+    def save(self, path):
+        self.fig.savefig(path, dpi=self.dpi)
+
+
+def _num2date(x):
+    import matplotlib.dates as mdates
+    return mdates.num2date(x).strftime('%Y-%m-%d')
+
+
+def chart_arrays(stock_data):
+    """Pull the plotted columns out of stock_data as plain arrays (safe to hand to another thread)."""
+    import matplotlib.dates as mdates
+    import pandas as pd
+
+    def column(name):
+        return stock_data[name].to_numpy(dtype=float, copy=True)
+
+    return {
+        'x': mdates.date2num(pd.DatetimeIndex(stock_data.index).to_numpy()),
+        'open_': column('Open'),
+        'high': column('High'),
+        'low': column('Low'),
+        'close': column('Close'),
+        'volume': column('Volume'),
+        'averages': {name: column(name) for name in ('EMA24', 'SMA50', 'SMA200')},
+        'rsi': column('RSI'),
+        # Compact frames keep the levels in attrs instead of constant columns
+        'fib_levels': {f'Fib_{ratio}': float(stock_data[f'Fib_{ratio}'].iloc[-1]) if f'Fib_{ratio}' in stock_data.columns
+                       else stock_data.attrs['fib_levels'][f'Fib_{ratio}'] for ratio in FIB_RATIOS},
+    }
+
+
+class ChartRenderer:
+    """
+    Fast replacement for plot_stock_data's rendering.
+
+    preset picks the figure size and DPI from PRESETS (dpi overrides it).
+    mode is 'sync' to render immediately, 'background' to hand the chart to
+    a render thread and return straight away (call wait() before relying on
+    the files), or 'skip' to not render at all.
+
+    Only the configuration is pickled, so a renderer can be sent to worker
+    processes; each process and thread reuses its own ChartTemplate.
+    """
+
+    def __init__(self, preset='full', dpi=None, mode='sync'):
+        if preset not in PRESETS:
+            raise ValueError(f"Unknown chart preset '{preset}'. Choose from {', '.join(PRESETS)}.")
+        if mode not in ('sync', 'background', 'skip'):
+            raise ValueError(f"Unknown render mode '{mode}'. Use 'sync', 'background' or 'skip'.")
+        self.preset = preset
+        self.figsize, default_dpi = PRESETS[preset]
+        self.dpi = dpi if dpi else default_dpi
+        self.mode = mode
+        self._pending = []
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_pending'] = []
+        return state
+
+    def _draw(self, ticker, arrays, path):
+        template = get_template(self.figsize, self.dpi)
+        template.draw(ticker, **arrays)
+        template.save(path)
+
+    def render(self, ticker, stock_data, path):
+        if self.mode == 'skip':
+            return
+        arrays = chart_arrays(stock_data)
+        if self.mode == 'background':
+            self._pending.append(_background_executor().submit(self._draw, ticker, arrays, path))
+        else:
+            self._draw(ticker, arrays, path)
+
+    def wait(self):
+        """Block until every background chart is written; re-raises the first rendering error."""
+        pending, self._pending = self._pending, []
+        errors = [future.exception() for future in pending]
+        errors = [error for error in errors if error is not None]
+        if errors:
+            raise errors[0]
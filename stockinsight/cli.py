@@ -0,0 +1,311 @@
+import argparse
+import calendar
+import sys
+from datetime import date
+
+from .batch_pipeline import DEFAULT_STAGES, STAGES
+
+# Shorthands accepted by --stages next to the individual stage names
+STAGE_GROUPS = {
+    'default': DEFAULT_STAGES,
+    'all': STAGES,
+    'csv': ('download_data', 'calculate_indicators', 'stock_to_csv'),
+    'options': ('download_data', 'download_option', 'option_to_csv'),
+    'surface': ('download_data', 'download_option_surface', 'option_surface_to_file'),
+}
+
+
+def get_third_friday(year=None, month=None):
+    if year is None or month is None:
+        # If no specific date is provided, use the current month
+        today = date.today()
+        year = today.year
+        month = today.month
+    else:
+        # Ensure year and month are integers
+        year = int(year)
+        month = int(month)
+
+    # Create a calendar object
+    c = calendar.Calendar(firstweekday=calendar.SUNDAY)
+
+    # Get all the days in the month
+    month_days = c.itermonthdates(year, month)
+
+    # Find all Fridays in the month
+    fridays = [day for day in month_days if day.weekday() == calendar.FRIDAY and day.month == month]
+
+    # Get the third Friday
+    third_friday = fridays[2] if len(fridays) >= 3 else None
+
+    if third_friday:
+        return third_friday.isoformat()
+    else:
+        return None
+
+
+def read_tickers(path):
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def stage_name(name):
+    # argparse type for --stages, so an unknown name is a usage error
+    if name not in STAGE_GROUPS and name not in STAGES:
+        raise argparse.ArgumentTypeError(
+            f"unknown stage '{name}', choose from {', '.join(list(STAGE_GROUPS) + list(STAGES))}")
+    return name
+
+
+def resolve_stages(names):
+    stages = set()
+    for name in names:
+        stages.update(STAGE_GROUPS.get(name, (name,)))
+    return tuple(stage for stage in STAGES if stage in stages)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='stockinsight',
+                                     description='Stock data, indicators, option probabilities and economic events.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    analyze = commands.add_parser('analyze', help='run the stock/option pipeline for a list of tickers')
+    analyze.add_argument('--tickers-file', default='tickers.txt', help='one ticker per line (default: tickers.txt)')
+    analyze.add_argument('--tickers', nargs='+', help='tickers to analyze instead of --tickers-file')
+    analyze.add_argument('--start', default='2023-06-01', help='first date of price history (default: 2023-06-01)')
+    analyze.add_argument('--end', help='end date, exclusive (default: today)')
+    expiry = analyze.add_mutually_exclusive_group()
+    expiry.add_argument('--expiry', help='option expiry date YYYY-MM-DD (default: third Friday of this month)')
+    expiry.add_argument('--expiry-month', metavar='YYYY-MM', help='use the third Friday of this month as expiry')
+    analyze.add_argument('--stages', nargs='+', type=stage_name, default=['default'], metavar='STAGE',
+                         help=f"stages or groups to run: {', '.join(STAGE_GROUPS)} or any of {', '.join(STAGES)}")
+    analyze.add_argument('--iv-source', default='yahoo', choices=['yahoo', 'mid', 'smoothed'],
+                         help="option IVs as quoted by Yahoo, re-solved from bid/ask mids, or a smoothed fit")
+    analyze.add_argument('--compact', action='store_true',
+                         help='hold prices and chains as float32 with per-ticker constants stored once')
+    analyze.add_argument('--no-cache', action='store_true', help='always download the full history')
+    analyze.add_argument('--store', default='data/analytics.db',
+                         help='SQLite analytics store the CSV stages also append to (default: data/analytics.db)')
+    analyze.add_argument('--no-store', action='store_true', help='only write the CSV files')
+    analyze.add_argument('--no-bulk', action='store_true', help='one price request per ticker instead of one per batch')
+    analyze.add_argument('--chart-preset', help='render charts with a reused template: full, medium or small')
+    analyze.add_argument('--chart-mode', default='sync', choices=['sync', 'background', 'skip'],
+                         help='with --chart-preset: render now, in a background thread, or not at all')
+    analyze.add_argument('--chart-dpi', type=int, help='override the preset DPI')
+    analyze.add_argument('--rate-limit', type=float, default=5.0,
+                         help='maximum requests per second to Yahoo (default: 5; 0 for no limit)')
+    analyze.add_argument('--retries', type=int, default=3,
+                         help='retries with jittered exponential backoff for throttled or failed requests (default: 3)')
+    analyze.add_argument('--metrics', metavar='PATH',
+                         help='record wall/CPU time, peak memory and rows per stage; JSON lines, or Prometheus text '
+                              'for a .prom path')
+    analyze.add_argument('--trace-memory', action='store_true',
+                         help="with --metrics: each stage's own allocation peak via tracemalloc (slow)")
+    analyze.add_argument('--profile-top', type=int, default=0, metavar='N',
+                         help='cProfile every stage and keep the profiles of the N slowest tickers')
+    analyze.add_argument('--profile-dir', default='data/profiles', help='where --profile-top writes (default: data/profiles)')
+    analyze.add_argument('--io-workers', type=int, default=8, help='concurrent downloads (default: 8)')
+    analyze.add_argument('--cpu-workers', type=int, help='processes for indicators/CSV/plots (default: CPU count)')
+    analyze.add_argument('--threads', action='store_true', help='run CPU stages in a thread instead of processes')
+
+    screener = commands.add_parser('screen', help='filter cached tickers with an indicator expression')
+    screener.add_argument('expression', help="e.g. 'RSI < 30 and Close > SMA200' (write Fib_0.618 as Fib_0_618)")
+    screener.add_argument('--tickers-file', help='one ticker per line (default: every ticker in the cache)')
+    screener.add_argument('--tickers', nargs='+', help='tickers to screen instead of --tickers-file')
+    screener.add_argument('--cache-root', default='data', help='price cache directory (default: data)')
+    screener.add_argument('--rank-by', help='column to sort the matches by')
+    screener.add_argument('--descending', action='store_true', help='sort --rank-by from high to low')
+    screener.add_argument('--limit', type=int, help='keep only the first N matches')
+    screener.add_argument('--start', help='ignore cached bars before this date')
+    screener.add_argument('--as-of', help='screen the latest bar on or before this date (default: latest)')
+    screener.add_argument('--chunk-size', type=int, default=250, help='tickers loaded at a time (default: 250)')
+
+    stream = commands.add_parser('stream', help='keep indicators and ITM probabilities updated from a price feed '
+                                                'and serve them over a local HTTP API')
+    stream.add_argument('--tickers-file', default='tickers.txt', help='one ticker per line (default: tickers.txt)')
+    stream.add_argument('--tickers', nargs='+', help='tickers to stream instead of --tickers-file')
+    stream.add_argument('--start', default='2023-06-01', help='first date of price history (default: 2023-06-01)')
+    expiry = stream.add_mutually_exclusive_group()
+    expiry.add_argument('--expiry', help='option expiry date YYYY-MM-DD (default: third Friday of this month)')
+    expiry.add_argument('--expiry-month', metavar='YYYY-MM', help='use the third Friday of this month as expiry')
+    stream.add_argument('--iv-source', default='yahoo', choices=['yahoo', 'mid', 'smoothed'],
+                        help="option IVs as quoted by Yahoo, re-solved from bid/ask mids, or a smoothed fit")
+    stream.add_argument('--replay', metavar='PATH', help='replay ticks from a CSV of time,ticker,price,volume '
+                                                        'instead of polling Yahoo')
+    stream.add_argument('--speed', type=float,
+                        help='with --replay: 1 keeps the recorded spacing, 10 is ten times faster (default: no pauses)')
+    stream.add_argument('--poll-interval', type=float, default=15.0,
+                        help='seconds between Yahoo polls without --replay (default: 15)')
+    stream.add_argument('--host', default='127.0.0.1', help='address the API listens on (default: 127.0.0.1)')
+    stream.add_argument('--port', type=int, default=8765, help='API port (default: 8765)')
+    stream.add_argument('--keep-serving', action='store_true', help='keep the API up after a replay ends')
+    stream.add_argument('--rate-limit', type=float, default=5.0,
+                        help='maximum requests per second to Yahoo (default: 5; 0 for no limit)')
+    stream.add_argument('--retries', type=int, default=3, help='retries for throttled or failed requests (default: 3)')
+    stream.add_argument('--io-workers', type=int, default=8, help='concurrent downloads while loading (default: 8)')
+
+    eco = commands.add_parser('calendar', help='download economic calendar events to CSV')
+    eco.add_argument('start_date', help='MM-DD-YYYY')
+    eco.add_argument('end_date', help='MM-DD-YYYY')
+    eco.add_argument('--selenium', action='store_true', help='scrape with Chrome instead of the direct HTTP fetch')
+    eco.add_argument('--no-store', action='store_true', help='only write the CSV file, not the analytics store')
+
+    query = commands.add_parser('query', help='query the analytics store')
+    query.add_argument('sql', nargs='?', help='a SELECT over the prices, options and events tables')
+    query.add_argument('--store', default='data/analytics.db', help='analytics store (default: data/analytics.db)')
+    query.add_argument('--iv-around-events', action='store_true',
+                       help='mean near-the-money IV per ticker and chain date around economic events')
+    query.add_argument('--tickers', nargs='+', help='with --iv-around-events: only these tickers')
+    query.add_argument('--currency', default='USD', help='with --iv-around-events: event currency (default: USD)')
+    query.add_argument('--importance', type=int, default=3,
+                       help='with --iv-around-events: minimum importance, 1-3 (default: 3)')
+    query.add_argument('--days', type=int, default=3, help='with --iv-around-events: days before/after (default: 3)')
+    query.add_argument('--start', help='with --iv-around-events: first event date')
+    query.add_argument('--end', help='with --iv-around-events: end of the event range, exclusive')
+    return parser
+
+
+def resolve_expiry(args):
+    if args.expiry:
+        return args.expiry
+    if args.expiry_month:
+        year, month = args.expiry_month.split('-')
+        return get_third_friday(year, month)
+    return get_third_friday()
+
+
+def run_analyze(args):
+    from .batch_pipeline import run_batch
+
+    tickers = args.tickers if args.tickers else read_tickers(args.tickers_file)
+    expiry = resolve_expiry(args)
+    stages = resolve_stages(args.stages)
+
+    cache = None
+    if not args.no_cache:
+        from .price_cache import PriceCache
+        cache = PriceCache()
+    from .data_providers import YahooProvider
+    from .fetch import resilient
+    provider = resilient(YahooProvider(pool_size=args.io_workers), args.rate_limit or None, args.retries)
+    store = None
+    if not args.no_store:
+        from .store import AnalyticsStore
+        store = AnalyticsStore(args.store)
+    renderer = None
+    if args.chart_preset:
+        from .chart_renderer import ChartRenderer
+        renderer = ChartRenderer(args.chart_preset, dpi=args.chart_dpi, mode=args.chart_mode)
+
+    profiler = None
+    if args.metrics or args.profile_top:
+        from .profiling import Profiler
+        profiler = Profiler(trace_memory=args.trace_memory, profile_top=args.profile_top,
+                            profile_dir=args.profile_dir)
+
+    print(f"Using expiry date: {expiry}")
+    results = run_batch(tickers, args.start, args.end, expiry, provider, stages=stages, io_workers=args.io_workers,
+                        cpu_workers=args.cpu_workers, use_processes=not args.threads, bulk=not args.no_bulk,
+                        cache=cache, renderer=renderer, iv_source=args.iv_source,
+                        compact=args.compact, profiler=profiler, store=store)
+    for result in results:
+        timings = ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in result.timings.items())
+        if result.status == 'ok':
+            print(f"Analysis completed for {result.ticker} ({timings})")
+        else:
+            print(f"Error processing {result.ticker} at {result.failed_stage}: {result.error}")
+    if cache is not None:
+        print(cache.report())
+    if hasattr(provider, 'report'):
+        print(provider.report())
+    if store is not None:
+        print(store.report())
+    if profiler is not None:
+        from .profiling import summarize, write_metrics
+        print(summarize(results))
+        if args.metrics:
+            print(f"Stage metrics written to {write_metrics(results, args.metrics)}")
+        if args.profile_top:
+            print(f"Profiles of the {args.profile_top} slowest tickers written to {args.profile_dir}")
+    return 0 if all(result.status == 'ok' for result in results) else 1
+
+
+def run_screen(args):
+    from .price_cache import PriceCache
+    from .screener import screen
+
+    cache = PriceCache(args.cache_root)
+    if args.tickers:
+        tickers = args.tickers
+    elif args.tickers_file:
+        tickers = read_tickers(args.tickers_file)
+    else:
+        tickers = cache.tickers()
+    result = screen(cache, tickers, args.expression, rank_by=args.rank_by, ascending=not args.descending,
+                    limit=args.limit, start=args.start, as_of=args.as_of, chunk_size=args.chunk_size)
+    print(result.to_string() if not result.empty else 'No matches.')
+    if result.attrs['missing']:
+        print(f"Not cached: {', '.join(result.attrs['missing'])}")
+    return 0
+
+
+def run_stream(args):
+    import asyncio
+    from .data_providers import YahooProvider
+    from .fetch import resilient
+    from .streaming import PollingSource, ReplaySource, StreamService, load
+
+    tickers = args.tickers if args.tickers else read_tickers(args.tickers_file)
+    expiry = resolve_expiry(args)
+    provider = resilient(YahooProvider(pool_size=args.io_workers), args.rate_limit or None, args.retries)
+    print(f"Using expiry date: {expiry}")
+    live, errors = load(tickers, provider, args.start, expiry, iv_source=args.iv_source, io_workers=args.io_workers)
+    for ticker, error in errors.items():
+        print(f"Not streaming {ticker}: {error}")
+    if not live:
+        return 1
+    source = ReplaySource(args.replay, args.speed) if args.replay else PollingSource(provider, live, args.poll_interval)
+    service = StreamService(live, source, host=args.host, port=args.port)
+    print(f"Streaming {len(live)} tickers; snapshots at http://{args.host}:{args.port}/snapshot")
+    try:
+        asyncio.run(service.run(keep_serving=args.keep_serving))
+    except KeyboardInterrupt:
+        pass
+    print(service.report())
+    return 0
+
+
+def run_calendar(args):
+    from .eco_calendar import main as calendar_main
+    calendar_main([args.start_date, args.end_date] + (['--selenium'] if args.selenium else []) +
+                  (['--no-store'] if args.no_store else []))
+    return 0
+
+
+def run_query(args):
+    from .store import AnalyticsStore
+
+    if not args.sql and not args.iv_around_events:
+        print("Give a SELECT statement or --iv-around-events.")
+        return 2
+    with AnalyticsStore(args.store) as store:
+        if args.iv_around_events:
+            result = store.iv_around_events(args.tickers, args.currency, args.importance, args.days,
+                                            start=args.start, end=args.end)
+        else:
+            result = store.query(args.sql)
+    print(result.to_string(index=False) if not result.empty else 'No rows.')
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'analyze':
+        sys.exit(run_analyze(args))
+    if args.command == 'screen':
+        sys.exit(run_screen(args))
+    if args.command == 'stream':
+        sys.exit(run_stream(args))
+    if args.command == 'query':
+        sys.exit(run_query(args))
+    sys.exit(run_calendar(args))
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+# Chain columns that only repeat the underlying's close and the expiry on every row
+BROADCAST_COLUMNS = ('last_price', 'expiry_date')
+# Strings shared by most rows of a chain; stored once as categories
+CATEGORY_COLUMNS = ('contractSize', 'currency')
+
+
+def memory_bytes(frame):
+    """Bytes held by a frame, including the strings behind object columns."""
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+def downcast(frame, float_dtype=np.float32):
+    """
+    Copy of frame with floats stored as float_dtype, integers in the smallest
+    type that holds their range and the CATEGORY_COLUMNS as categoricals.
+    """
+    frame = frame.copy()
+    for col in frame.columns:
+        values = frame[col]
+        if pd.api.types.is_bool_dtype(values):
+            continue
+        if pd.api.types.is_float_dtype(values):
+            frame[col] = values.astype(float_dtype)
+        elif pd.api.types.is_integer_dtype(values):
+            frame[col] = pd.to_numeric(values, downcast='unsigned' if (values >= 0).all() else 'integer')
+        elif col in CATEGORY_COLUMNS or (values.dtype == object and values.nunique() <= len(values) // 2):
+            frame[col] = values.astype('category')
+    return frame
+
+
+def constants_to_attrs(frame, columns=None):
+    """
+    Move columns holding one value on every row (all constant columns, or just
+    the given ones) into frame.attrs['constants'], returning the slimmer frame.
+    """
+    if columns is None:
+        columns = [col for col in frame.columns if len(frame) and frame[col].nunique(dropna=False) == 1]
+    columns = [col for col in columns if col in frame.columns]
+    constants = dict(frame.attrs.get('constants', {}))
+    for col in columns:
+        constants[col] = frame[col].iloc[0] if len(frame) else None
+    slim = frame.drop(columns=columns)
+    slim.attrs = {**frame.attrs, 'constants': constants}
+    return slim
+
+
+def _strike_codes(strike):
+    # Last 8 characters of an OCC contract symbol: the strike in thousandths
+    thousandths = (np.asarray(strike, dtype=np.float64) * 1000).round().astype(np.int64)
+    return np.char.zfill(thousandths.astype(str), 8).astype(object)
+
+
+def expand(frame):
+    """
+    Inverse of compact_chain and compact_stock_data: broadcast the stored
+    constants and Fibonacci levels back into columns and rebuild
+    contractSymbol, in the original column order (e.g. for CSV output,
+    which keeps its usual layout). Dtypes stay downcast.
+    """
+    attrs = frame.attrs
+    constants = {**attrs.get('constants', {}), **attrs.get('fib_levels', {})}
+    prefix = attrs.get('symbol_prefix')
+    if not constants and prefix is None:
+        return frame
+    frame = frame.assign(**{col: value for col, value in constants.items() if col not in frame.columns})
+    if prefix is not None and 'contractSymbol' not in frame.columns:
+        frame.insert(0, 'contractSymbol', prefix + _strike_codes(frame['strike']))
+    if 'columns' in attrs:
+        frame = frame[[col for col in attrs['columns'] if col in frame.columns]]
+    return frame
+
+
+def compact_chain(chain):
+    """
+    A calls or puts frame with downcast numerics, last_price/expiry_date kept
+    once as metadata and contractSymbol dropped when every symbol is the
+    shared '<ticker><yymmdd><C|P>' prefix plus the strike, as OCC symbols are.
+    """
+    columns = list(chain.columns)
+    chain = constants_to_attrs(chain, [col for col in BROADCAST_COLUMNS if col in chain.columns])
+    chain.attrs['columns'] = columns
+    prefix = None
+    if 'contractSymbol' in chain.columns and len(chain):
+        symbols = chain['contractSymbol'].astype(str)
+        prefixes = symbols.str[:-8]
+        if prefixes.nunique() == 1 and (symbols.str[-8:].to_numpy() == _strike_codes(chain['strike'])).all():
+            prefix = prefixes.iloc[0]
+            attrs = chain.attrs
+            chain = chain.drop(columns=['contractSymbol'])
+            chain.attrs = {**attrs, 'symbol_prefix': prefix}
+    return downcast(chain)
+
+
+def compact_stock_data(stock_data, fib_levels=None):
+    """
+    stock_data with float32 prices and indicators, the smallest integer type
+    for volume, and the Fibonacci levels kept in attrs['fib_levels'] instead
+    of seven constant columns.
+    """
+    fib_columns = [col for col in stock_data.columns if col.startswith('Fib_')]
+    if fib_levels is None:
+        fib_levels = {col: float(stock_data[col].iloc[-1]) for col in fib_columns}
+    frame = downcast(stock_data.drop(columns=fib_columns))
+    frame.attrs = {**stock_data.attrs, 'fib_levels': dict(fib_levels), 'columns': list(stock_data.columns)}
+    return frame
+
+
+class TickerSummary:
+    """
+    Latest values of one analyzed ticker. __slots__ keeps thousands of these
+    to a few hundred bytes each, without a per-instance __dict__.
+    """
+
+    __slots__ = ('ticker', 'date', 'close', 'volume', 'ema24', 'sma50', 'sma200', 'rsi', 'mfi', 'fib_levels',
+                 'expiry')
+
+    def __init__(self, ticker, date, close, volume, ema24, sma50, sma200, rsi, mfi, fib_levels, expiry=None):
+        self.ticker = ticker
+        self.date = date
+        self.close = close
+        self.volume = volume
+        self.ema24 = ema24
+        self.sma50 = sma50
+        self.sma200 = sma200
+        self.rsi = rsi
+        self.mfi = mfi
+        self.fib_levels = fib_levels
+        self.expiry = expiry
+
+    def __repr__(self):
+        return (f"TickerSummary({self.ticker} {self.date:%Y-%m-%d} close={self.close:.2f} "
+                f"rsi={self.rsi:.1f} mfi={self.mfi:.1f})")
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
@@ -0,0 +1,201 @@
+import os
+import threading
+from collections import namedtuple
+from datetime import date
+
+import pandas as pd
+
+# Same shape as the object yfinance returns from Ticker.option_chain()
+Options = namedtuple('Options', ['calls', 'puts', 'underlying'])
+
+# yf.download resets and then reads back module-level state (shared._DFS, shared._ERRORS), so
+# concurrent calls from the io pool can swap frames or lose errors; one download runs at a time
+_YF_DOWNLOAD_LOCK = threading.Lock()
+
+
+class DataProvider:
+    """
+    Where StockAnalyzer gets its prices and option chains from.
+
+    download() returns an OHLCV frame indexed by date, option_chain() returns
+    an object with 'calls' and 'puts' frames in the yfinance column layout
+    and option_expiries() lists the expiry dates ('YYYY-MM-DD') on offer.
+    """
+
+    def download(self, ticker, start, end):
+        raise NotImplementedError
+
+    def download_many(self, tickers, start, end):
+        # Providers that can batch requests override this; the default just loops
+        return {ticker: self.download(ticker, start, end) for ticker in tickers}
+
+    def option_chain(self, ticker, expiry):
+        raise NotImplementedError
+
+    def option_expiries(self, ticker):
+        raise NotImplementedError
+
+
+class YahooProvider(DataProvider):
+    """
+    Prices and option chains from Yahoo Finance. Every request goes through
+    one requests session keeping up to pool_size connections per host (see
+    fetch.pooled_session), instead of a new session per yf.Ticker. Price
+    downloads run one at a time, as yf.download keeps its results in
+    module-level state; option chains are fetched concurrently.
+    """
+
+    def __init__(self, pool_size=10):
+        # One yf.Ticker per symbol, so the option calls share its session and cached metadata
+        self.pool_size = pool_size
+        self._tickers = {}
+        self._session = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'pool_size': self.pool_size}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _get_session(self):
+        from .fetch import pooled_session
+        with self._lock:
+            if self._session is None:
+                self._session = pooled_session(self.pool_size)
+            return self._session
+
+    def _ticker(self, ticker):
+        import yfinance as yf
+        session = self._get_session()
+        with self._lock:
+            if ticker not in self._tickers:
+                self._tickers[ticker] = yf.Ticker(ticker, session=session)
+            return self._tickers[ticker]
+
+    def download(self, ticker, start, end):
+        import yfinance as yf
+        session = self._get_session()
+        with _YF_DOWNLOAD_LOCK:
+            data = yf.download(ticker, start=start, end=end, progress=False, session=session)
+            _raise_download_errors([ticker])
+        return data
+
+    def download_many(self, tickers, start, end):
+        import yfinance as yf
+        tickers = list(tickers)
+        session = self._get_session()
+        with _YF_DOWNLOAD_LOCK:
+            data = yf.download(tickers, start=start, end=end, group_by='ticker', progress=False, session=session)
+        # Tickers that failed are left out and fall back to their own (retried) download
+        return split_grouped(data, tickers)
+
+    def option_chain(self, ticker, expiry):
+        return self._ticker(ticker).option_chain(expiry)
+
+    def option_expiries(self, ticker):
+        return list(self._ticker(ticker).options)
+
+
+def _raise_download_errors(tickers):
+    # yf.download logs failures and returns an empty frame; raise them so they can be retried,
+    # except 'no data in this range', which is a valid (empty) answer for an incremental fetch.
+    # Called under _YF_DOWNLOAD_LOCK, right after the download whose errors it reads
+    from yfinance import shared
+    errors = {ticker: shared._ERRORS.get(ticker.upper()) for ticker in tickers}
+    errors = {ticker: error for ticker, error in errors.items() if error and 'possibly delisted' not in error}
+    if errors:
+        raise ConnectionError('; '.join(f"{ticker}: {error}" for ticker, error in errors.items()))
+
+
+class CsvProvider(DataProvider):
+    """
+    File-backed provider reading '<directory>/<ticker>.csv' price files,
+    e.g. fixtures saved from an earlier run. Option chains are read from
+    '<directory>/<ticker>_calls_<expiry>.csv' and the matching puts file.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def download(self, ticker, start, end):
+        data = pd.read_csv(os.path.join(self.directory, f'{ticker}.csv'), index_col='Date', parse_dates=['Date'])
+        return data[(data.index >= pd.Timestamp(start)) & (data.index < pd.Timestamp(end))]
+
+    def option_chain(self, ticker, expiry):
+        calls = pd.read_csv(os.path.join(self.directory, f'{ticker}_calls_{expiry}.csv'))
+        puts = pd.read_csv(os.path.join(self.directory, f'{ticker}_puts_{expiry}.csv'))
+        return Options(calls=calls, puts=puts, underlying=None)
+
+    def option_expiries(self, ticker):
+        prefix = f'{ticker}_calls_'
+        return sorted(name[len(prefix):-len('.csv')] for name in os.listdir(self.directory)
+                      if name.startswith(prefix) and name.endswith('.csv'))
+
+
+class PrefetchedProvider(DataProvider):
+    """
+    Serves price frames that were fetched up front for a whole batch and
+    falls back to the wrapped provider for anything it does not hold.
+    """
+
+    def __init__(self, provider, frames):
+        self.provider = provider
+        self.frames = frames
+
+    def download(self, ticker, start, end):
+        if ticker in self.frames:
+            return self.frames[ticker]
+        return self.provider.download(ticker, start, end)
+
+    def option_chain(self, ticker, expiry):
+        return self.provider.option_chain(ticker, expiry)
+
+    def option_expiries(self, ticker):
+        return self.provider.option_expiries(ticker)
+
+
+def split_grouped(data, tickers):
+    """
+    Split a yf.download(..., group_by='ticker') frame into one frame per
+    ticker. Each ticker's columns are copied out of the bulk frame (pandas
+    keeps one block per dtype, so a slice of a frame with float prices and
+    integer volumes cannot be a view), once, into a frame of its own that
+    analyzers can add columns to. Tickers with missing leading rows
+    (shorter history) keep only their own dates; tickers that came back
+    empty are left out.
+    """
+    if not isinstance(data.columns, pd.MultiIndex):
+        return {tickers[0]: data} if len(tickers) == 1 and not data.empty else {}
+
+    frames = {}
+    level = data.columns.get_level_values(0)
+    for ticker in tickers:
+        positions = (level == ticker).nonzero()[0]
+        if not len(positions):
+            continue
+        # take() rather than data[ticker]: the latter is flagged as a copy of data, so adding a column warns
+        frame = data.take(positions, axis=1)
+        frame.columns = frame.columns.droplevel(0)
+        has_data = frame.notna().any(axis=1).to_numpy()
+        if not has_data.any():
+            continue
+        if not has_data.all():
+            frame = frame[has_data]
+        frames[ticker] = frame
+    return frames
+
+
+def prefetch(provider, tickers, start, end=None):
+    """
+    Download every ticker's prices in one batched call and return a provider
+    that hands the per-ticker frames to StockAnalyzer.download_data. If the
+    batched call fails, every ticker falls back to its own request.
+    """
+    end = end if end else date.today().isoformat()
+    try:
+        frames = provider.download_many(tickers, start, end)
+    except Exception as e:
+        print(f"Batched download failed, falling back to per-ticker requests: {e}")
+        frames = {}
+    return PrefetchedProvider(provider, frames)
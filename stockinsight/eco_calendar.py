@@ -0,0 +1,229 @@
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import time
+import os
+import sys
+from .calendar_parser import DATE_FORMAT, parse_events
+
+CALENDAR_URL = "https://www.investing.com/economic-calendar/"
+# The endpoint the calendar page itself calls (XHR) when filtering dates or scrolling
+SERVICE_URL = "https://www.investing.com/economic-calendar/Service/getCalendarFilteredData"
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/126.0.0.0 Safari/537.36',
+    'X-Requested-With': 'XMLHttpRequest',
+    'Accept': 'application/json, text/javascript, */*; q=0.01',
+    'Referer': CALENDAR_URL,
+}
+# investing.com time zone id for GMT
+GMT_TIMEZONE = 55
+
+
+# Validate date format
+def validate_date(date_string):
+    try:
+        datetime.strptime(date_string, '%m-%d-%Y')
+        return True
+    except ValueError:
+        return False
+
+
+def date_windows(start_date_key, to_date_key, window_days=7):
+    """Split an inclusive MM-DD-YYYY range into consecutive (from, to) ISO date windows."""
+    start = datetime.strptime(start_date_key, '%m-%d-%Y').date()
+    end = datetime.strptime(to_date_key, '%m-%d-%Y').date()
+    windows = []
+    while start <= end:
+        window_end = min(start + timedelta(days=window_days - 1), end)
+        windows.append((start.isoformat(), window_end.isoformat()))
+        start = window_end + timedelta(days=1)
+    return windows
+
+
+def make_session(pool_size=4):
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    # Keep one connection per worker alive instead of reconnecting for every page
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch_window(session, date_from, date_to, timeout=30, date_format=DATE_FORMAT):
+    """
+    Fetch one date window from the calendar service and parse each page of
+    rows as soon as it arrives, returning one DataFrame per page. The
+    service returns rows in pages; while it asks for more
+    ('bind_scroll_handler'), request the next one.
+    """
+    data = {
+        'dateFrom': date_from,
+        'dateTo': date_to,
+        'timeZone': GMT_TIMEZONE,
+        'timeFilter': 'timeOnly',
+        'currentTab': 'custom',
+        'submitFilters': 1,
+        'limit_from': 0,
+    }
+    pages = []
+    while True:
+        response = session.post(SERVICE_URL, data=data, timeout=timeout)
+        response.raise_for_status()
+        payload = response.json()
+        pages.append(parse_events(payload.get('data', ''), date_format))
+        if not payload.get('bind_scroll_handler') or not payload.get('data'):
+            return pages
+        data['limit_from'] += 1
+        data['last_time_scope'] = payload.get('last_time_scope')
+
+
+def fetch_events_http(start_date_key, to_date_key, window_days=7, max_workers=4, session=None,
+                      date_format=DATE_FORMAT):
+    """
+    Fetch the calendar over plain HTTP, splitting the range into windows
+    that are fetched in parallel over one pooled session. Rows keep their
+    chronological order.
+    """
+    windows = date_windows(start_date_key, to_date_key, window_days)
+    session = session if session else make_session(max_workers)
+    with ThreadPoolExecutor(max(1, min(max_workers, len(windows)))) as pool:
+        chunks = pool.map(lambda window: fetch_window(session, *window, date_format=date_format), windows)
+        # Pages without rows (quiet windows, the last page of a scroll) add nothing but dtype trouble to concat
+        pages = [page for chunk in chunks for page in chunk if not page.empty]
+    if not pages:
+        return parse_events('', date_format)
+    return pd.concat(pages, ignore_index=True)
+
+
+def fetch_page_source_selenium(start_date_key, to_date_key):
+    """Load the full calendar page in Chrome, scrolling until every row is loaded."""
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.keys import Keys
+
+    # Setup WebDriver
+    driver = webdriver.Chrome()
+    driver.get(CALENDAR_URL)
+
+    def get_scroll_height():
+        return driver.execute_script("return document.body.scrollHeight")
+
+    try:
+        # Scroll down by a certain number of pixels
+        driver.execute_script("window.scrollTo(0, 200);")  # Adjust the number based on your needs
+
+        # Optionally, wait a bit for the pop-up to be potentially triggered by scrolling
+        driver.implicitly_wait(2)
+        # Check if the pop-up is present and visible
+        wait = WebDriverWait(driver, 5)
+        close_button = wait.until(EC.visibility_of_element_located((By.CLASS_NAME, 'largeBannerCloser')))
+
+        # If the close button is visible, click it
+        close_button.click()
+        print("Pop-up closed.")
+    except TimeoutException:
+        # If no pop-up is visible within 5 seconds, proceed
+        print("No pop-up to close.")
+
+    # Wait for the page to load
+    WebDriverWait(driver, 5).until(
+        EC.presence_of_element_located((By.ID, "datePickerToggleBtn"))
+    )
+
+    # Open date picker button
+    date_picker_toggle_btn = driver.find_element(By.ID, "datePickerToggleBtn")
+    date_picker_toggle_btn.click()
+    from_date = driver.find_element(By.ID, "startDate")
+    from_date.click()
+    for _ in range(10):  # Adjust the range based on the maximum expected input size
+        from_date.send_keys(Keys.BACKSPACE)
+    from_date.send_keys(start_date_key)  # Enter new date
+    to_date = driver.find_element(By.ID, "endDate")
+    to_date.click()
+    for _ in range(10):
+        to_date.send_keys(Keys.BACKSPACE)
+    to_date.send_keys(to_date_key)
+    time.sleep(3)
+
+    # Apply the date range
+    apply_button = driver.find_element(By.ID, "applyBtn")
+    apply_button.click()
+    time.sleep(3)
+
+    last_height = get_scroll_height()
+    while True:
+        # Scroll down to the bottom of the page
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+
+        # Wait for the page to load
+        time.sleep(3)  # Adjust sleep time as necessary
+
+        # Calculate new scroll height and compare with last scroll height
+        new_height = get_scroll_height()
+        if new_height == last_height:
+            # Break the loop if no more content is loaded
+            print("Reached the bottom of the page.")
+            break
+        last_height = new_height
+
+    # Wait for the data to load
+    time.sleep(5)
+
+    page_source = driver.page_source
+
+    # Clean up
+    driver.quit()
+    return page_source
+
+
+def fetch_events(start_date_key, to_date_key, use_selenium=False, date_format=DATE_FORMAT):
+    """Economic events for the range, over HTTP with the Selenium scrape as a fallback."""
+    if not use_selenium:
+        try:
+            return fetch_events_http(start_date_key, to_date_key, date_format=date_format)
+        except Exception as e:
+            print(f"Direct fetch failed ({e}), falling back to Selenium.")
+    return parse_events(fetch_page_source_selenium(start_date_key, to_date_key), date_format)
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    use_selenium = '--selenium' in args
+    if use_selenium:
+        args.remove('--selenium')
+    use_store = '--no-store' not in args
+    if not use_store:
+        args.remove('--no-store')
+
+    # Check if both arguments are provided
+    if len(args) != 2:
+        print("Usage: python -m stockinsight.eco_calendar <start_date> <end_date> [--selenium] [--no-store]")
+        print("Date format should be MM-DD-YYYY")
+        sys.exit(1)
+
+    start_date_key, to_date_key = args
+
+    if not (validate_date(start_date_key) and validate_date(to_date_key)):
+        print("Invalid date format. Please use MM-DD-YYYY.")
+        sys.exit(1)
+
+    # Full timestamps for the analytics store; the CSV keeps its day-only dates
+    df = fetch_events(start_date_key, to_date_key, use_selenium, date_format=None)
+    os.makedirs('data', exist_ok=True)
+    if use_store:
+        from .store import AnalyticsStore
+        with AnalyticsStore() as store:
+            print(f"{store.append_events(df)} events added to {store.path}")
+    df = df.assign(Date=pd.to_datetime(df['Date']).dt.strftime(DATE_FORMAT))
+    df.to_csv(f"data/{start_date_key}_{to_date_key}_economicEvents.csv", index=False)
+
+
+if __name__ == "__main__":
+    main()
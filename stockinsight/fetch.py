@@ -0,0 +1,280 @@
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import pandas as pd
+
+from .data_providers import DataProvider, Options
+
+# HTTP statuses worth another attempt: throttled, or a server-side hiccup
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: up to burst requests at once, refilled at
+    rate per second. acquire() blocks until a token is free and returns the
+    seconds it waited.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                # Sleeping exactly the missing time can refill to a hair under one token
+                if self._tokens >= 1 - 1e-9:
+                    self._tokens = max(self._tokens - 1, 0.0)
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+
+def is_retryable(exc):
+    """Throttling, 5xx responses, timeouts and dropped connections; not bad arguments or missing files."""
+    response = getattr(exc, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(exc, 'code', None)
+    if isinstance(status, int):
+        return status in RETRY_STATUS
+    if 'RateLimit' in type(exc).__name__:
+        return True
+    if isinstance(exc, (FileNotFoundError, PermissionError, IsADirectoryError)):
+        return False
+    # requests' exceptions derive from OSError, like the built-in ConnectionError and TimeoutError
+    return isinstance(exc, OSError)
+
+
+def retry_after(exc):
+    # Seconds asked for by a 429/503 Retry-After header, if any
+    headers = getattr(getattr(exc, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _share(result):
+    # Callers mutate what they get back (StockAnalyzer adds columns), so each waiter gets its own copy
+    if isinstance(result, pd.DataFrame):
+        return result.copy()
+    if isinstance(result, Options):
+        return Options(_share(result.calls), _share(result.puts), result.underlying)
+    if isinstance(result, dict):
+        return {key: _share(value) for key, value in result.items()}
+    if isinstance(result, list):
+        return list(result)
+    return result
+
+
+class Coalescer:
+    """
+    Merges identical calls that are in flight at the same time: the first
+    caller runs the function, later callers with the same key wait for it
+    and get a copy of its result (or its exception).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def call(self, key, fn, *args):
+        """Returns (result, coalesced), coalesced being True when another caller's request was reused."""
+        with self._lock:
+            entry = self._calls.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._calls[key] = [Future(), 0]
+            else:
+                entry[1] += 1
+        future = entry[0]
+        if not owner:
+            return _share(future.result()), True
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+        future.set_result(result)
+        # The waiters copy the stored result, so the caller that ran it must not get the same object back
+        return (_share(result) if entry[1] else result), False
+
+
+class ResilientProvider(DataProvider):
+    """
+    Wraps another provider (one upstream host) so every request is rate
+    limited, retried and de-duplicated.
+
+    rate caps requests per second with bursts of up to burst (no limit when
+    rate is None). Failures that is_retryable accepts are retried up to
+    retries times after an exponential backoff with full jitter: a random
+    wait in [0, min(max_backoff, backoff * 2 ** attempt)], or longer when
+    the server sent Retry-After. Identical requests made while one is in
+    flight (e.g. the option chain for the same ticker and expiry from two
+    threads) share its response.
+    """
+
+    def __init__(self, provider, rate=None, burst=None, retries=3, backoff=0.5, max_backoff=30.0, seed=None,
+                 sleep=time.sleep):
+        self.provider = provider
+        self.rate = rate
+        self.burst = burst if burst else max(1, int(rate or 1))
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.seed = seed
+        self._sleep = sleep
+        self._bucket = TokenBucket(rate, self.burst, sleep=sleep) if rate else None
+        self._coalescer = Coalescer()
+        self._random = random.Random(seed)
+        self.stats = {'requests': 0, 'retries': 0, 'coalesced': 0, 'failures': 0, 'throttled_seconds': 0.0,
+                      'backoff_seconds': 0.0}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks, the bucket and in-flight calls stay with this process
+        return {'provider': self.provider, 'rate': self.rate, 'burst': self.burst, 'retries': self.retries,
+                'backoff': self.backoff, 'max_backoff': self.max_backoff, 'seed': self.seed}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def record(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    def report(self):
+        s = self.stats
+        return (f"Fetch: {s['requests']} requests, {s['retries']} retries, {s['coalesced']} coalesced, "
+                f"{s['failures']} failures, {s['throttled_seconds']:.1f}s rate limited, "
+                f"{s['backoff_seconds']:.1f}s backing off")
+
+    def delay(self, attempt, exc=None):
+        """Seconds to wait before retry number attempt + 1."""
+        with self._lock:
+            jitter = self._random.random()
+        delay = jitter * min(self.max_backoff, self.backoff * 2 ** attempt)
+        return max(delay, min(retry_after(exc), self.max_backoff)) if exc is not None else delay
+
+    def _attempt(self, method, args):
+        for attempt in range(self.retries + 1):
+            if self._bucket is not None:
+                self.record('throttled_seconds', self._bucket.acquire())
+            self.record('requests')
+            try:
+                return getattr(self.provider, method)(*args)
+            except Exception as e:
+                if attempt == self.retries or not is_retryable(e):
+                    self.record('failures')
+                    raise
+                delay = self.delay(attempt, e)
+                self.record('retries')
+                self.record('backoff_seconds', delay)
+                self._sleep(delay)
+
+    def _call(self, method, *args):
+        result, coalesced = self._coalescer.call((method,) + args, self._attempt, method, args)
+        if coalesced:
+            self.record('coalesced')
+        return result
+
+    def download(self, ticker, start, end):
+        return self._call('download', ticker, start, end)
+
+    def download_many(self, tickers, start, end):
+        return self._call('download_many', tuple(tickers), start, end)
+
+    def option_chain(self, ticker, expiry):
+        return self._call('option_chain', ticker, expiry)
+
+    def option_expiries(self, ticker):
+        return self._call('option_expiries', ticker)
+
+
+def resilient(provider, rate=None, retries=3, **kwargs):
+    """provider wrapped in a ResilientProvider, unless it already is one or there is nothing to add."""
+    if isinstance(provider, ResilientProvider) or (rate is None and not retries):
+        return provider
+    return ResilientProvider(provider, rate=rate, retries=retries, **kwargs)
+
+
+def pooled_session(pool_size=10):
+    """
+    requests.Session keeping up to pool_size open connections per host, so
+    concurrent downloads reuse connections instead of opening (and
+    discarding) new ones once the default pool of 10 is full.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class HttpProvider(DataProvider):
+    """
+    Provider for a plain HTTP price server, such as the StubServer of
+    benchmarks/fixtures.py: GET {base_url}/history/<ticker>?start=&end=
+    returns OHLCV CSV, /options/<ticker>?expiry= the calls and puts as JSON
+    records and /expiries/<ticker> a JSON list. Non-2xx responses raise
+    requests' HTTPError, which ResilientProvider retries for RETRY_STATUS.
+    """
+
+    def __init__(self, base_url, pool_size=10, timeout=10.0):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'base_url': self.base_url, 'pool_size': self.pool_size, 'timeout': self.timeout}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _get(self, path, **params):
+        with self._lock:
+            if self._session is None:
+                self._session = pooled_session(self.pool_size)
+        response = self._session.get(f'{self.base_url}{path}', params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def download(self, ticker, start, end):
+        import io
+        text = self._get(f'/history/{ticker}', start=start, end=end).text
+        return pd.read_csv(io.StringIO(text), index_col='Date', parse_dates=['Date'])
+
+    def option_chain(self, ticker, expiry):
+        payload = self._get(f'/options/{ticker}', expiry=expiry).json()
+        frames = {}
+        for side in ('calls', 'puts'):
+            frame = pd.DataFrame(payload[side])
+            if 'lastTradeDate' in frame.columns:
+                frame['lastTradeDate'] = pd.to_datetime(frame['lastTradeDate'], utc=True)
+            frames[side] = frame
+        return Options(frames['calls'], frames['puts'], payload.get('underlying', {}))
+
+    def option_expiries(self, ticker):
+        return self._get(f'/expiries/{ticker}').json()
@@ -0,0 +1,207 @@
+import numpy as np
+
+from .monte_carlo import time_to_expiry
+from .option_pricing import _is_call, black_scholes_batch, itm_probability
+
+IV_SOURCES = ('yahoo', 'mid', 'smoothed')
+
+
+def _mid(bid, ask):
+    # NaN where there is no two-sided quote
+    return np.where((bid > 0) & (ask >= bid), (bid + ask) / 2, np.nan)
+
+
+def implied_volatility(price, S, K, T, option_type, r=0.02, tol=1e-6, tol_sigma=1e-5, min_vega=1e-8, max_iter=100,
+                       bounds=(1e-4, 5.0)):
+    """
+    Solve Black-Scholes for sigma on a whole chain at once.
+
+    Every strike takes a Newton step on vega while it stays inside its
+    [low, high] bracket, and a bisection step otherwise; the bracket
+    narrows on every iteration because price increases with sigma. Only
+    strikes that have not converged are priced again.
+
+    A strike has converged when its price error is within tol of the price
+    and within tol_sigma of sigma (error / vega), or once its bracket is
+    narrower than tol_sigma. Where vega per unit of spot is below min_vega
+    (deep in-the-money strikes close to expiry) the price barely depends on
+    sigma, so those strikes are not solved. Returns (iv, converged). Prices
+    outside the no-arbitrage range, strikes without usable vega and strikes
+    that do not converge within max_iter get NaN.
+    """
+    price, S, K, T, r, is_call = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (price, S, K, T, r)), _is_call(option_type))
+    option_type = np.where(is_call, 'call', 'put')
+
+    discount = np.exp(-r * np.maximum(T, 0))
+    lower = np.where(is_call, np.maximum(S - K * discount, 0), np.maximum(K * discount - S, 0))
+    upper = np.where(is_call, S, K * discount)
+    solvable = np.isfinite(price) & (T > 0) & (price > lower) & (price < upper)
+
+    low = np.full(S.shape, bounds[0])
+    high = np.full(S.shape, bounds[1])
+    # Brenner-Subrahmanyam at-the-money approximation as the first guess
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = np.sqrt(2 * np.pi / T) * price / S
+    sigma = np.clip(np.where(np.isfinite(sigma), sigma, 0.3), bounds[0], bounds[1])
+    converged = np.zeros(S.shape, dtype=bool)
+
+    active = np.flatnonzero(solvable)
+    for _ in range(max_iter):
+        if not active.size:
+            break
+        s = sigma.flat[active]
+        out = black_scholes_batch(S.flat[active], K.flat[active], T.flat[active], s,
+                                  option_type.flat[active], r.flat[active])
+        diff = out['price'] - price.flat[active]
+        vega = out['vega']
+        # Relative to the price, so cheap far out-of-the-money strikes still pin down sigma, and in
+        # sigma, so a price that hardly moves with sigma does not pass at the wrong sigma
+        with np.errstate(divide='ignore', invalid='ignore'):
+            done = (np.abs(diff) < tol * price.flat[active]) & (np.abs(diff) < tol_sigma * vega)
+
+        lo = np.where(diff < 0, s, low.flat[active])
+        hi = np.where(diff > 0, s, high.flat[active])
+        low.flat[active], high.flat[active] = lo, hi
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            newton = s - diff / vega
+        step = np.where((vega > 1e-10) & (newton > lo) & (newton < hi), newton, 0.5 * (lo + hi))
+        done |= (hi - lo) < tol_sigma
+
+        sigma.flat[active] = np.where(done, s, step)
+        # With next to no vega at the solution, the price does not pin down sigma
+        converged.flat[active] = done & (vega >= min_vega * S.flat[active])
+        active = active[~done]
+
+    return np.where(converged, sigma, np.nan), converged
+
+
+class VolSurface:
+    """
+    Smoothed implied volatility across strikes and expiries.
+
+    Each expiry's total variance w = iv^2 * T is fitted with a weighted
+    polynomial in log-moneyness k = ln(K / F). Between expiries w is
+    interpolated linearly in T (flat volatility before the first and after
+    the last), and k is clamped to the quoted range of each expiry. Calling
+    the surface evaluates any number of (K, T) points in one pass.
+    """
+
+    def __init__(self, spot, r, expiries, coefficients, k_range):
+        self.spot = spot
+        self.r = r
+        self.expiries = np.asarray(expiries, dtype=float)
+        self.coefficients = np.asarray(coefficients, dtype=float)
+        self.k_range = np.asarray(k_range, dtype=float)
+
+    @classmethod
+    def fit(cls, K, T, iv, spot, r=0.02, weights=None, degree=2):
+        """Fit from per-strike IVs; rows with NaN IV are ignored, as are expiries with too few strikes."""
+        K, T, iv = (np.asarray(x, dtype=float) for x in (K, T, iv))
+        weights = np.ones(K.shape) if weights is None else np.asarray(weights, dtype=float)
+        usable = np.isfinite(iv) & (iv > 0) & (T > 0) & np.isfinite(weights) & (weights > 0)
+        K, T, iv, weights = K[usable], T[usable], iv[usable], weights[usable]
+
+        expiries, coefficients, k_range = [], [], []
+        for t in np.unique(T):
+            rows = T == t
+            if rows.sum() <= degree:
+                continue
+            k = np.log(K[rows] / (spot * np.exp(r * t)))
+            # polyfit weights multiply the residuals, so pass the square root
+            coefficients.append(np.polyfit(k, iv[rows] ** 2 * t, degree, w=np.sqrt(weights[rows])))
+            expiries.append(t)
+            k_range.append((k.min(), k.max()))
+        if not expiries:
+            raise ValueError("Not enough implied volatilities to fit a surface.")
+        return cls(spot, r, expiries, coefficients, k_range)
+
+    def total_variance(self, K, T):
+        K, T = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float))
+        # Total variance of every fitted expiry at the query strikes: (expiries, points)
+        k = np.log(K[None, :] / (self.spot * np.exp(self.r * self.expiries[:, None])))
+        k = np.clip(k, self.k_range[:, :1], self.k_range[:, 1:])
+        w = np.zeros(k.shape)
+        for power in range(self.coefficients.shape[1]):
+            w = w * k + self.coefficients[:, power:power + 1]
+        w = np.maximum(w, 1e-10)
+
+        columns = np.arange(len(T))
+        upper = np.clip(np.searchsorted(self.expiries, T), 1, len(self.expiries) - 1) if len(self.expiries) > 1 \
+            else np.zeros(len(T), dtype=int)
+        lower = np.maximum(upper - 1, 0)
+        t0, t1 = self.expiries[lower], self.expiries[upper]
+        w0, w1 = w[lower, columns], w[upper, columns]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(t1 > t0, (T - t0) / (t1 - t0), 0.0)
+        between = w0 + (w1 - w0) * weight
+        # Constant volatility outside the fitted expiries
+        before = w[0, columns] * T / self.expiries[0]
+        after = w[-1, columns] * T / self.expiries[-1]
+        return np.where(T < self.expiries[0], before, np.where(T > self.expiries[-1], after, between))
+
+    def __call__(self, K, T):
+        """Smoothed implied volatility at strikes K and times to expiry T (years)."""
+        K, T = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float))
+        shape = K.shape
+        K, T = K.ravel(), T.ravel()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            iv = np.sqrt(self.total_variance(K, T) / T)
+        return np.where(T > 0, iv, np.nan).reshape(shape)
+
+
+def _out_of_the_money(K, T, option_type, spot, r):
+    # Fit on out-of-the-money quotes, which are the liquid side of each strike
+    forward = spot * np.exp(r * T)
+    return np.where(_is_call(option_type), K >= forward, K < forward)
+
+
+def recompute_iv(K, T, option_type, bid, ask, spot, source='mid', yahoo_iv=None, r=0.02, degree=2):
+    """
+    Implied volatilities for a set of quotes, from 'mid' (solved per strike
+    from the bid/ask mid) or 'smoothed' (a VolSurface fitted to the
+    out-of-the-money mid IVs). Strikes the solver cannot handle fall back to
+    yahoo_iv when given. Returns (iv, surface); surface is None for 'mid'.
+    """
+    if source not in IV_SOURCES:
+        raise ValueError(f"Unknown IV source '{source}'. Choose from {', '.join(IV_SOURCES)}.")
+    K, T, bid, ask = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (K, T, bid, ask)))
+    mid = _mid(bid, ask)
+    solved, converged = implied_volatility(mid, spot, K, T, option_type, r)
+
+    surface = None
+    iv = solved
+    if source == 'smoothed':
+        otm = _out_of_the_money(K, T, option_type, spot, r) & converged
+        # Tighter quotes carry more weight
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weights = np.where(otm, 1 / np.maximum((ask - bid) / mid, 1e-3), 0.0)
+        try:
+            surface = VolSurface.fit(K, T, np.where(otm, solved, np.nan), spot, r, weights, degree)
+            iv = surface(K, T)
+        except ValueError:
+            # Too few usable quotes to fit; keep the per-strike solution
+            pass
+    if yahoo_iv is not None:
+        iv = np.where(np.isfinite(iv), iv, np.asarray(yahoo_iv, dtype=float))
+    return iv, surface
+
+
+def smooth_surface(surface, spot, source='smoothed', r=0.02, degree=2):
+    """
+    Replace impliedVolatility in a long-format option surface (see
+    option_surface.fetch_surface) and recompute InTheMoney_probability from
+    it, with T in hours to each expiry. Returns the new frame and the fitted
+    VolSurface (None for 'mid').
+    """
+    if source == 'yahoo' or surface.empty:
+        return surface, None
+    surface = surface.copy()
+    expiries = surface['expiry'].astype(str)
+    T = expiries.map({expiry: time_to_expiry(expiry) for expiry in expiries.unique()}).to_numpy(dtype=float)
+    option_type = surface['type'].astype(str).to_numpy()
+    iv, fitted = recompute_iv(surface['strike'].to_numpy(), T, option_type, surface['bid'].to_numpy(),
+                              surface['ask'].to_numpy(), spot, source, surface['impliedVolatility'].to_numpy(), r, degree)
+    surface['impliedVolatility'] = iv
+    surface['InTheMoney_probability'] = itm_probability(spot, surface['strike'].to_numpy(), T, iv, option_type, r)
+    return surface, fitted
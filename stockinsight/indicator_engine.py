@@ -0,0 +1,291 @@
+import copy
+import json
+import math
+import os
+import tempfile
+from collections import deque
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+INDICATOR_COLUMNS = ['EMA24', 'SMA50', 'SMA200', 'RSI', 'MFI']
+FIB_RATIOS = [1.0, 0.786, 0.618, 0.5, 0.382, 0.236, 0]
+
+
+def compute_indicators(stock_data):
+    """Full recompute of the EMA/SMA/RSI/MFI columns with ta, as calculate_indicators does."""
+    import ta
+    return pd.DataFrame({
+        'EMA24': ta.trend.ema_indicator(stock_data['Close'], window=24),
+        'SMA50': ta.trend.sma_indicator(stock_data['Close'], window=50),
+        'SMA200': ta.trend.sma_indicator(stock_data['Close'], window=200),
+        'RSI': ta.momentum.rsi(stock_data['Close'], window=14),
+        'MFI': ta.volume.money_flow_index(stock_data['High'], stock_data['Low'], stock_data['Close'], stock_data['Volume'], window=14),
+    }, index=stock_data.index)
+
+
+def _money_flow(stock_data):
+    # Signed raw money flow, the series ta's MFI sums over its window
+    typical = (stock_data['High'] + stock_data['Low'] + stock_data['Close']) / 3.0
+    previous = typical.shift(1)
+    direction = np.where(typical > previous, 1, np.where(typical < previous, -1, 0))
+    return typical, typical * stock_data['Volume'] * direction
+
+
+class IndicatorState:
+    """
+    Running state for EMA24, SMA50/200, RSI(14), MFI(14) and the 30-bar
+    Fibonacci window, reproducing the ta formulas one bar at a time.
+
+    update() costs O(1) per bar: the EMA and Wilder averages are single
+    values, SMAs keep running sums over a ring buffer of recent closes and
+    MFI keeps the last 14 signed money flows.
+    """
+
+    def __init__(self, ema_window=24, sma_windows=(50, 200), rsi_window=14, mfi_window=14, fib_window=30):
+        self.ema_window = ema_window
+        self.sma_windows = tuple(sma_windows)
+        self.rsi_window = rsi_window
+        self.mfi_window = mfi_window
+        self.fib_window = fib_window
+
+        self.count = 0
+        self.last_date = None
+        self.ema = None
+        self.closes = deque(maxlen=max(max(self.sma_windows), fib_window))
+        self.sums = {window: 0.0 for window in self.sma_windows}
+        self.prev_close = None
+        self.avg_up = 0.0
+        self.avg_down = 0.0
+        self.prev_typical = None
+        self.flows = deque(maxlen=mfi_window)
+
+    @property
+    def params(self):
+        return {
+            'ema_window': self.ema_window,
+            'sma_windows': list(self.sma_windows),
+            'rsi_window': self.rsi_window,
+            'mfi_window': self.mfi_window,
+            'fib_window': self.fib_window,
+        }
+
+    def update(self, high, low, close, volume, bar_date=None):
+        """Feed one bar and return the indicator values for it."""
+        self.count += 1
+        self.last_date = bar_date
+
+        # EMA, ewm(adjust=False) seeded with the first close
+        alpha = 2 / (self.ema_window + 1)
+        self.ema = close if self.ema is None else alpha * close + (1 - alpha) * self.ema
+
+        # SMAs, dropping the close that leaves each window before appending the new one
+        for window in self.sma_windows:
+            if len(self.closes) >= window:
+                self.sums[window] -= self.closes[-window]
+            self.sums[window] += close
+        self.closes.append(close)
+
+        # RSI, Wilder smoothing of gains and losses; the first bar counts as no change
+        change = 0.0 if self.prev_close is None else close - self.prev_close
+        alpha = 1 / self.rsi_window
+        self.avg_up = (1 - alpha) * self.avg_up + alpha * max(change, 0.0)
+        self.avg_down = (1 - alpha) * self.avg_down + alpha * max(-change, 0.0)
+        self.prev_close = close
+
+        # MFI, signed money flow over the last mfi_window bars
+        typical = (high + low + close) / 3.0
+        if self.prev_typical is None or typical == self.prev_typical:
+            direction = 0
+        else:
+            direction = 1 if typical > self.prev_typical else -1
+        self.flows.append(typical * volume * direction)
+        self.prev_typical = typical
+
+        return self.values()
+
+    def copy(self):
+        """Independent copy, for trying a provisional bar (e.g. the live session) without advancing this state."""
+        state = copy.copy(self)
+        state.closes = self.closes.copy()
+        state.sums = dict(self.sums)
+        state.flows = self.flows.copy()
+        return state
+
+    def values(self):
+        nan = float('nan')
+        result = {f'EMA{self.ema_window}': self.ema if self.count >= self.ema_window else nan}
+        for window in self.sma_windows:
+            result[f'SMA{window}'] = self.sums[window] / window if self.count >= window else nan
+
+        if self.count < self.rsi_window:
+            result['RSI'] = nan
+        elif self.avg_down == 0:
+            result['RSI'] = 100.0
+        else:
+            result['RSI'] = 100 - 100 / (1 + self.avg_up / self.avg_down)
+
+        if self.count < self.mfi_window:
+            result['MFI'] = nan
+        else:
+            positive = sum(flow for flow in self.flows if flow >= 0)
+            negative = -sum(flow for flow in self.flows if flow < 0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = np.float64(positive) / np.float64(negative)
+            result['MFI'] = float(100 - 100 / (1 + ratio))
+        return result
+
+    def fib_levels(self):
+        recent = list(self.closes)[-self.fib_window:]
+        recent_max, recent_min = max(recent), min(recent)
+        diff = recent_max - recent_min
+        return {f'Fib_{ratio}': recent_max - diff * ratio for ratio in FIB_RATIOS}
+
+    @classmethod
+    def from_history(cls, stock_data, **params):
+        """Build the state reached after the last row of stock_data, using vectorized pandas ops."""
+        state = cls(**params)
+        if stock_data.empty:
+            return state
+        close = stock_data['Close'].astype(float)
+
+        state.count = len(close)
+        state.last_date = stock_data.index[-1]
+        state.ema = float(close.ewm(span=state.ema_window, adjust=False).mean().iloc[-1])
+        state.closes.extend(close.iloc[-state.closes.maxlen:].tolist())
+        state.sums = {window: float(close.iloc[-window:].sum()) for window in state.sma_windows}
+
+        change = close.diff()
+        alpha = 1 / state.rsi_window
+        state.avg_up = float(change.where(change > 0, 0.0).ewm(alpha=alpha, adjust=False).mean().iloc[-1])
+        state.avg_down = float((-change.where(change < 0, 0.0)).ewm(alpha=alpha, adjust=False).mean().iloc[-1])
+        state.prev_close = float(close.iloc[-1])
+
+        typical, flow = _money_flow(stock_data)
+        state.flows.extend(flow.iloc[-state.mfi_window:].astype(float).tolist())
+        state.prev_typical = float(typical.iloc[-1])
+        return state
+
+    def to_dict(self):
+        return {
+            'params': self.params,
+            'count': self.count,
+            'last_date': self.last_date.isoformat() if self.last_date is not None else None,
+            'ema': self.ema,
+            'closes': list(self.closes),
+            'sums': {str(window): total for window, total in self.sums.items()},
+            'prev_close': self.prev_close,
+            'avg_up': self.avg_up,
+            'avg_down': self.avg_down,
+            'prev_typical': self.prev_typical,
+            'flows': list(self.flows),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(**data['params'])
+        state.count = data['count']
+        state.last_date = pd.Timestamp(data['last_date']) if data['last_date'] else None
+        state.ema = data['ema']
+        state.closes.extend(data['closes'])
+        state.sums = {int(window): total for window, total in data['sums'].items()}
+        state.prev_close = data['prev_close']
+        state.avg_up = data['avg_up']
+        state.avg_down = data['avg_down']
+        state.prev_typical = data['prev_typical']
+        state.flows.extend(data['flows'])
+        return state
+
+
+class IndicatorStore:
+    """
+    Keeps each ticker's indicator columns and IndicatorState next to its
+    price cache ('indicators.npy' and 'indicator_state.json'), so a rerun
+    only streams the bars added since the last completed session.
+
+    The state is saved as of the last bar dated before today, because a bar
+    from the current session can still change on the next download.
+    """
+
+    history_file = 'indicators.npy'
+    state_file = 'indicator_state.json'
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def _load_state(self, ticker):
+        path = self.cache.path(ticker, self.state_file)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_state(self, ticker, saved):
+        directory = os.path.dirname(self.cache.path(ticker, self.state_file))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(saved, f)
+            os.replace(tmp_path, self.cache.path(ticker, self.state_file))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _usable(self, saved, history, stock_data):
+        # Stored values are only valid for a frame with the same first bar and
+        # an unchanged close on the last saved bar
+        if saved is None or history is None or history.empty or stock_data.empty:
+            return False
+        if saved['state']['params'] != IndicatorState().params:
+            return False
+        first_date, last_date = pd.Timestamp(saved['first_date']), pd.Timestamp(saved['last_date'])
+        if stock_data.index[0] != first_date or last_date not in stock_data.index:
+            return False
+        if history.index[0] != first_date or history.index[-1] != last_date:
+            return False
+        return math.isclose(stock_data.loc[last_date, 'Close'], saved['last_close'], rel_tol=1e-9)
+
+    def compute(self, ticker, stock_data):
+        """Return INDICATOR_COLUMNS for every row of stock_data, reusing stored values where possible."""
+        saved = self._load_state(ticker)
+        history = self.cache.load(ticker, self.history_file) if saved else None
+        complete = stock_data.index < pd.Timestamp(date.today())
+
+        usable = self._usable(saved, history, stock_data)
+        if usable:
+            last_date = pd.Timestamp(saved['last_date'])
+            known = stock_data.index <= last_date
+            state = IndicatorState.from_dict(saved['state'])
+            rows = []
+            saved_state = None
+            new_bars = stock_data[~known]
+            for bar_date, high, low, close, volume in zip(new_bars.index, new_bars['High'].to_numpy(dtype=float),
+                                                          new_bars['Low'].to_numpy(dtype=float),
+                                                          new_bars['Close'].to_numpy(dtype=float),
+                                                          new_bars['Volume'].to_numpy(dtype=float)):
+                if saved_state is None and bar_date >= pd.Timestamp(date.today()):
+                    saved_state = state.to_dict()
+                rows.append(state.update(high, low, close, volume, bar_date))
+            if saved_state is None:
+                saved_state = state.to_dict()
+            values = history.loc[stock_data.index[known], INDICATOR_COLUMNS]
+            if rows:
+                streamed = pd.DataFrame(rows, index=new_bars.index, columns=INDICATOR_COLUMNS)
+                values = pd.concat([values, streamed])
+        else:
+            values = compute_indicators(stock_data)
+            saved_state = IndicatorState.from_history(stock_data[complete]).to_dict()
+
+        completed = stock_data[complete]
+        # Nothing to write when no completed bar was added since the last save
+        if not completed.empty and not (usable and len(history) == len(completed)):
+            self.cache.save(ticker, values[complete], self.history_file)
+            self._save_state(ticker, {
+                'first_date': stock_data.index[0].isoformat(),
+                'last_date': completed.index[-1].isoformat(),
+                'last_close': float(completed['Close'].iloc[-1]),
+                'state': saved_state,
+            })
+        return values
@@ -0,0 +1,172 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# One option position held to expiry. quantity > 0 is long, < 0 short; premium
+# is per share, paid for long legs and received for short ones.
+Leg = namedtuple('Leg', ['option_type', 'strike', 'quantity', 'premium'])
+
+DEFAULT_MEMORY_CAP = 256 * 2 ** 20
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def time_to_expiry(expiry, now=None):
+    """Years until the 16:00 close on expiry, counting hours rather than whole days."""
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp(datetime.now())
+    close = pd.Timestamp(expiry).normalize() + pd.Timedelta(hours=16)
+    return max((close - now).total_seconds(), 0.0) / (365 * 24 * 3600)
+
+
+def _leg_arrays(strategies):
+    # Pad every strategy to the same number of legs; padding legs have quantity 0
+    shape = (len(strategies), max(len(legs) for legs in strategies))
+    is_call = np.zeros(shape, dtype=bool)
+    strike = np.zeros(shape)
+    quantity = np.zeros(shape)
+    premium = np.zeros(shape)
+    for i, legs in enumerate(strategies):
+        for j, leg in enumerate(legs):
+            is_call[i, j] = str(leg.option_type).lower() == 'call'
+            strike[i, j] = leg.strike
+            quantity[i, j] = leg.quantity
+            premium[i, j] = leg.premium
+    return is_call, strike, quantity, premium
+
+
+def _simulate_chunk(seed, n_paths, spot, drift, vol, legs, tail):
+    """
+    P&L of every strategy over n_paths terminal prices. Returns the count of
+    profitable paths, the sum and sum of squares of P&L, and the P&L of the
+    first tail paths for the percentiles.
+    """
+    is_call, strike, quantity, premium = legs
+    z = np.random.default_rng(seed).standard_normal(n_paths)
+    # Terminal prices are exact under geometric Brownian motion, so no time steps are needed
+    terminal = vol * z[:, None]
+    terminal += drift
+    np.exp(terminal, out=terminal)
+    terminal *= spot
+    # Payoff and P&L built in place in one array per leg, which is what memory_cap is sized on
+    pnl = terminal[:, :, None] - strike
+    np.negative(pnl, out=pnl, where=~is_call)
+    np.maximum(pnl, 0.0, out=pnl)
+    pnl -= premium
+    pnl *= quantity
+    pnl = pnl.sum(axis=-1)
+    # A copy, so the kept rows don't hold on to the whole chunk
+    return (pnl > 0).sum(axis=0), pnl.sum(axis=0), np.square(pnl).sum(axis=0), pnl[:tail].copy()
+
+
+def simulate(spot, T, sigma, strategies, r=0.02, n_paths=100_000, seed=0, percentiles=DEFAULT_PERCENTILES,
+             memory_cap=DEFAULT_MEMORY_CAP, tail_paths=100_000, workers=1, index=None):
+    """
+    Monte Carlo P&L at expiry for a list of strategies, each a list of Legs
+    on the same underlying and expiry (a single option, a spread, ...).
+
+    The underlying is lognormal at risk-neutral drift r with volatility
+    sigma, either one value or one per strategy (e.g. each strike's IV).
+    All strategies share the same draws, and paths are generated in chunks
+    sized so the working arrays and the P&L kept for the percentiles stay
+    under memory_cap bytes together. Every chunk has its own seed derived
+    from seed, so a run is reproducible for the same seed, n_paths and
+    memory_cap whatever the number of workers. With workers > 1 chunks run
+    in a process pool.
+
+    Returns one row per strategy: pop (share of paths with positive P&L),
+    expected_pnl, their standard errors and the P&L percentiles, computed
+    from the first tail_paths paths (fewer if those would take more than
+    half of memory_cap). P&L is per share, premiums included.
+    """
+    if not strategies:
+        raise ValueError("No strategies to simulate.")
+    legs = _leg_arrays(strategies)
+    n_strategies, width = legs[1].shape
+    sigma = np.broadcast_to(np.asarray(sigma, dtype=np.float64), (n_strategies,))
+    sigma = np.where(np.isfinite(sigma) & (sigma > 0), sigma, 0.0)
+    drift = (r - 0.5 * sigma ** 2) * T
+    vol = sigma * np.sqrt(T)
+
+    # The P&L rows kept for the percentiles take at most half the cap; the chunks get the rest for
+    # the per-leg P&L, plus terminal prices, P&L and its square per strategy
+    tail_paths = min(tail_paths, n_paths, max(1, int(memory_cap // (2 * 8 * n_strategies))))
+    bytes_per_path = 8 * n_strategies * (width + 3)
+    chunk = max(1, int((memory_cap - 8 * n_strategies * tail_paths) // bytes_per_path))
+    starts = range(0, n_paths, chunk)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    tasks = [(seeds[i], min(chunk, n_paths - start), spot, drift, vol, legs, max(0, min(chunk, tail_paths - start)))
+             for i, start in enumerate(starts)]
+
+    wins = np.zeros(n_strategies)
+    total = np.zeros(n_strategies)
+    total_sq = np.zeros(n_strategies)
+    tails = []
+    if workers > 1:
+        with ProcessPoolExecutor(min(workers, len(tasks)) or 1) as pool:
+            outcomes = pool.map(_simulate_chunk, *zip(*tasks))
+            for chunk_wins, chunk_total, chunk_sq, tail in outcomes:
+                wins += chunk_wins
+                total += chunk_total
+                total_sq += chunk_sq
+                tails.append(tail)
+    else:
+        for task in tasks:
+            chunk_wins, chunk_total, chunk_sq, tail = _simulate_chunk(*task)
+            wins += chunk_wins
+            total += chunk_total
+            total_sq += chunk_sq
+            tails.append(tail)
+
+    pop = wins / n_paths
+    expected = total / n_paths
+    variance = np.maximum(total_sq / n_paths - expected ** 2, 0.0)
+    tails = [t for t in tails if len(t)]
+    tail = tails[0] if len(tails) == 1 else np.concatenate(tails)
+    del tails
+    result = pd.DataFrame({
+        'pop': pop,
+        'pop_stderr': np.sqrt(pop * (1 - pop) / n_paths),
+        'expected_pnl': expected,
+        'expected_pnl_stderr': np.sqrt(variance / n_paths),
+    }, index=index)
+    for q, values in zip(percentiles, np.percentile(tail, percentiles, axis=0, overwrite_input=True)):
+        result[f'pnl_p{q}'] = values
+    return result
+
+
+def _premium(chain):
+    # Mid of bid/ask where both sides are quoted and the ask where only the offer is. With no offer
+    # either, the last trade if the chain has one (download_option drops it), otherwise NaN
+    bid = chain['bid'].to_numpy(dtype=float)
+    ask = chain['ask'].to_numpy(dtype=float)
+    last = chain['lastPrice'].to_numpy(dtype=float) if 'lastPrice' in chain.columns else np.full(len(chain), np.nan)
+    return np.where(ask > 0, np.where(bid > 0, (bid + ask) / 2, ask), last)
+
+
+def single_legs(chain, option_type, quantity=1):
+    """
+    One strategy per row of a calls or puts frame: buy (or sell, quantity < 0)
+    that strike. A strike without an ask or last trade gets a NaN premium.
+    """
+    premium = _premium(chain)
+    strategies = [[Leg(option_type, strike, quantity, p)] for strike, p in zip(chain['strike'].to_numpy(dtype=float), premium)]
+    return strategies, chain['impliedVolatility'].to_numpy(dtype=float)
+
+
+def vertical_spreads(chain, option_type, width=1):
+    """
+    Debit spreads from a calls or puts frame: buy each strike and sell the
+    one width rows further out of the money. Each spread is simulated at the
+    mean IV of its two strikes.
+    """
+    chain = chain.sort_values('strike')
+    if option_type == 'put':
+        chain = chain.iloc[::-1]
+    strike = chain['strike'].to_numpy(dtype=float)
+    premium = _premium(chain)
+    iv = chain['impliedVolatility'].to_numpy(dtype=float)
+    strategies = [[Leg(option_type, strike[i], 1, premium[i]), Leg(option_type, strike[i + width], -1, premium[i + width])]
+                  for i in range(len(strike) - width)]
+    return strategies, (iv[:-width] + iv[width:]) / 2
@@ -0,0 +1,161 @@
+import numpy as np
+
+
+def _norm_pdf(x):
+    return np.exp(-0.5 * x ** 2) / np.sqrt(2 * np.pi)
+
+
+def _is_call(option_type):
+    # Accept a single 'call'/'put' string or an array of them (one per strike); callers broadcast it
+    return np.char.lower(np.asarray(option_type, dtype=str)) == 'call'
+
+
+def black_scholes_batch(S, K, T, sigma, option_type, r=0.02):
+    """
+    Price a whole chain of European options in one vectorized pass.
+
+    S, K, T (in years), sigma and r can be scalars or NumPy arrays of any
+    broadcastable shape; option_type is 'call', 'put' or an array of those.
+    Returns a dict of arrays: 'itm_probability' (N(d1) / N(-d1), the same
+    value StockAnalyzer.black_scholes reports), 'price', 'delta', 'gamma',
+    'vega' (per 1.00 of volatility) and 'theta' (per year).
+
+    Strikes with sigma <= 0 or T <= 0 are handled with masks instead of
+    branches: they fall back to intrinsic values like the scalar version.
+    """
+    # scipy.special is much lighter to import than scipy.stats, and only loaded when pricing
+    from scipy.special import ndtr
+
+    S, K, T, sigma, r, is_call = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (S, K, T, sigma, r)), _is_call(option_type))
+
+    degenerate = (sigma <= 0) | (T <= 0) | ~np.isfinite(sigma) | ~np.isfinite(T)
+    # Substitute harmless values for the degenerate rows so the closed-form
+    # math below never divides by zero; their results are overwritten later.
+    safe_T = np.where(degenerate, 1.0, T)
+    safe_sigma = np.where(degenerate, 1.0, sigma)
+
+    sqrt_T = np.sqrt(safe_T)
+    sig_sqrt_T = safe_sigma * sqrt_T
+    d1 = (np.log(S / K) + (r + 0.5 * safe_sigma ** 2) * safe_T) / sig_sqrt_T
+    d2 = d1 - sig_sqrt_T
+
+    discount = np.exp(-r * np.where(degenerate, np.maximum(T, 0), safe_T))
+    pdf_d1 = _norm_pdf(d1)
+    cdf_d1 = ndtr(d1)
+    cdf_d2 = ndtr(d2)
+    cdf_neg_d1 = 1.0 - cdf_d1
+    cdf_neg_d2 = 1.0 - cdf_d2
+
+    itm_probability = np.where(is_call, cdf_d1, cdf_neg_d1)
+    price = np.where(is_call,
+                     S * cdf_d1 - K * discount * cdf_d2,
+                     K * discount * cdf_neg_d2 - S * cdf_neg_d1)
+    delta = np.where(is_call, cdf_d1, cdf_d1 - 1.0)
+    gamma = pdf_d1 / (S * sig_sqrt_T)
+    vega = S * pdf_d1 * sqrt_T
+    time_decay = -S * pdf_d1 * safe_sigma / (2 * sqrt_T)
+    theta = np.where(is_call,
+                     time_decay - r * K * discount * cdf_d2,
+                     time_decay + r * K * discount * cdf_neg_d2)
+
+    # Zero volatility or no time left: the option is worth its (discounted) intrinsic value
+    itm_now = np.where(is_call, S > K, S < K)
+    itm_forward = np.where(is_call, S > K * discount, S < K * discount)
+    intrinsic = np.where(is_call, S - K * discount, K * discount - S)
+    itm_probability = np.where(degenerate, itm_now.astype(np.float64), itm_probability)
+    price = np.where(degenerate, np.maximum(intrinsic, 0.0), price)
+    delta = np.where(degenerate, np.where(itm_forward, np.where(is_call, 1.0, -1.0), 0.0), delta)
+    gamma = np.where(degenerate, 0.0, gamma)
+    vega = np.where(degenerate, 0.0, vega)
+    theta = np.where(degenerate,
+                     np.where(itm_forward, np.where(is_call, -1.0, 1.0) * r * K * discount, 0.0),
+                     theta)
+
+    return {
+        'itm_probability': itm_probability,
+        'price': price,
+        'delta': delta,
+        'gamma': gamma,
+        'vega': vega,
+        'theta': theta,
+    }
+
+
+def itm_probability(S, K, T, sigma, option_type, r=0.02):
+    """Vectorized counterpart of StockAnalyzer.black_scholes (ITM probability only)."""
+    from scipy.special import ndtr
+
+    S, K, T, sigma, r, is_call = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (S, K, T, sigma, r)), _is_call(option_type))
+
+    degenerate = (sigma <= 0) | (T <= 0) | ~np.isfinite(sigma) | ~np.isfinite(T)
+    safe_T = np.where(degenerate, 1.0, T)
+    safe_sigma = np.where(degenerate, 1.0, sigma)
+    d1 = (np.log(S / K) + (r + 0.5 * safe_sigma ** 2) * safe_T) / (safe_sigma * np.sqrt(safe_T))
+    d1 = np.where(is_call, d1, -d1)
+
+    itm_now = np.where(is_call, S > K, S < K).astype(np.float64)
+    return np.where(degenerate, itm_now, ndtr(d1))
+
+
+class ItmPricer:
+    """
+    itm_probability for one chain and a fixed T, re-evaluated as the spot
+    moves. Everything that does not depend on the spot is folded into d1 =
+    slope * log(S) + intercept once, so each new spot costs one log, a
+    multiply-add and ndtr over the strikes.
+    """
+
+    def __init__(self, K, T, sigma, option_type, r=0.02):
+        from scipy.special import ndtr
+        self._ndtr = ndtr
+
+        K, T, sigma, r, self.is_call = np.broadcast_arrays(
+            *(np.asarray(x, dtype=np.float64) for x in (K, T, sigma, r)), _is_call(option_type))
+        self.K = K
+        self.degenerate = (sigma <= 0) | (T <= 0) | ~np.isfinite(sigma) | ~np.isfinite(T)
+        safe_T = np.where(self.degenerate, 1.0, T)
+        safe_sigma = np.where(self.degenerate, 1.0, sigma)
+        # Puts use -d1, so the sign goes into both coefficients
+        sign = np.where(self.is_call, 1.0, -1.0)
+        scale = safe_sigma * np.sqrt(safe_T)
+        self._slope = sign / scale
+        self._intercept = sign * ((r + 0.5 * safe_sigma ** 2) * safe_T - np.log(K)) / scale
+        self._any_degenerate = bool(self.degenerate.any())
+
+    def __call__(self, S):
+        probability = self._ndtr(self._slope * np.log(S) + self._intercept)
+        if self._any_degenerate:
+            itm_now = np.where(self.is_call, S > self.K, S < self.K)
+            probability = np.where(self.degenerate, itm_now.astype(np.float64), probability)
+        return probability
+
+
+def profit_probability(S, K, T, sigma, option_type, premium=0.0, r=0.02):
+    """
+    Closed-form probability that a long option held to expiry ends past its
+    break-even (K + premium for calls, K - premium for puts), with the
+    underlying lognormal at risk-neutral drift r. A short position profits
+    with the complementary probability.
+
+    This is N(d2) at the break-even strike; itm_probability keeps the N(d1)
+    figure download_option has always reported.
+    """
+    from scipy.special import ndtr
+
+    S, K, T, sigma, premium, r, is_call = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (S, K, T, sigma, premium, r)), _is_call(option_type))
+    breakeven = np.where(is_call, K + premium, K - premium)
+
+    degenerate = (sigma <= 0) | (T <= 0) | ~np.isfinite(sigma) | ~np.isfinite(T) | (breakeven <= 0)
+    safe_T = np.where(degenerate, 1.0, T)
+    safe_sigma = np.where(degenerate, 1.0, sigma)
+    safe_breakeven = np.where(breakeven > 0, breakeven, 1.0)
+    d2 = (np.log(S / safe_breakeven) + (r - 0.5 * safe_sigma ** 2) * safe_T) / (safe_sigma * np.sqrt(safe_T))
+    d2 = np.where(is_call, d2, -d2)
+
+    # Nothing left to move: profitable only if already past break-even; a put
+    # whose break-even is at or below zero can never pay back its premium
+    past_now = np.where(is_call, S > breakeven, S < breakeven).astype(np.float64)
+    return np.where(degenerate, past_now, ndtr(d2))
@@ -0,0 +1,150 @@
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from .monte_carlo import time_to_expiry
+from .option_pricing import itm_probability
+
+SURFACE_COLUMNS = ['ticker', 'expiry', 'type', 'strike', 'impliedVolatility', 'openInterest', 'volume',
+                   'bid', 'ask', 'InTheMoney_probability']
+CATEGORICAL_COLUMNS = ['ticker', 'expiry', 'type']
+# Compact on-disk dtypes; categoricals are stored as integer codes plus their categories
+STORAGE_DTYPES = {
+    'strike': np.float32,
+    'impliedVolatility': np.float32,
+    'openInterest': np.int32,
+    'volume': np.int32,
+    'bid': np.float32,
+    'ask': np.float32,
+    'InTheMoney_probability': np.float32,
+}
+
+
+def _long_format(ticker, expiry, chain, spot):
+    # calls and puts of one expiry, stacked with the vectorized ITM probability
+    T = time_to_expiry(expiry)
+    frames = []
+    for option_type, frame in (('call', chain.calls), ('put', chain.puts)):
+        if frame is None or frame.empty:
+            continue
+        frame = pd.DataFrame({
+            'strike': frame['strike'].to_numpy(dtype=float),
+            'impliedVolatility': frame['impliedVolatility'].to_numpy(dtype=float),
+            'openInterest': frame['openInterest'].fillna(0).to_numpy(),
+            'volume': frame['volume'].fillna(0).to_numpy(),
+            'bid': frame['bid'].to_numpy(dtype=float),
+            'ask': frame['ask'].to_numpy(dtype=float),
+        })
+        frame['InTheMoney_probability'] = itm_probability(spot, frame['strike'].to_numpy(), T,
+                                                          frame['impliedVolatility'].to_numpy(), option_type)
+        frame.insert(0, 'type', option_type)
+        frames.append(frame)
+    if not frames:
+        return None
+    surface = pd.concat(frames, ignore_index=True)
+    surface.insert(0, 'expiry', expiry)
+    surface.insert(0, 'ticker', ticker)
+    return surface
+
+
+def _categorize(surface):
+    for col in CATEGORICAL_COLUMNS:
+        surface[col] = surface[col].astype('category')
+    return surface
+
+
+def fetch_surface(ticker, provider, spot, expiries=None, max_workers=8):
+    """
+    Fetch the option chain of every listed expiry (or just the given ones)
+    concurrently through one provider, so a single yf.Ticker and its session
+    are shared, and return them as one long-format frame with SURFACE_COLUMNS.
+
+    Expiries that fail to download are skipped and listed in
+    frame.attrs['failed_expiries'].
+    """
+    expiries = list(expiries) if expiries else provider.option_expiries(ticker)
+    failed = []
+
+    def fetch(expiry):
+        try:
+            return _long_format(ticker, expiry, provider.option_chain(ticker, expiry), spot)
+        except Exception as e:
+            failed.append((expiry, f"{type(e).__name__}: {e}"))
+            return None
+
+    with ThreadPoolExecutor(max(1, min(max_workers, len(expiries)))) as pool:
+        frames = [frame for frame in pool.map(fetch, expiries) if frame is not None]
+
+    if frames:
+        surface = pd.concat(frames, ignore_index=True)
+    else:
+        surface = pd.DataFrame(columns=SURFACE_COLUMNS)
+    surface = _categorize(surface)
+    surface.attrs['failed_expiries'] = failed
+    return surface
+
+
+def partition_path(root, ticker, snapshot):
+    return os.path.join(root, ticker, 'option_surface', f'{snapshot}.npz')
+
+
+def save_surface(surface, root='data', snapshot=None):
+    """
+    Write one partition per ticker at '<root>/<ticker>/option_surface/<snapshot>.npz'.
+
+    Numeric columns are downcast to STORAGE_DTYPES and the categorical
+    columns are dictionary-encoded (codes + categories), so a full surface
+    takes a fraction of the CSV size. Returns the written paths.
+    """
+    snapshot = snapshot if snapshot else date.today().isoformat()
+    surface = _categorize(surface.copy())
+    paths = []
+    for ticker, partition in surface.groupby('ticker', observed=True):
+        arrays = {}
+        for col in CATEGORICAL_COLUMNS:
+            values = partition[col].cat.remove_unused_categories()
+            arrays[f'{col}.codes'] = values.cat.codes.to_numpy()
+            arrays[f'{col}.categories'] = values.cat.categories.astype(str).to_numpy(dtype=str)
+        for col, dtype in STORAGE_DTYPES.items():
+            arrays[col] = partition[col].to_numpy(dtype=dtype)
+
+        path = partition_path(root, ticker, snapshot)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        paths.append(path)
+    return paths
+
+
+def load_surface(root='data', tickers=None, snapshot=None):
+    """Read stored partitions back into one frame with categorical ticker/expiry/type columns."""
+    snapshot = snapshot if snapshot else date.today().isoformat()
+    if tickers is None:
+        tickers = sorted(name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name)))
+    frames = []
+    for ticker in tickers:
+        path = partition_path(root, ticker, snapshot)
+        if not os.path.exists(path):
+            continue
+        with np.load(path, allow_pickle=False) as stored:
+            frame = pd.DataFrame({col: pd.Categorical.from_codes(stored[f'{col}.codes'], stored[f'{col}.categories'])
+                                  for col in CATEGORICAL_COLUMNS})
+            for col in STORAGE_DTYPES:
+                frame[col] = stored[col]
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=SURFACE_COLUMNS)
+    # Partitions have different categories, so re-encode once after concatenating
+    surface = pd.concat(frames, ignore_index=True)
+    return _categorize(surface)[SURFACE_COLUMNS]
@@ -0,0 +1,190 @@
+import os
+import tempfile
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from .data_providers import DataProvider
+
+
+class PriceCache:
+    """
+    On-disk OHLCV store, one memory-mapped NumPy file per ticker at
+    '<root>/<ticker>/prices.npy'. Rows are a structured array with the bar
+    date (int64 nanoseconds) followed by one field per price column.
+    """
+
+    filename = 'prices.npy'
+
+    def __init__(self, root='data'):
+        self.root = root
+        self.stats = {'hits': 0, 'partial_hits': 0, 'misses': 0, 'rows_from_cache': 0, 'rows_fetched': 0}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks can't be pickled; worker processes get their own
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def path(self, ticker, filename=None):
+        return os.path.join(self.root, ticker, filename if filename else self.filename)
+
+    def tickers(self, filename=None):
+        """Tickers with a stored file under root, in sorted order."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.exists(self.path(name, filename)))
+
+    def load_records(self, ticker, filename=None):
+        """The stored structured array, memory-mapped, or None when nothing is cached."""
+        path = self.path(ticker, filename)
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode='r')
+
+    def load(self, ticker, filename=None):
+        stored = self.load_records(ticker, filename)
+        if stored is None:
+            return None
+        # Copy every field out so the file mapping is released straight away
+        frame = pd.DataFrame({name: np.array(stored[name]) for name in stored.dtype.names if name != 'Date'},
+                             index=pd.DatetimeIndex(np.array(stored['Date']).view('datetime64[ns]'), name='Date'))
+        del stored
+        return frame
+
+    def save(self, ticker, frame, filename=None):
+        directory = os.path.dirname(self.path(ticker, filename))
+        os.makedirs(directory, exist_ok=True)
+
+        index = pd.DatetimeIndex(frame.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        dtype = [('Date', '<i8')] + [(str(col), frame[col].to_numpy().dtype.str) for col in frame.columns]
+        records = np.empty(len(frame), dtype=dtype)
+        records['Date'] = index.as_unit('ns').asi8
+        for col in frame.columns:
+            records[str(col)] = frame[col].to_numpy()
+
+        # Write next to the target and rename over it, so readers never see a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, records)
+            os.replace(tmp_path, self.path(ticker, filename))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def record(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    def report(self):
+        s = self.stats
+        return (f"Price cache: {s['hits']} hits, {s['partial_hits']} partial hits, {s['misses']} misses, "
+                f"{s['rows_from_cache']} rows from cache, {s['rows_fetched']} rows fetched")
+
+
+def _naive(frame):
+    # Stored dates are tz-naive; drop any timezone Yahoo attaches to the index
+    if not frame.empty and getattr(frame.index, 'tz', None) is not None:
+        return frame.tz_localize(None)
+    return frame
+
+
+def _fetch_start(stored, start, end):
+    """
+    First date that has to be fetched for a ticker, or None when the stored
+    bars already cover [start, end). The last stored bar is always refetched
+    in case it was saved mid-session.
+    """
+    if stored is None or stored.empty or stored.index[0] > pd.Timestamp(start):
+        return pd.Timestamp(start)
+    last_stored = stored.index[-1]
+    last_expected = pd.bdate_range(end=pd.Timestamp(end) - pd.Timedelta(days=1), periods=1)[0]
+    if last_stored >= last_expected and last_stored.date() < date.today():
+        return None
+    return last_stored
+
+
+class CachedProvider(DataProvider):
+    """
+    Wraps another provider so price downloads only fetch the bars after the
+    last stored date and append them to a PriceCache. Option chains are
+    always fetched live.
+    """
+
+    def __init__(self, provider, cache):
+        self.provider = provider
+        self.cache = cache
+
+    def _merge(self, ticker, stored, fetched, fetch_start, start, end):
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        if fetch_start is None:
+            self.cache.record('hits')
+            combined = stored
+            reused = stored
+        else:
+            self.cache.record('misses' if stored is None or fetch_start == start else 'partial_hits')
+            fetched = _naive(fetched) if fetched is not None else pd.DataFrame()
+            self.cache.record('rows_fetched', len(fetched))
+            if stored is None or stored.empty or fetch_start <= stored.index[0]:
+                reused = None
+                combined = fetched
+            else:
+                # Fetched bars replace the stored ones from fetch_start onwards
+                reused = stored[stored.index < fetch_start]
+                combined = pd.concat([reused, fetched[stored.columns]]) if not fetched.empty else stored
+            if not combined.empty:
+                self.cache.save(ticker, combined)
+
+        if reused is not None:
+            self.cache.record('rows_from_cache', int(((reused.index >= start) & (reused.index < end)).sum()))
+        if combined.empty:
+            return combined
+        return combined[(combined.index >= start) & (combined.index < end)]
+
+    def download(self, ticker, start, end):
+        stored = self.cache.load(ticker)
+        fetch_start = _fetch_start(stored, start, end)
+        fetched = None
+        if fetch_start is not None:
+            fetched = self.provider.download(ticker, fetch_start.date().isoformat(), end)
+        return self._merge(ticker, stored, fetched, fetch_start, start, end)
+
+    def download_many(self, tickers, start, end):
+        stored = {ticker: self.cache.load(ticker) for ticker in tickers}
+        fetch_starts = {ticker: _fetch_start(stored[ticker], start, end) for ticker in tickers}
+        stale = [ticker for ticker in tickers if fetch_starts[ticker] is not None]
+
+        # One grouped request from the earliest missing date covers every stale ticker
+        fetched = {}
+        if stale:
+            earliest = min(fetch_starts[ticker] for ticker in stale)
+            fetched = self.provider.download_many(stale, earliest.date().isoformat(), end)
+
+        frames = {}
+        for ticker in tickers:
+            if fetch_starts[ticker] is not None and ticker not in fetched:
+                # Leave it to the per-ticker fallback so the real error surfaces
+                continue
+            new_rows = fetched.get(ticker)
+            if new_rows is not None:
+                new_rows = _naive(new_rows)
+                new_rows = new_rows[new_rows.index >= fetch_starts[ticker]]
+            frames[ticker] = self._merge(ticker, stored[ticker], new_rows, fetch_starts[ticker], start, end)
+        return frames
+
+    def option_chain(self, ticker, expiry):
+        return self.provider.option_chain(ticker, expiry)
+
+    def option_expiries(self, ticker):
+        return self.provider.option_expiries(ticker)
@@ -0,0 +1,236 @@
+import json
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+
+def _rows(frame):
+    return len(frame) if frame is not None else 0
+
+
+# Rows each stage worked on, read from the analyzer once the stage is done
+STAGE_ROWS = {
+    'download_data': lambda a: _rows(a.stock_data),
+    'calculate_indicators': lambda a: _rows(a.stock_data),
+    'stock_to_csv': lambda a: _rows(a.stock_data),
+    'plot_stock_data': lambda a: _rows(a.stock_data),
+    'download_option': lambda a: _rows(getattr(a, 'calls', None)) + _rows(getattr(a, 'puts', None)),
+    'option_to_csv': lambda a: _rows(getattr(a, 'calls', None)) + _rows(getattr(a, 'puts', None)),
+    'download_option_surface': lambda a: _rows(a.option_surface),
+    'option_surface_to_file': lambda a: _rows(a.option_surface),
+}
+
+
+def max_rss_bytes():
+    # High-water mark of the process's resident memory; None where getrusage is unavailable
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+@dataclass
+class StageMetrics:
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    max_rss_bytes: int = None
+    peak_memory_bytes: int = None
+    rows: int = 0
+
+
+class _RawStats:
+    # What pstats.Stats accepts in place of a profile file: an object with a stats dict
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class Profiler:
+    """
+    Per-stage instrumentation for run_batch. Every stage records its wall
+    time, the CPU time of the thread running it, the rows it handled and the
+    process's peak resident memory so far. With trace_memory it also records
+    the stage's own peak of Python-tracked allocations above what was live
+    when it started (tracemalloc). That is exact per stage but slows
+    allocation-heavy code several times over, so it is opt-in. Download
+    stages share a process with the other I/O threads, so their peaks
+    overlap.
+
+    With profile_top > 0 every stage also runs under cProfile, and the
+    profiles of the profile_top slowest tickers are written to
+    '<profile_dir>/<ticker>.prof' once the batch is done (open them with
+    pstats or snakeviz).
+
+    Only settings are pickled, so the same Profiler works in the CPU
+    worker processes.
+    """
+
+    def __init__(self, trace_memory=False, profile_top=0, profile_dir='data/profiles'):
+        self.trace_memory = trace_memory
+        self.profile_top = profile_top
+        self.profile_dir = profile_dir
+
+    def run(self, analyzer, stage, fn, result):
+        """Call fn() as analyzer's stage, storing its StageMetrics (and profile) on result."""
+        metrics = StageMetrics()
+        profile = None
+        if self.profile_top:
+            import cProfile
+            profile = cProfile.Profile()
+        if self.trace_memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        cpu = time.thread_time()
+        start = time.perf_counter()
+        try:
+            if profile is not None:
+                try:
+                    profile.enable()
+                except ValueError:
+                    # Another profiler is already active in this process
+                    profile = None
+            return fn()
+        finally:
+            if profile is not None:
+                profile.disable()
+            metrics.wall_seconds = time.perf_counter() - start
+            metrics.cpu_seconds = time.thread_time() - cpu
+            metrics.max_rss_bytes = max_rss_bytes()
+            if self.trace_memory:
+                metrics.peak_memory_bytes = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+            try:
+                metrics.rows = STAGE_ROWS.get(stage, lambda a: 0)(analyzer)
+            except Exception:
+                metrics.rows = 0
+            result.metrics[stage] = metrics
+            if profile is not None:
+                profile.create_stats()
+                result.profiles.append(profile.stats)
+
+    def write_profiles(self, results):
+        """Write the merged profiles of the profile_top slowest tickers; returns the paths."""
+        import pstats
+
+        paths = []
+        slowest = sorted((r for r in results if r.profiles), key=lambda r: r.total_time, reverse=True)
+        os.makedirs(self.profile_dir, exist_ok=True)
+        for result in slowest[:self.profile_top]:
+            stats = pstats.Stats(_RawStats(result.profiles[0]))
+            for profile in result.profiles[1:]:
+                stats.add(_RawStats(profile))
+            path = os.path.join(self.profile_dir, f'{result.ticker}.prof')
+            stats.dump_stats(path)
+            paths.append(path)
+        return paths
+
+
+def metric_records(results):
+    """One dict per ticker and stage: ticker, stage, status and the StageMetrics fields."""
+    records = []
+    for result in results:
+        for stage, metrics in result.metrics.items():
+            failed = result.failed_stage == stage
+            records.append({'ticker': result.ticker, 'stage': stage, 'status': 'error' if failed else 'ok',
+                            **asdict(metrics)})
+    return records
+
+
+def _atomic_write(path, text):
+    # Scrapers (e.g. node_exporter's textfile collector) must never see a half-written file
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def write_jsonl(results, path):
+    """Append one JSON line per ticker and stage, stamped with the run time."""
+    timestamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'a') as f:
+        for record in metric_records(results):
+            f.write(json.dumps({'timestamp': timestamp, **record}) + '\n')
+    return path
+
+
+# Prometheus metric name, StageMetrics field, help text
+PROMETHEUS_METRICS = (
+    ('stockinsight_stage_wall_seconds', 'wall_seconds', 'Wall time of a pipeline stage.'),
+    ('stockinsight_stage_cpu_seconds', 'cpu_seconds', 'CPU time of the thread running a pipeline stage.'),
+    ('stockinsight_stage_max_rss_bytes', 'max_rss_bytes', 'Peak resident memory of the process after a pipeline stage.'),
+    ('stockinsight_stage_peak_memory_bytes', 'peak_memory_bytes', 'Peak traced allocations during a pipeline stage.'),
+    ('stockinsight_stage_rows', 'rows', 'Rows handled by a pipeline stage.'),
+)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def write_prometheus(results, path):
+    """Replace path with the metrics in the Prometheus text exposition format, one sample per ticker and stage."""
+    records = metric_records(results)
+    lines = []
+    for name, field, help_text in PROMETHEUS_METRICS:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+        for record in records:
+            if record[field] is not None:
+                lines.append(f'{name}{{ticker="{_label(record["ticker"])}",stage="{record["stage"]}"}} {record[field]}')
+    lines += ['# HELP stockinsight_ticker_failed 1 if the ticker failed at this stage.',
+              '# TYPE stockinsight_ticker_failed gauge']
+    for result in results:
+        if result.status != 'ok':
+            lines.append(f'stockinsight_ticker_failed{{ticker="{_label(result.ticker)}",'
+                         f'stage="{result.failed_stage}"}} 1')
+    _atomic_write(path, '\n'.join(lines) + '\n')
+    return path
+
+
+def write_metrics(results, path):
+    """Prometheus text for a '.prom' path, JSON lines otherwise."""
+    if path.endswith('.prom'):
+        return write_prometheus(results, path)
+    return write_jsonl(results, path)
+
+
+def summarize(results):
+    """
+    Per-stage table of tickers, wall and CPU seconds, rows per wall second,
+    the largest traced peak (with trace_memory) and the process RSS peak.
+    """
+    totals = {}
+    for record in metric_records(results):
+        stage = totals.setdefault(record['stage'], {'tickers': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rows': 0,
+                                                    'peak_memory_bytes': 0, 'max_rss_bytes': 0})
+        stage['tickers'] += 1
+        stage['wall_seconds'] += record['wall_seconds']
+        stage['cpu_seconds'] += record['cpu_seconds']
+        stage['rows'] += record['rows']
+        for key in ('peak_memory_bytes', 'max_rss_bytes'):
+            stage[key] = max(stage[key], record[key] or 0)
+    lines = [f"{'stage':<24} {'tickers':>7} {'wall s':>8} {'cpu s':>8} {'rows/s':>10} {'peak MB':>8} {'RSS MB':>8}"]
+    for stage, t in totals.items():
+        rate = t['rows'] / t['wall_seconds'] if t['wall_seconds'] else 0.0
+        peak = f"{t['peak_memory_bytes'] / 2 ** 20:.1f}" if t['peak_memory_bytes'] else '-'
+        lines.append(f"{stage:<24} {t['tickers']:>7} {t['wall_seconds']:>8.2f} {t['cpu_seconds']:>8.2f} "
+                     f"{rate:>10,.0f} {peak:>8} {t['max_rss_bytes'] / 2 ** 20:>8.1f}")
+    return '\n'.join(lines)
@@ -0,0 +1,246 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .indicator_engine import FIB_RATIOS
+
+PRICE_FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+# One dense (dates x tickers) float64 array per field, NaN where a ticker has no bar
+Panel = namedtuple('Panel', ['dates', 'tickers', 'fields'])
+
+
+def load_panel(cache, tickers, start=None, end=None, fields=PRICE_FIELDS):
+    """
+    Align the cached prices of tickers on the union of their dates. Tickers
+    with nothing stored in [start, end) are left out of the panel.
+    """
+    start = pd.Timestamp(start).value if start is not None else None
+    end = pd.Timestamp(end).value if end is not None else None
+
+    loaded = {}
+    for ticker in tickers:
+        stored = cache.load_records(ticker)
+        if stored is None:
+            continue
+        dates = np.array(stored['Date'])
+        keep = np.ones(len(dates), dtype=bool)
+        if start is not None:
+            keep &= dates >= start
+        if end is not None:
+            keep &= dates < end
+        if keep.any():
+            loaded[ticker] = (dates[keep], {field: np.asarray(stored[field][keep], dtype=float)
+                                            for field in fields if field in stored.dtype.names})
+        del stored
+
+    if not loaded:
+        return Panel(pd.DatetimeIndex([], name='Date'), [], {field: np.empty((0, 0)) for field in fields})
+    union = np.unique(np.concatenate([dates for dates, _ in loaded.values()]))
+    panel = {field: np.full((len(union), len(loaded)), np.nan) for field in fields}
+    for col, (dates, values) in enumerate(loaded.values()):
+        rows = np.searchsorted(union, dates)
+        for field, column in values.items():
+            panel[field][rows, col] = column
+    return Panel(pd.DatetimeIndex(union.view('datetime64[ns]'), name='Date'), list(loaded), panel)
+
+
+def panel_from_frames(frames, fields=PRICE_FIELDS):
+    """Panel from a {ticker: OHLCV frame} mapping, e.g. StockAnalyzer.stock_data of a few tickers."""
+    frames = {ticker: frame for ticker, frame in frames.items() if frame is not None and not frame.empty}
+    if not frames:
+        return Panel(pd.DatetimeIndex([], name='Date'), [], {field: np.empty((0, 0)) for field in fields})
+    dates = pd.DatetimeIndex(sorted(set().union(*(frame.index for frame in frames.values()))), name='Date')
+    panel = {field: np.full((len(dates), len(frames)), np.nan) for field in fields}
+    for col, frame in enumerate(frames.values()):
+        rows = dates.get_indexer(frame.index)
+        for field in fields:
+            if field in frame.columns:
+                panel[field][rows, col] = frame[field].to_numpy(dtype=float)
+    return Panel(dates, list(frames), panel)
+
+
+def _ffill(values):
+    # Last non-NaN value at or above every row, column by column
+    rows = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return values[rows, np.arange(values.shape[1])]
+
+
+def _previous(values):
+    # Value of the previous bar of each ticker, skipping rows where it had none
+    previous = np.full(values.shape, np.nan)
+    previous[1:] = _ffill(values)[:-1]
+    return previous
+
+
+def _ewm(values, alpha, min_periods):
+    """
+    ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean() down every
+    column at once, seeded with each column's first value. Rows where a
+    column has no bar hold its previous average.
+    """
+    from scipy.signal import lfilter
+
+    # One row per ticker with its bars packed, in order, at the front, so the recursion runs in C
+    # over unbroken blocks. The spare last slot is always NaN.
+    bars = values.T
+    valid = ~np.isnan(bars)
+    count = np.cumsum(valid, axis=1, dtype=np.int32)
+    width = bars.shape[1] + 1
+    packed = np.full((bars.shape[0], width), np.nan)
+    packed[np.arange(width) < count[:, -1:]] = bars[valid]
+    # The initial state makes each ticker's first output its first bar
+    average = lfilter([alpha], [1.0, alpha - 1], packed, zi=(1 - alpha) * packed[:, :1])[0]
+    average[:, :max(min_periods - 1, 0)] = np.nan
+    # Every row reads the average as of the ticker's latest bar; before its first, the NaN slot
+    latest = count + (np.arange(bars.shape[0]) * width - 1)[:, None]
+    return np.take(average, latest).T
+
+
+def _compacted(values):
+    # Each column's bars moved up to the top rows, in order, and the row each one came from
+    order = np.argsort(np.isnan(values), axis=0, kind='stable')
+    return np.take_along_axis(values, order, axis=0), order
+
+
+def _scattered(compact, order):
+    out = np.empty_like(compact)
+    np.put_along_axis(out, order, compact, axis=0)
+    return out
+
+
+def _rolling_sum(values, window):
+    """
+    rolling(window, min_periods=window).sum() down every column, from
+    cumulative sums. Windows count each ticker's own bars, so a date
+    another ticker traded on does not break them.
+    """
+    values, order = _compacted(values)
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0.0), axis=0)
+    counts = np.cumsum(valid, axis=0)
+    sums[window:] -= sums[:-window].copy()
+    counts[window:] -= counts[:-window].copy()
+    sums[counts < window] = np.nan
+    return _scattered(sums, order)
+
+
+def _rolling_extreme(values, window, reduce):
+    # Over each ticker's own last window bars, like _rolling_sum
+    values, order = _compacted(values)
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = reduce(sliding_window_view(values, window, axis=0), axis=-1)
+    return _scattered(out, order)
+
+
+def panel_indicators(panel, ema_window=24, sma_windows=(50, 200), rsi_window=14, mfi_window=14, fib_window=30):
+    """
+    EMA/SMA/RSI/MFI and the Fibonacci levels of calculate_indicators for
+    every ticker of the panel at once, using the ta formulas. The Fibonacci
+    levels are rolling over the last fib_window bars, so their value on a
+    ticker's latest bar is the one StockAnalyzer stores.
+    """
+    high, low, close, volume = (panel.fields[field] for field in ('High', 'Low', 'Close', 'Volume'))
+    missing = np.isnan(close)
+    values = {}
+
+    values[f'EMA{ema_window}'] = _ewm(close, 2 / (ema_window + 1), ema_window)
+    for window in sma_windows:
+        values[f'SMA{window}'] = _rolling_sum(close, window) / window
+
+    # ta counts the first bar of each ticker as no change
+    change = close - _previous(close)
+    change[np.isnan(change) & ~missing] = 0.0
+    up = _ewm(np.where(change > 0, change, np.where(missing, np.nan, 0.0)), 1 / rsi_window, rsi_window)
+    down = _ewm(np.where(change < 0, -change, np.where(missing, np.nan, 0.0)), 1 / rsi_window, rsi_window)
+
+    typical = (high + low + close) / 3.0
+    previous = _previous(typical)
+    flow = typical * volume * np.where(typical > previous, 1, np.where(typical < previous, -1, 0))
+    positive = _rolling_sum(np.where(flow >= 0, flow, np.where(missing, np.nan, 0.0)), mfi_window)
+    negative = -_rolling_sum(np.where(flow < 0, flow, np.where(missing, np.nan, 0.0)), mfi_window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values['RSI'] = np.where(down == 0, 100.0, 100 - 100 / (1 + up / down))
+        values['MFI'] = 100 - 100 / (1 + positive / negative)
+
+    recent_max = _rolling_extreme(close, fib_window, np.max)
+    recent_min = _rolling_extreme(close, fib_window, np.min)
+    for ratio in FIB_RATIOS:
+        values[f'Fib_{ratio}'] = recent_max - (recent_max - recent_min) * ratio
+
+    # Rows where a ticker has no bar carry no indicator values either
+    for array in values.values():
+        array[missing] = np.nan
+    return values
+
+
+def _alias(name):
+    # Fib_0.618 is written Fib_0_618 in expressions
+    return name.replace('.', '_')
+
+
+def evaluate(values, expression):
+    """
+    Evaluate a filter such as 'RSI < 30 and Close > SMA200' over a dict of
+    equally shaped arrays and return the boolean result. Comparisons with
+    NaN are False, so bars without enough history never match.
+    """
+    local_dict = {_alias(name): array for name, array in values.items()}
+    result = pd.eval(expression, local_dict=local_dict)
+    shape = np.shape(next(iter(values.values())))
+    return np.broadcast_to(np.asarray(result, dtype=bool), shape)
+
+
+def _last_rows(close):
+    # Row of each ticker's latest bar, -1 for tickers without any
+    valid = ~np.isnan(close)
+    rows = len(close) - 1 - np.argmax(valid[::-1], axis=0)
+    rows[~valid.any(axis=0)] = -1
+    return rows
+
+
+def screen(cache, tickers, expression, rank_by=None, ascending=True, limit=None, start=None, as_of=None,
+           chunk_size=250):
+    """
+    Run expression against the latest bar of every ticker (on or before
+    as_of) and return the matches, one row per ticker, sorted by rank_by.
+
+    Tickers are processed chunk_size at a time, so memory is bounded by
+    one chunk's panel rather than the whole universe. Tickers without
+    cached prices are listed in attrs['missing'].
+    """
+    tickers = list(dict.fromkeys(tickers))
+    end = pd.Timestamp(as_of) + pd.Timedelta(days=1) if as_of is not None else None
+    matches = []
+    missing = []
+    for offset in range(0, len(tickers), chunk_size):
+        chunk = tickers[offset:offset + chunk_size]
+        panel = load_panel(cache, chunk, start, end)
+        loaded = set(panel.tickers)
+        missing.extend(ticker for ticker in chunk if ticker not in loaded)
+        if not panel.tickers:
+            continue
+
+        values = {**panel.fields, **panel_indicators(panel)}
+        rows = _last_rows(panel.fields['Close'])
+        columns = np.arange(len(panel.tickers))
+        latest = {name: array[rows, columns] for name, array in values.items()}
+        hits = evaluate(latest, expression) & (rows >= 0)
+        if hits.any():
+            frame = pd.DataFrame({name: column[hits] for name, column in latest.items()},
+                                 index=pd.Index(np.array(panel.tickers)[hits], name='Ticker'))
+            frame.insert(0, 'Date', panel.dates[rows[hits]])
+            matches.append(frame)
+        del panel, values, latest
+
+    result = pd.concat(matches) if matches else pd.DataFrame(index=pd.Index([], name='Ticker'))
+    if rank_by is not None and not result.empty:
+        result = result.sort_values(rank_by, ascending=ascending, kind='stable')
+    if limit is not None:
+        result = result.head(limit)
+    result.attrs['missing'] = missing
+    return result
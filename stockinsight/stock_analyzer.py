@@ -1,23 +1,42 @@
 import os
-import yfinance as yf
-import ta
 import numpy as np
 import pandas as pd
-from scipy.stats import norm
-from datetime import date, datetime 
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from mplfinance.original_flavor import candlestick_ohlc
+from datetime import date
 import calendar
+from .option_pricing import itm_probability
+from .option_surface import fetch_surface, save_surface
+from .monte_carlo import simulate, single_legs, time_to_expiry
+from .implied_vol import IV_SOURCES, recompute_iv, smooth_surface
+from .data_providers import YahooProvider, prefetch
+from .fetch import resilient
+from .price_cache import CachedProvider
+from .indicator_engine import IndicatorStore, compute_indicators
+from .compact import TickerSummary, compact_chain, compact_stock_data, downcast, expand
 
 class StockAnalyzer:
-    def __init__(self, ticker, start_date, end_date=None, expiry=None):
+    def __init__(self, ticker, start_date, end_date=None, expiry=None, provider=None, indicator_store=None,
+                 renderer=None, iv_source='yahoo', compact=False, store=None):
         self.ticker = ticker
         self.start_date = start_date
         self.end_date = end_date if end_date else date.today().isoformat()
         self.expiry = expiry
+        # Yahoo requests are retried with backoff by default; pass a provider to choose otherwise
+        self.provider = provider if provider else resilient(YahooProvider())
+        self.indicator_store = indicator_store
+        self.renderer = renderer
+        if iv_source not in IV_SOURCES:
+            raise ValueError(f"Unknown IV source '{iv_source}'. Choose from {', '.join(IV_SOURCES)}.")
+        # 'mid' re-solves every strike's IV from its bid/ask mid, 'smoothed' fits a surface across strikes
+        self.iv_source = iv_source
+        self.vol_surface = None
+        # Keep float32 frames, with per-ticker constants (Fibonacci levels, spot, expiry) as attrs rather than columns
+        self.compact = compact
+        self.fib_levels = {}
+        # An AnalyticsStore that stock_to_csv and option_to_csv also append to
+        self.store = store
         self.stock_data = None
         self.option_chain = None
+        self.option_surface = None
         self.indicators = {}
         # Create the directory for the ticker if it doesn't exist
         self.directory = f'data/{self.ticker}'
@@ -60,6 +79,7 @@ class StockAnalyzer:
             else:
                 return 1.0 if S < K else 0.0
         
+        from scipy.stats import norm
         try:
             d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
             if optionType == 'call':
@@ -71,34 +91,92 @@ class StockAnalyzer:
             return 0.0  # Return a default value or handle the exception as needed
 
     def download_data(self):
-        self.stock_data = yf.download(self.ticker, start=self.start_date, end=self.end_date)
+        self.stock_data = self.provider.download(self.ticker, self.start_date, self.end_date)
         self.close_price = self.stock_data['Close'].iloc[-1]
 
     def download_option(self):
-        self.option_chain = yf.Ticker(self.ticker).option_chain(self.expiry)
-        self.puts = self.option_chain.puts.drop(['lastPrice','change','percentChange','inTheMoney', 'contractSize', 'currency'], axis=1)
+        self.option_chain = self.provider.option_chain(self.ticker, self.expiry)
+        puts, calls = self.option_chain.puts, self.option_chain.calls
+        # Every row shares the same spot and expiry, so price the whole chain in one vectorized pass,
+        # with T in hours to the expiry's close whichever IVs are used
+        T = time_to_expiry(self.expiry)
+        if self.iv_source != 'yahoo':
+            puts, calls = self._recompute_iv(puts, calls, T)
+        self.puts = puts.drop(['lastPrice','change','percentChange','inTheMoney', 'contractSize', 'currency'], axis=1)
         self.puts['last_price'] = self.close_price
         # Want to filter out some deeply far ITM/OTM strikes to save token count.
         self.puts = self.puts[(self.puts['strike'] > self.close_price * 0.7) & (self.puts['strike'] < self.close_price * 1.5)]
         self.puts['expiry_date'] = pd.to_datetime(self.expiry)
-        self.puts['InTheMoney_probability'] = self.puts.apply(lambda row: self.black_scholes(
-            S = row['last_price'], 
-            K = row['strike'], 
-            T = (row['expiry_date'] - datetime.now()).days / 365,  
-            sigma = row['impliedVolatility'], 
-            optionType = 'put'
-            ), axis = 1)
-        self.calls = self.option_chain.calls.drop(['lastPrice','change','percentChange','inTheMoney', 'contractSize', 'currency'], axis=1)
+        self.puts['InTheMoney_probability'] = itm_probability(
+            S = self.close_price,
+            K = self.puts['strike'].to_numpy(),
+            T = T,
+            sigma = self.puts['impliedVolatility'].to_numpy(),
+            option_type = 'put'
+            )
+        self.calls = calls.drop(['lastPrice','change','percentChange','inTheMoney', 'contractSize', 'currency'], axis=1)
         self.calls['last_price'] = self.close_price
         self.calls = self.calls[(self.calls['strike'] > self.close_price * 0.5) & (self.calls['strike'] < self.close_price * 1.8)]
         self.calls['expiry_date'] = pd.to_datetime(self.expiry)
-        self.calls['InTheMoney_probability'] = self.calls.apply(lambda row: self.black_scholes(
-            S = row['last_price'], 
-            K = row['strike'], 
-            T = (row['expiry_date'] - datetime.now()).days / 365, 
-            sigma = row['impliedVolatility'], 
-            optionType = 'call'
-            ), axis=1)
+        self.calls['InTheMoney_probability'] = itm_probability(
+            S = self.close_price,
+            K = self.calls['strike'].to_numpy(),
+            T = T,
+            sigma = self.calls['impliedVolatility'].to_numpy(),
+            option_type = 'call'
+            )
+        if self.compact:
+            self.puts, self.calls = compact_chain(self.puts), compact_chain(self.calls)
+
+    def _recompute_iv(self, puts, calls, T):
+        # Solve puts and calls together so both sides share one fitted smile; Yahoo's value stays where solving fails
+        strike = np.concatenate([puts['strike'].to_numpy(), calls['strike'].to_numpy()])
+        option_type = np.array(['put'] * len(puts) + ['call'] * len(calls))
+        iv, self.vol_surface = recompute_iv(
+            strike, T, option_type,
+            np.concatenate([puts['bid'].to_numpy(), calls['bid'].to_numpy()]),
+            np.concatenate([puts['ask'].to_numpy(), calls['ask'].to_numpy()]),
+            self.close_price, self.iv_source,
+            np.concatenate([puts['impliedVolatility'].to_numpy(), calls['impliedVolatility'].to_numpy()]))
+        return puts.assign(impliedVolatility=iv[:len(puts)]), calls.assign(impliedVolatility=iv[len(puts):])
+
+    def simulate_option_pop(self, n_paths=100_000, seed=0, workers=1):
+        # Monte Carlo POP, expected P&L and P&L percentiles of buying each strike, premium included
+        if self.option_chain is None:
+            raise ValueError("Option data is not downloaded yet. Please call download_option() first.")
+        T = time_to_expiry(self.expiry)
+        frames = []
+        for option_type, chain in (('call', self.calls), ('put', self.puts)):
+            # Strikes nobody is offering have no price to buy them at
+            chain = expand(chain)
+            chain = chain[chain['ask'] > 0]
+            if chain.empty:
+                continue
+            strategies, sigma = single_legs(chain, option_type)
+            result = simulate(self.close_price, T, sigma, strategies, n_paths=n_paths, seed=seed, workers=workers,
+                              index=chain['contractSymbol'].to_numpy())
+            result.insert(0, 'strike', chain['strike'].to_numpy())
+            result.insert(0, 'type', option_type)
+            frames.append(result)
+        return pd.concat(frames) if frames else pd.DataFrame()
+
+    def download_option_surface(self, expiries=None, max_workers=8):
+        # Every listed expiry in one long-format table, instead of the single self.expiry chain
+        self.option_surface = fetch_surface(self.ticker, self.provider, self.close_price, expiries, max_workers)
+        if self.iv_source != 'yahoo':
+            failed = self.option_surface.attrs['failed_expiries']
+            self.option_surface, self.vol_surface = smooth_surface(self.option_surface, self.close_price, self.iv_source)
+            self.option_surface.attrs['failed_expiries'] = failed
+        if self.compact:
+            self.option_surface = downcast(self.option_surface)
+        for expiry, error in self.option_surface.attrs['failed_expiries']:
+            print(f"Error downloading {self.ticker} options for {expiry}: {error}")
+
+    def option_surface_to_file(self, root='data'):
+        if self.option_surface is not None:
+            return save_surface(self.option_surface, root)
+        else:
+            raise ValueError("Option surface is not available. Please call download_option_surface() first.")
 
     def calculate_indicators(self):
         if self.stock_data is not None:
@@ -113,17 +191,23 @@ class StockAnalyzer:
             diff = recent_max - recent_min
             fib_ratios = [1.0, 0.786, 0.618, 0.5, 0.382, 0.236, 0]
             fib_levels = {f'Fib_{ratio}': recent_max - diff * ratio for ratio in fib_ratios}
+            self.fib_levels = fib_levels
 
             # Add Fibonacci levels to the dataframe
             for key, value in fib_levels.items():
                 self.stock_data[key] = value
 
             # Calculate other indicators
-            self.stock_data['EMA24'] = ta.trend.ema_indicator(self.stock_data['Close'], window=24)
-            self.stock_data['SMA50'] = ta.trend.sma_indicator(self.stock_data['Close'], window=50)
-            self.stock_data['SMA200'] = ta.trend.sma_indicator(self.stock_data['Close'], window=200)
-            self.stock_data['RSI'] = ta.momentum.rsi(self.stock_data['Close'], window=14)
-            self.stock_data['MFI'] = ta.volume.money_flow_index(self.stock_data['High'], self.stock_data['Low'], self.stock_data['Close'], self.stock_data['Volume'], window=14)
+            if self.indicator_store is not None:
+                # Reuse the stored values and only stream the bars added since the last run
+                values = self.indicator_store.compute(self.ticker, self.stock_data)
+            else:
+                values = compute_indicators(self.stock_data)
+            for key in values.columns:
+                self.stock_data[key] = values[key]
+            if self.compact:
+                # Only after the indicator store has compared the stored float64 bars
+                self.stock_data = compact_stock_data(self.stock_data, fib_levels)
             
             # Store indicators in self.indicators dictionary
             self.indicators = {
@@ -132,7 +216,8 @@ class StockAnalyzer:
                 'SMA200': self.stock_data['SMA200'],
                 'RSI': self.stock_data['RSI'],
                 'MFI': self.stock_data['MFI'],
-                **{key: self.stock_data[key] for key in fib_levels.keys()},
+                **{key: self.stock_data[key] if key in self.stock_data.columns else value
+                   for key, value in fib_levels.items()},
             }
         else:
             raise ValueError("Stock data is not downloaded yet. Please call download_data() first.")
@@ -144,25 +229,52 @@ class StockAnalyzer:
     
     def get_stock_data(self):
         return self.stock_data
-    
+
+    def summary(self):
+        # Latest bar and indicators as a small slotted object, for holding many tickers at once
+        if self.stock_data is None:
+            raise ValueError("Stock data is not downloaded yet. Please call download_data() first.")
+        if 'RSI' not in self.stock_data.columns:
+            self.calculate_indicators()
+        last = self.stock_data.iloc[-1]
+        return TickerSummary(self.ticker, self.stock_data.index[-1], float(last['Close']), int(last['Volume']),
+                             float(last['EMA24']), float(last['SMA50']), float(last['SMA200']), float(last['RSI']),
+                             float(last['MFI']), tuple(self.fib_levels.values()), self.expiry)
+
     def stock_to_csv(self, filename):
         if self.stock_data is not None:
-            start_date = pd.to_datetime(self.start_date).strftime('%m%d%Y')
-            end_date = pd.to_datetime(self.end_date).strftime('%m%d%Y')
-            self.stock_data.to_csv(f'{self.directory}/{filename}_{start_date}_{end_date}.csv')
+            # One file per ticker, overwritten on every run; the price cache keeps the full history
+            stock_data = expand(self.stock_data)
+            stock_data.to_csv(f'{self.directory}/{filename}.csv')
+            if self.store is not None:
+                self.store.append_prices(self.ticker, stock_data)
         else:
             raise ValueError("Stock data is not available. Please call download_data() first.")
     
     def option_to_csv(self, filename):
         if self.option_chain is not None:
-            self.calls.to_csv(f'{self.directory}/{filename}_calls_{self.expiry}.csv')
-            self.puts.to_csv(f'{self.directory}/{filename}_puts_{self.expiry}.csv')
+            calls, puts = expand(self.calls), expand(self.puts)
+            calls.to_csv(f'{self.directory}/{filename}_calls_{self.expiry}.csv')
+            puts.to_csv(f'{self.directory}/{filename}_puts_{self.expiry}.csv')
+            if self.store is not None:
+                # Dated by download day, so the store keeps every day's chain where the CSVs are overwritten
+                self.store.append_options(self.ticker, calls, puts, expiry=self.expiry)
         else:
             raise ValueError("Option chain data is not available. Please call download_option() first.")
         
     
     def plot_stock_data(self, filename):
-        if self.stock_data is not None:
+        if self.stock_data is not None and self.renderer is not None:
+            # Reuse a pre-built figure template instead of building one per ticker
+            filename_fd = self.stock_data.index[0].strftime('%m%d%Y')
+            filename_ld = self.stock_data.index[-1].strftime('%m%d%Y')
+            self.renderer.render(self.ticker, self.stock_data, f'{self.directory}/{filename}_{filename_fd}_{filename_ld}')
+        elif self.stock_data is not None:
+            # Plotting libraries are only imported by the stage that needs them
+            import matplotlib.pyplot as plt
+            import matplotlib.dates as mdates
+            from mplfinance.original_flavor import candlestick_ohlc
+
             # Create a copy of the stock data
             stock_data_copy = self.stock_data.copy()
 
@@ -193,7 +305,7 @@ class StockAnalyzer:
             fib_colors = ['red', 'orange', 'olivedrab', 'green', 'blue', 'purple', 'brown']
             fib_ratios = [1.0, 0.786, 0.618, 0.5, 0.382, 0.236, 0]
             for i, ratio in enumerate(fib_ratios):
-                fib_level = self.stock_data[f'Fib_{ratio}'].iloc[-1]
+                fib_level = self.fib_levels[f'Fib_{ratio}']
                 ax1.axhline(y=fib_level, label=f'Fibonacci Retracement {ratio*100:.1f}%', color=fib_colors[i], linestyle=':')
 
                 # Add price labels to Fibonacci levels on the first subplot
@@ -278,10 +390,21 @@ class StockAnalyzer:
             raise ValueError("Stock data is not available. Please call download_data() first.")
 
     @classmethod
-    def stockBatch(cls, tickers, start_date, end_date=None, expiry=None):
+    def stockBatch(cls, tickers, start_date, end_date=None, expiry=None, provider=None, bulk=True, cache=None,
+                   renderer=None, iv_source='yahoo', compact=False, rate_limit=None, retries=3, store=None):
+        provider = resilient(provider if provider else YahooProvider(), rate_limit, retries)
+        indicator_store = None
+        if cache is not None:
+            # Only fetch the bars newer than what is already stored on disk
+            provider = CachedProvider(provider, cache)
+            indicator_store = IndicatorStore(cache)
+        if bulk:
+            # Fetch every ticker's prices in one grouped request up front
+            provider = prefetch(provider, tickers, start_date, end_date)
         for ticker in tickers:
             try:
-                analyzer = cls(ticker, start_date, end_date, expiry)
+                analyzer = cls(ticker, start_date, end_date, expiry, provider, indicator_store, renderer, iv_source,
+                               compact, store)
                 analyzer.download_data()
                 analyzer.calculate_indicators()
                 analyzer.stock_to_csv(f"{ticker}_stock_data")
@@ -290,4 +413,10 @@ class StockAnalyzer:
                 analyzer.option_to_csv(ticker)
                 print(f"Analysis completed for {ticker}")
             except Exception as e:
-                print(f"Error processing {ticker}: {str(e)}")
\ No newline at end of file
+                print(f"Error processing {ticker}: {str(e)}")
+        if renderer is not None:
+            # Charts may still be rendering in the background
+            try:
+                renderer.wait()
+            except Exception as e:
+                print(f"Error rendering charts: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,272 @@
+import os
+import sqlite3
+import threading
+from datetime import date
+
+import pandas as pd
+
+# Dates are stored as ISO-8601 text ('YYYY-MM-DD', event times 'YYYY-MM-DD HH:MM:SS'), which
+# SQLite's date functions understand and which sorts and compares like the dates themselves
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    ticker TEXT NOT NULL,
+    date DATE NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, adj_close REAL, volume INTEGER,
+    ema24 REAL, sma50 REAL, sma200 REAL, rsi REAL, mfi REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS options (
+    ticker TEXT NOT NULL,
+    date DATE NOT NULL,
+    expiry DATE NOT NULL,
+    type TEXT NOT NULL,
+    contract_symbol TEXT NOT NULL,
+    strike REAL, spot REAL, bid REAL, ask REAL, volume REAL, open_interest REAL,
+    implied_volatility REAL, itm_probability REAL,
+    PRIMARY KEY (ticker, date, contract_symbol)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS events (
+    time TIMESTAMP NOT NULL,
+    currency TEXT NOT NULL,
+    importance INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    actual TEXT, forecast TEXT, previous TEXT,
+    PRIMARY KEY (time, currency, event)
+);
+CREATE INDEX IF NOT EXISTS events_currency_importance_time ON events (currency, importance, time);
+"""
+
+# Table column -> column of the frame the producer writes (stock_to_csv, option_to_csv, parse_events)
+PRICE_FIELDS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'adj_close': 'Adj Close',
+                 'volume': 'Volume', 'ema24': 'EMA24', 'sma50': 'SMA50', 'sma200': 'SMA200', 'rsi': 'RSI',
+                 'mfi': 'MFI'}
+OPTION_FIELDS = {'contract_symbol': 'contractSymbol', 'strike': 'strike', 'spot': 'last_price', 'bid': 'bid',
+                  'ask': 'ask', 'volume': 'volume', 'open_interest': 'openInterest',
+                  'implied_volatility': 'impliedVolatility', 'itm_probability': 'InTheMoney_probability'}
+EVENT_FIELDS = {'currency': 'Currency', 'importance': 'Importance', 'event': 'Event', 'actual': 'Actual',
+                 'forecast': 'Forecast', 'previous': 'Previous'}
+
+
+def _values(frame, column):
+    # Plain Python values (sqlite3 rejects NumPy integers); a column the frame lacks is stored as NULL
+    if column not in frame.columns:
+        return [None] * len(frame)
+    values = frame[column]
+    if values.dtype == object:
+        return values.where(values.notna(), None).tolist()
+    # SQLite stores NaN as NULL
+    return values.tolist()
+
+
+def _days(index):
+    return pd.DatetimeIndex(index).strftime('%Y-%m-%d').tolist()
+
+
+class AnalyticsStore:
+    """
+    One SQLite file holding every ticker's prices and indicators, the option
+    chains as downloaded each day and the economic calendar, so questions
+    across tickers, expiries and events are SQL queries instead of passes
+    over per-ticker CSVs.
+
+        prices   (ticker, date)                  OHLCV and indicators, one row per bar
+        options  (ticker, date, contract_symbol) chain rows with spot, IV and ITM probability;
+                                                 date is the day the chain was downloaded
+        events   (time, currency, event)         calendar rows, time in GMT; indexed on
+                                                 (currency, importance, time)
+
+    Appends replace rows with the same key, so rerunning a day overwrites
+    it. The database runs in WAL mode: readers never block the writer, and
+    concurrent writers (the CPU worker processes of run_batch) wait for
+    each other. Each thread opens its own connection, and only the path is
+    pickled, so one store can be handed to worker processes.
+    """
+
+    def __init__(self, path='data/analytics.db', timeout=60.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def __getstate__(self):
+        return {'path': self.path, 'timeout': self.timeout}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _insert(self, table, columns, rows):
+        placeholders = ', '.join('?' * len(columns))
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+    def append_prices(self, ticker, stock_data):
+        """Store stock_data's bars (OHLCV and whichever indicator columns it has); returns the rows written."""
+        if stock_data is None or stock_data.empty:
+            return 0
+        columns = list(PRICE_FIELDS)
+        values = [_values(stock_data, PRICE_FIELDS[column]) for column in columns]
+        rows = list(zip([ticker] * len(stock_data), _days(stock_data.index), *values))
+        self._insert('prices', ['ticker', 'date'] + columns, rows)
+        return len(rows)
+
+    def append_options(self, ticker, calls, puts, as_of=None, expiry=None):
+        """
+        Store the chain as download_option leaves it (expanded if compact),
+        dated as_of (default: today). The expiry comes from the expiry_date
+        column, or from expiry when the frames have none.
+        """
+        as_of = pd.Timestamp(as_of if as_of is not None else date.today()).strftime('%Y-%m-%d')
+        written = 0
+        for frame, option_type in ((calls, 'call'), (puts, 'put')):
+            if frame is None or frame.empty:
+                continue
+            if 'expiry_date' in frame.columns:
+                expiries = _days(frame['expiry_date'])
+            else:
+                expiries = [pd.Timestamp(expiry).strftime('%Y-%m-%d')] * len(frame)
+            columns = list(OPTION_FIELDS)
+            values = [_values(frame, OPTION_FIELDS[column]) for column in columns]
+            n = len(frame)
+            rows = list(zip([ticker] * n, [as_of] * n, expiries, [option_type] * n, *values))
+            self._insert('options', ['ticker', 'date', 'expiry', 'type'] + columns, rows)
+            written += n
+        return written
+
+    def append_events(self, events):
+        """
+        Store parse_events rows. Dates may be timestamps (parse_events with
+        date_format=None) or the '%d/%b/%Y' strings of the calendar CSV;
+        'NULL' values become NULL.
+        """
+        from .calendar_parser import DATE_FORMAT
+
+        if events is None or events.empty:
+            return 0
+        times = events['Date']
+        if not pd.api.types.is_datetime64_any_dtype(times):
+            try:
+                times = pd.to_datetime(times, format=DATE_FORMAT)
+            except ValueError:
+                times = pd.to_datetime(times)
+        columns = list(EVENT_FIELDS)
+        values = [_values(events, EVENT_FIELDS[column]) for column in columns]
+        for i, column in enumerate(columns):
+            if column in ('actual', 'forecast', 'previous'):
+                values[i] = [None if value in ('NULL', '') else value for value in values[i]]
+        rows = list(zip(pd.DatetimeIndex(times).strftime('%Y-%m-%d %H:%M:%S').tolist(), *values))
+        self._insert('events', ['time'] + columns, rows)
+        return len(rows)
+
+    def query(self, sql, params=(), parse_dates=None):
+        """Run a SELECT and return a DataFrame, with the parse_dates columns as datetime64."""
+        return pd.read_sql_query(sql, self.connection, params=list(params), parse_dates=parse_dates)
+
+    @staticmethod
+    def _where(conditions):
+        clauses = [clause for clause, _ in conditions]
+        params = [param for _, values in conditions for param in values]
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    @staticmethod
+    def _between(column, start, end):
+        conditions = []
+        if start is not None:
+            conditions.append((f'{column} >= ?', [str(pd.Timestamp(start).date())]))
+        if end is not None:
+            # end is exclusive, like download() and the CLI's --end
+            conditions.append((f'{column} < ?', [str(pd.Timestamp(end).date())]))
+        return conditions
+
+    @staticmethod
+    def _one_of(column, values):
+        if values is None:
+            return []
+        values = [values] if isinstance(values, str) else list(values)
+        return [(f"{column} IN ({', '.join('?' * len(values))})", values)]
+
+    def prices(self, tickers=None, start=None, end=None):
+        where, params = self._where(self._one_of('ticker', tickers) + self._between('date', start, end))
+        return self.query(f'SELECT * FROM prices{where} ORDER BY ticker, date', params, parse_dates=['date'])
+
+    def options(self, tickers=None, start=None, end=None, expiry=None):
+        conditions = self._one_of('ticker', tickers) + self._between('date', start, end)
+        if expiry is not None:
+            conditions.append(('expiry = ?', [str(pd.Timestamp(expiry).date())]))
+        where, params = self._where(conditions)
+        return self.query(f'SELECT * FROM options{where} ORDER BY ticker, date, expiry, type, strike', params,
+                          parse_dates=['date', 'expiry'])
+
+    def events(self, currencies=None, min_importance=None, start=None, end=None):
+        conditions = self._one_of('currency', currencies) + self._between('time', start, end)
+        if min_importance is not None:
+            conditions.append(('importance >= ?', [int(min_importance)]))
+        where, params = self._where(conditions)
+        return self.query(f'SELECT * FROM events{where} ORDER BY time', params, parse_dates=['time'])
+
+    def iv_around_events(self, tickers=None, currency='USD', min_importance=3, days=3, moneyness=0.05,
+                         start=None, end=None):
+        """
+        How implied volatility moved around economic events: for every
+        event of currency with at least min_importance (between start and
+        end), every ticker's mean IV over strikes within moneyness of the
+        spot on each chain date from days before to days after the event.
+        One row per event, ticker and chain date, with days_from_event.
+        """
+        event_where, params = self._where([('currency = ?', [currency]), ('importance >= ?', [int(min_importance)])] +
+                                          self._between('time', start, end))
+        option_conditions = [('spot > 0', []), ('ABS(strike / spot - 1) <= ?', [moneyness])]
+        option_where, option_params = self._where(option_conditions + self._one_of('ticker', tickers))
+        # The near-the-money IV is averaged once per ticker and chain date, then joined to the events
+        sql = f"""
+            WITH picked AS (
+                SELECT time, date(time) AS day, importance, event FROM events{event_where}
+            ), iv AS (
+                SELECT ticker, date, AVG(implied_volatility) AS implied_volatility, COUNT(*) AS strikes
+                FROM options{option_where}
+                GROUP BY ticker, date
+            )
+            SELECT e.time AS event_time, e.event, e.importance, o.ticker, o.date,
+                   CAST(julianday(o.date) - julianday(e.day) AS INTEGER) AS days_from_event,
+                   o.implied_volatility, o.strikes
+            FROM picked e
+            JOIN iv o ON o.date BETWEEN date(e.day, ?) AND date(e.day, ?)
+            ORDER BY e.time, e.event, o.ticker, o.date
+        """
+        params += option_params + [f'-{int(days)} days', f'+{int(days)} days']
+        return self.query(sql, params, parse_dates=['event_time', 'date'])
+
+    def counts(self):
+        return {table: self.connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                for table in ('prices', 'options', 'events')}
+
+    def report(self):
+        counts = self.counts()
+        return (f"Analytics store {self.path}: {counts['prices']} price rows, {counts['options']} option rows, "
+                f"{counts['events']} events")
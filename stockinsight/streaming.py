@@ -0,0 +1,410 @@
+import asyncio
+import json
+import math
+import time
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from http import HTTPStatus
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+from .data_providers import prefetch
+from .indicator_engine import IndicatorState
+from .monte_carlo import time_to_expiry
+from .option_pricing import ItmPricer
+
+# One trade or quote; volume is what traded with it (0 for a quote)
+Tick = namedtuple('Tick', ['time', 'ticker', 'price', 'volume'])
+
+# The current session's bar so far, as a polled provider reports it
+Bar = namedtuple('Bar', ['time', 'ticker', 'open', 'high', 'low', 'close', 'volume'])
+
+
+class TickSource:
+    """
+    Where StreamService gets its prices from. ticks() is an async iterator
+    of Tick (or, from sources that see whole session bars, Bar) in arrival
+    order. Sources that block (HTTP polling, a socket
+    client) do their waiting in a thread with asyncio.to_thread, so the
+    event loop keeps applying ticks and answering the API meanwhile.
+    """
+
+    def ticks(self):
+        raise NotImplementedError
+
+
+class ReplaySource(TickSource):
+    """
+    Replays ticks recorded in a CSV file with time, ticker, price and volume
+    columns (see write_ticks). With speed=None ticks are handed over as
+    fast as the service applies them; speed=1.0 keeps the recorded spacing
+    and 10.0 replays ten times faster.
+    """
+
+    # Without pacing, hand control back to the event loop every this many ticks
+    yield_every = 16
+
+    def __init__(self, path, speed=None):
+        self.path = path
+        self.speed = speed
+
+    async def ticks(self):
+        frame = pd.read_csv(self.path)
+        times = pd.DatetimeIndex(pd.to_datetime(frame['time'])).to_pydatetime()
+        rows = zip(times, frame['ticker'].astype(str), frame['price'].to_numpy(dtype=float).tolist(),
+                   frame['volume'].to_numpy(dtype=float).tolist())
+        loop = asyncio.get_running_loop()
+        origin = None
+        for i, row in enumerate(rows):
+            tick = Tick(*row)
+            if self.speed:
+                if origin is None:
+                    origin = (tick.time, loop.time())
+                due = origin[1] + (tick.time - origin[0]).total_seconds() / self.speed
+                await asyncio.sleep(max(due - loop.time(), 0))
+            elif i % self.yield_every == 0:
+                await asyncio.sleep(0)
+            yield tick
+
+
+class PollingSource(TickSource):
+    """
+    Turns a DataProvider into a feed by downloading the current session's
+    bar for every ticker each interval seconds. A ticker yields its Bar
+    (open, high, low, close and volume of the session so far) on the first
+    poll and whenever it changed since the previous one. Failed polls are
+    reported and retried on the next interval.
+    """
+
+    def __init__(self, provider, tickers, interval=15.0):
+        self.provider = provider
+        self.tickers = list(tickers)
+        self.interval = interval
+
+    async def ticks(self):
+        last = {}
+        while True:
+            today = date.today()
+            try:
+                frames = await asyncio.to_thread(self.provider.download_many, self.tickers, today.isoformat(),
+                                                 (today + timedelta(days=1)).isoformat())
+            except Exception as e:
+                print(f"Price poll failed: {e}")
+                frames = {}
+            now = datetime.now()
+            for ticker, frame in frames.items():
+                frame = frame.dropna(subset=['Close'])
+                if frame.empty or frame.index[-1].date() != today:
+                    continue
+                row = frame.iloc[-1]
+                bar = tuple(float(row[field]) for field in ('Open', 'High', 'Low', 'Close', 'Volume'))
+                if last.get(ticker) != bar:
+                    last[ticker] = bar
+                    yield Bar(now, ticker, *bar)
+            await asyncio.sleep(self.interval)
+
+
+def write_ticks(ticks, path):
+    """Record ticks as the CSV ReplaySource reads."""
+    pd.DataFrame(list(ticks), columns=Tick._fields).to_csv(path, index=False)
+    return path
+
+
+def _finite(value):
+    # JSON has no NaN; indicators still in their warm-up window come out as null
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+class LiveTicker:
+    """
+    One ticker's live state: the IndicatorState after its last completed
+    bar, the session bar being built from ticks, and the option chain's
+    strikes and IVs priced by an ItmPricer for the current time to expiry.
+
+    A tick extends the session bar and re-applies it to a copy of the
+    state, so the indicators cost O(window) per tick instead of a pass over
+    the history; a polled Bar replaces the session bar the same way (see
+    set_bar). The first update of a later session commits the previous
+    session's bar. ITM probabilities use T = monte_carlo.time_to_expiry like
+    StockAnalyzer.download_option, taken at the minute, so the pricer is
+    rebuilt once a minute rather than on every tick.
+    """
+
+    def __init__(self, ticker, history, calls=None, puts=None, expiry=None):
+        self.ticker = ticker
+        self.state = IndicatorState.from_history(history)
+        self.last_date = history.index[-1].date() if not history.empty else None
+        self.live_state = self.state
+        self.values = self.state.values()
+        self.price = float(history['Close'].iloc[-1]) if not history.empty else float('nan')
+        self.time = None
+        self.bar_date = None
+        self.bar_timestamp = None
+        self.bar = None
+        self.ticks = 0
+
+        # Calls and puts are priced together as one array of strikes
+        sides = [(frame, side) for frame, side in ((calls, 'call'), (puts, 'put')) if frame is not None]
+        self.expiry = datetime.combine(pd.to_datetime(expiry).date(), datetime.min.time()) if expiry else None
+        self.symbols = [symbol for frame, _ in sides for symbol in frame['contractSymbol']]
+        self.option_type = np.array([side for frame, side in sides for _ in range(len(frame))], dtype='<U4')
+        self.strikes = np.array([strike for frame, _ in sides for strike in frame['strike']], dtype=float)
+        self.sigma = np.array([sigma for frame, _ in sides for sigma in frame['impliedVolatility']], dtype=float)
+        self.T = None
+        self.pricer = None
+        self.itm_probability = np.empty(0)
+        if self.expiry is not None and len(self.strikes) and not history.empty:
+            self._reprice(datetime.now())
+
+    def _reprice(self, when):
+        T = time_to_expiry(self.expiry, when.replace(second=0, microsecond=0))
+        if T != self.T:
+            self.T = T
+            self.pricer = ItmPricer(self.strikes, T, self.sigma, self.option_type)
+        self.itm_probability = self.pricer(self.price)
+
+    def _session(self, day):
+        # False for a day older than the current session; a later day commits the finished session's bar
+        if self.bar is not None and day != self.bar_date:
+            if day < self.bar_date:
+                return False
+            self.state = self.live_state
+            self.last_date = self.bar_date
+            self.bar = None
+        if self.bar is None and self.last_date is not None and day <= self.last_date:
+            return False
+        return True
+
+    def _apply(self, when):
+        self.live_state = self.state.copy()
+        self.values = self.live_state.update(self.bar[1], self.bar[2], self.bar[3], self.bar[4], self.bar_timestamp)
+        self.price = self.bar[3]
+        self.time = when
+        self.ticks += 1
+        if self.expiry is not None and len(self.strikes):
+            self._reprice(when)
+
+    def update(self, tick):
+        """Apply one tick; returns False (and changes nothing) for a tick older than the current session."""
+        day = tick.time.date()
+        if not self._session(day):
+            return False
+        if self.bar is None:
+            self.bar_date = day
+            self.bar_timestamp = pd.Timestamp(day)
+            self.bar = [tick.price, tick.price, tick.price, tick.price, tick.volume]
+        else:
+            bar = self.bar
+            bar[1] = max(bar[1], tick.price)
+            bar[2] = min(bar[2], tick.price)
+            bar[3] = tick.price
+            bar[4] += tick.volume
+        self._apply(tick.time)
+        return True
+
+    def set_bar(self, bar):
+        """
+        Make a polled Bar the session bar, as it holds the session's real open,
+        high, low and volume; returns False for a bar older than the current session.
+        """
+        day = bar.time.date()
+        if not self._session(day):
+            return False
+        self.bar_date = day
+        self.bar_timestamp = pd.Timestamp(day)
+        self.bar = [bar.open, bar.high, bar.low, bar.close, bar.volume]
+        self._apply(bar.time)
+        return True
+
+    def snapshot(self, options=True):
+        """JSON-ready view of the latest price, session bar, indicators and (with options) per-strike probabilities."""
+        snapshot = {
+            'ticker': self.ticker,
+            'time': self.time.isoformat() if self.time is not None else None,
+            'price': _finite(self.price),
+            'ticks': self.ticks,
+            'session': self.bar_date.isoformat() if self.bar_date is not None else None,
+            'bar': dict(zip(('Open', 'High', 'Low', 'Close', 'Volume'), self.bar)) if self.bar is not None else None,
+            'indicators': {name: _finite(value) for name, value in self.values.items()},
+            'fib_levels': ({name: _finite(value) for name, value in self.live_state.fib_levels().items()}
+                           if self.live_state.closes else {}),
+            'expiry': self.expiry.date().isoformat() if self.expiry is not None else None,
+        }
+        if options:
+            snapshot['options'] = [
+                {'contractSymbol': symbol, 'type': option_type, 'strike': strike,
+                 'impliedVolatility': _finite(sigma), 'InTheMoney_probability': _finite(probability)}
+                for symbol, option_type, strike, sigma, probability in zip(
+                    self.symbols, self.option_type.tolist(), self.strikes.tolist(), self.sigma.tolist(),
+                    self.itm_probability.tolist())]
+        return snapshot
+
+
+def load(tickers, provider, start, expiry=None, iv_source='yahoo', io_workers=8):
+    """
+    LiveTicker per ticker from its completed price bars (one batched
+    download) and, with an expiry, its option chain as download_option
+    filters and prices it, fetched concurrently. Returns (live tickers,
+    {ticker: error} for those that failed to load).
+    """
+    from .stock_analyzer import StockAnalyzer
+
+    prefetched = prefetch(provider, tickers, start)
+
+    def build(ticker):
+        analyzer = StockAnalyzer(ticker, start, expiry=expiry, provider=prefetched, iv_source=iv_source)
+        analyzer.download_data()
+        if expiry:
+            analyzer.download_option()
+            return LiveTicker(ticker, analyzer.stock_data, analyzer.calls, analyzer.puts, expiry)
+        return LiveTicker(ticker, analyzer.stock_data)
+
+    live, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=io_workers) as pool:
+        futures = {pool.submit(build, ticker): ticker for ticker in tickers}
+        for future in as_completed(futures):
+            try:
+                live[futures[future]] = future.result()
+            except Exception as e:
+                errors[futures[future]] = f"{type(e).__name__}: {e}"
+    return {ticker: live[ticker] for ticker in tickers if ticker in live}, errors
+
+
+class StreamService:
+    """
+    Long-running asyncio service: applies every tick from source to its
+    ticker's LiveTicker inline (a tick costs tens of microseconds, so there
+    is nothing to hand off to a worker), and serves the snapshots over a
+    small local HTTP API on the same event loop:
+
+        GET /snapshot            price, session bar and indicators of every ticker
+        GET /snapshot/<ticker>   the same for one ticker, with per-strike IV and ITM probability
+        GET /stats               ticks applied or dropped, and tick-to-update latency
+
+    Latency runs from the moment the source hands a tick over until the
+    ticker's snapshot reflects it; the last latency_window ticks are kept
+    for the percentiles. port=0 picks a free port (see .port once started).
+    """
+
+    def __init__(self, tickers, source, host='127.0.0.1', port=8765, latency_window=100_000):
+        self.tickers = tickers
+        self.source = source
+        self.host = host
+        self.port = port
+        self.stats = Counter()
+        self.latencies = deque(maxlen=latency_window)
+        self._server = None
+        self._connections = {}
+
+    def apply(self, tick):
+        start = time.perf_counter()
+        live = self.tickers.get(tick.ticker)
+        if live is None:
+            self.stats['unknown'] += 1
+            return False
+        if not (live.set_bar(tick) if isinstance(tick, Bar) else live.update(tick)):
+            self.stats['stale'] += 1
+            return False
+        self.stats['ticks'] += 1
+        self.latencies.append(time.perf_counter() - start)
+        return True
+
+    def latency_ms(self):
+        """p50, p99 and max tick-to-update latency in milliseconds over the latency window."""
+        if not self.latencies:
+            return {'p50': None, 'p99': None, 'max': None}
+        latencies = np.fromiter(self.latencies, dtype=float, count=len(self.latencies)) * 1000
+        p50, p99 = np.percentile(latencies, [50, 99])
+        return {'p50': float(p50), 'p99': float(p99), 'max': float(latencies.max())}
+
+    def report(self):
+        latency = self.latency_ms()
+        text = (f"Stream: {self.stats['ticks']} ticks applied across {len(self.tickers)} tickers "
+                f"({self.stats['stale']} stale, {self.stats['unknown']} for unknown tickers)")
+        if latency['p50'] is not None:
+            text += f", latency p50 {latency['p50']:.3f} ms, p99 {latency['p99']:.3f} ms, max {latency['max']:.3f} ms"
+        return text
+
+    def route(self, method, path):
+        """(status, JSON-ready body) for an API request."""
+        if method != 'GET':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f'{method} not supported'}
+        parts = [part for part in urlparse(path).path.split('/') if part]
+        if parts == ['snapshot']:
+            return HTTPStatus.OK, {ticker: live.snapshot(options=False) for ticker, live in self.tickers.items()}
+        if len(parts) == 2 and parts[0] == 'snapshot':
+            live = self.tickers.get(parts[1]) or self.tickers.get(parts[1].upper())
+            if live is None:
+                return HTTPStatus.NOT_FOUND, {'error': f'{parts[1]} is not streamed'}
+            return HTTPStatus.OK, live.snapshot()
+        if parts == ['stats']:
+            return HTTPStatus.OK, {**{key: self.stats[key] for key in ('ticks', 'stale', 'unknown')},
+                                   'tickers': len(self.tickers), 'latency_ms': self.latency_ms()}
+        return HTTPStatus.NOT_FOUND, {'error': f'no route for {path}'}
+
+    async def _handle(self, reader, writer):
+        # Minimal HTTP/1.1: GET requests, keep-alive unless the client asks to close
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                request = await reader.readline()
+                if not request:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip().lower()
+                try:
+                    method, path, version = request.decode('latin-1').split()
+                    status, payload = self.route(method, path)
+                except ValueError:
+                    version, status, payload = 'HTTP/1.0', HTTPStatus.BAD_REQUEST, {'error': 'malformed request'}
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection') != 'close'
+                body = json.dumps(payload).encode()
+                head = (f'HTTP/1.1 {status.value} {status.phrase}\r\nContent-Type: application/json\r\n'
+                        f'Content-Length: {len(body)}\r\n' + ('' if keep_alive else 'Connection: close\r\n') + '\r\n')
+                writer.write(head.encode() + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise keep their handlers waiting until the loop is torn down
+            for writer in self._connections.values():
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def consume(self):
+        async for tick in self.source.ticks():
+            self.apply(tick)
+
+    async def run(self, keep_serving=False):
+        """Serve the API while the source lasts; with keep_serving, also after a finite source (e.g. a replay) ends."""
+        await self.start()
+        try:
+            await self.consume()
+            if keep_serving:
+                await asyncio.Event().wait()
+        finally:
+            await self.stop()
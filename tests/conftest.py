@@ -0,0 +1,29 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# benchmarks/fixtures.py holds the offline providers and servers the tests share with the benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+
+@pytest.fixture
+def make_ohlcv():
+    """Factory for a seeded random-walk OHLCV frame of n business days ending before today."""
+    def make(n, seed=0, end=None):
+        rng = np.random.default_rng(seed)
+        index = pd.bdate_range(end=end or date.today() - timedelta(days=1), periods=n, name='Date')
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+        open_ = close * np.exp(rng.normal(0, 0.005, n))
+        return pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, n)),
+            'Low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, n)),
+            'Close': close,
+            'Adj Close': close,
+            'Volume': rng.integers(1_000_000, 50_000_000, n).astype(float),
+        }, index=index)
+    return make
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stockinsight.backtest import backtest, performance, positions, sweep
+from stockinsight.screener import panel_from_frames
+
+
+def frame(close):
+    index = pd.bdate_range('2020-01-01', periods=len(close), name='Date')
+    close = np.asarray(close, dtype=float)
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1e6}, index=index)
+
+
+def test_always_long_on_steady_growth():
+    # Every bar after the first earns 1%
+    growth = panel_from_frames({'UP': frame(100 * 1.01 ** np.arange(50))})
+    result = backtest(growth, ('Close > 0', None)).iloc[0]
+    assert np.isclose(result['total_return'], 1.01 ** 49 - 1)
+    assert result['max_drawdown'] == 0 and result['trades'] == 1 and result['hit_rate'] == 1
+
+
+def test_positions_carry_forward_and_entry_wins_a_tie():
+    values = {'Close': np.array([[1.0], [5.0], [3.0], [9.0], [4.0], [1.0], [2.0]])}
+    assert positions(values, 'Close < 2', 'Close > 8')[:, 0].tolist() == [1, 1, 1, 0, 0, 1, 1]
+    assert positions(values, 'Close < 4', 'Close < 2')[:, 0].tolist() == [1, 1, 1, 1, 1, 1, 1]
+
+
+def test_performance_counts_trades_and_charges_costs():
+    # +10% then -10%: one hit out of two trades
+    close = np.array([[100.0], [110.0], [110.0], [99.0]])
+    position = np.array([[1], [0], [1], [0]], dtype=np.int8)
+    metrics = performance(close, position)
+    assert metrics['trades'][0] == 2 and metrics['hit_rate'][0] == 0.5
+    assert np.isclose(metrics['total_return'][0], 1.1 * 0.9 - 1)
+    assert np.isclose(metrics['max_drawdown'][0], 0.1)
+
+    # The three position changes inside the series are each charged on their bar
+    metrics = performance(close, position, cost=0.1)
+    assert np.isclose(metrics['total_return'][0], (1 + 0.1 - 0.1) * (1 - 0.1) * (1 - 0.1 - 0.1) - 1)
+
+
+def test_flat_strategy_earns_nothing():
+    panel = panel_from_frames({'UP': frame(100 * 1.01 ** np.arange(50))})
+    result = backtest(panel, ('Close < 0', None)).iloc[0]
+    assert result['total_return'] == 0 and result['trades'] == 0 and np.isnan(result['hit_rate'])
+
+
+def test_sweep_matches_single_backtests(make_ohlcv):
+    panel = panel_from_frames({f'T{i}': make_ohlcv(300, seed=i) for i in range(5)})
+    grid = {'rsi_window': [7, 14], 'rsi_lower': [25, 30]}
+    results = sweep(panel, 'rsi_bands', grid, chunk_size=2, use_processes=False)
+    assert len(results) == 4 * 5
+    for (rsi_window, rsi_lower), group in results.groupby(['rsi_window', 'rsi_lower']):
+        expected = backtest(panel, 'rsi_bands', rsi_window=rsi_window, rsi_lower=rsi_lower)
+        pd.testing.assert_frame_equal(group, expected)
+
+
+def test_unknown_parameter_is_rejected(make_ohlcv):
+    panel = panel_from_frames({'T': make_ohlcv(60)})
+    with pytest.raises(ValueError, match='rsi_windw'):
+        backtest(panel, rsi_windw=7)
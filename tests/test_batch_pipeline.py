@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+from fixtures import FakeProvider
+from stockinsight.batch_pipeline import run_batch
+
+EXPIRY = '2030-01-18'
+STAGES = ('download_data', 'calculate_indicators', 'stock_to_csv', 'download_option', 'option_to_csv')
+
+
+class BatchProvider(FakeProvider):
+    """
+    FakeProvider whose earlier tickers take longer, so fetches finish out of
+    input order, and whose option chains fail for the tickers in no_chain.
+    Records how many downloads run at once.
+    """
+
+    def __init__(self, delays, fail=(), no_chain=()):
+        super().__init__(fail=fail)
+        self.delays = delays
+        self.no_chain = set(no_chain)
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+
+    def download(self, ticker, start, end):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delays.get(ticker, 0.0))
+            return super().download(ticker, start, end)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def option_chain(self, ticker, expiry):
+        if ticker in self.no_chain:
+            raise ValueError(f"No options listed for {ticker}")
+        return super().option_chain(ticker, expiry)
+
+
+@pytest.mark.parametrize('use_processes', [False, True], ids=['threads', 'processes'])
+def test_run_batch(tmp_path, monkeypatch, use_processes):
+    monkeypatch.chdir(tmp_path)
+    tickers = ['AAA', 'BAD', 'BBB', 'NOPT', 'CCC', 'DDD']
+    provider = BatchProvider({'AAA': 0.3, 'BAD': 0.2, 'BBB': 0.1}, fail=['BAD'], no_chain=['NOPT'])
+    results = run_batch(tickers, '2024-01-01', '2024-06-01', EXPIRY, provider, stages=STAGES, io_workers=2,
+                        cpu_workers=2, max_in_flight=3, use_processes=use_processes, bulk=False, retries=0)
+
+    # Input order, whatever order they finished in
+    assert [result.ticker for result in results] == tickers
+    status = {result.ticker: (result.status, result.failed_stage) for result in results}
+    assert status == {'AAA': ('ok', None), 'BAD': ('error', 'download_data'), 'BBB': ('ok', None),
+                      'NOPT': ('error', 'download_option'), 'CCC': ('ok', None), 'DDD': ('ok', None)}
+    errors = {result.ticker: result.error for result in results if result.error}
+    assert errors == {'BAD': 'ConnectionError: Simulated download failure for BAD',
+                      'NOPT': 'ValueError: No options listed for NOPT'}
+    assert provider.peak <= 2
+
+    for result in results:
+        folder = tmp_path / 'data' / result.ticker
+        # A ticker without prices stops there; one without options still gets its prices written
+        assert (folder / f'{result.ticker}_stock_data.csv').exists() == (result.ticker != 'BAD')
+        assert (folder / f'{result.ticker}_calls_{EXPIRY}.csv').exists() == (result.status == 'ok')
+        assert set(result.timings) >= ({'download_data'} if result.ticker == 'BAD' else set(STAGES) - {'option_to_csv'})
+
+
+def test_run_batch_holds_at_most_max_in_flight(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tickers = [f'T{i:02d}' for i in range(8)]
+    provider = BatchProvider({ticker: 0.05 for ticker in tickers})
+    results = run_batch(tickers, '2024-01-01', '2024-03-01', provider=provider, stages=('download_data',),
+                        io_workers=4, max_in_flight=2, use_processes=False, bulk=False, retries=0)
+    assert [result.ticker for result in results] == tickers
+    assert all(result.status == 'ok' for result in results)
+    # Four download threads, but no more than two tickers fetched at once
+    assert provider.peak <= 2
+
+
+def test_run_batch_bulk_prefetch(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    provider = BatchProvider({}, fail=['BAD'])
+    results = run_batch(['AAA', 'BAD', 'BBB'], '2024-01-01', '2024-03-01', provider=provider,
+                        stages=('download_data', 'calculate_indicators'), use_processes=False, retries=0)
+    # The grouped download leaves BAD out; its own fallback download fails
+    assert [(result.ticker, result.status) for result in results] == [('AAA', 'ok'), ('BAD', 'error'), ('BBB', 'ok')]
+    assert results[1].failed_stage == 'download_data'
@@ -0,0 +1,63 @@
+import os
+
+import pandas as pd
+import pytest
+
+from fixtures import parse_events_bs4, synthetic_page
+from stockinsight.calendar_parser import EVENT_COLUMNS, parse_events
+
+# A calendar page saved from investing.com: day separator rows, a revised previous value, an actual not
+# yet released and a speech without any values
+PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'economic_calendar.html')
+
+
+@pytest.fixture(scope='module')
+def page():
+    with open(PAGE, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_parses_saved_page(page):
+    expected = pd.DataFrame({
+        'Date': ['11/Jan/2024', '11/Jan/2024', '11/Jan/2024', '12/Jan/2024', '12/Jan/2024'],
+        'Currency': ['AUD', 'USD', 'USD', 'GBP', 'EUR'],
+        'Importance': [2, 3, 1, 3, 2],
+        'Event': ['Retail Sales (MoM)  (Nov)', 'Core CPI (MoM)  (Dec)', 'Initial Jobless Claims', 'GDP (MoM)  (Nov)',
+                  'ECB President Lagarde Speaks'],
+        'Actual': ['2.0%', '0.3%', '202K', '', ''],
+        'Forecast': ['1.2%', '0.3%', '210K', '0.2%', ''],
+        'Previous': ['-0.1%', '0.3%', '203K', '-0.3%', ''],
+    })
+    pd.testing.assert_frame_equal(parse_events(page), expected)
+
+
+@pytest.mark.parametrize('source', ['saved', 'synthetic'])
+def test_matches_the_beautifulsoup_loop(page, source):
+    pytest.importorskip('bs4')
+    page = page if source == 'saved' else synthetic_page(500, seed=3)
+    pd.testing.assert_frame_equal(parse_events(page), parse_events_bs4(page), check_dtype=False)
+
+
+def test_row_fragment_and_timestamps(page):
+    # The calendar service answers with the bare rows, without the table around them
+    rows = page[page.index('<tbody>') + len('<tbody>'):page.index('</tbody>')]
+    pd.testing.assert_frame_equal(parse_events(rows), parse_events(page))
+
+    events = parse_events(page, date_format=None)
+    assert events['Date'].dtype == 'datetime64[ns]'
+    assert events['Date'].iloc[1] == pd.Timestamp('2024-01-11 08:30')
+
+
+def test_holiday_rows_and_empty_pages():
+    holiday = ('<tr id="eventRowId_491012" class="js-event-item" data-event-datetime="2024/01/15 00:00:00">'
+               '<td class="first left time">All Day</td>'
+               '<td class="left flagCur noWrap"><span class=" ceFlags United_States">&nbsp;</span> USD</td>'
+               '<td class="left textNum sentiment noWrap"><span class="bold">Holiday</span></td>'
+               '<td colspan="6" class="left event">United States - Martin Luther King, Jr. Day</td></tr>')
+    events = parse_events(holiday)
+    assert events.iloc[0].tolist() == ['15/Jan/2024', 'USD', 0, 'United States - Martin Luther King, Jr. Day',
+                                       'NULL', 'NULL', 'NULL']
+
+    for empty in ('', '   ', '<html><body><table></table></body></html>'):
+        assert list(parse_events(empty).columns) == EVENT_COLUMNS
+        assert parse_events(empty).empty
@@ -0,0 +1,85 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stockinsight.data_providers import CsvProvider, PrefetchedProvider, prefetch, split_grouped
+
+
+@pytest.fixture
+def grouped(make_ohlcv):
+    # What yf.download(..., group_by='ticker') returns: B listed later than A, C without any bars
+    a, b = make_ohlcv(60, seed=1), make_ohlcv(40, seed=2)
+    data = pd.concat({'A': a, 'B': b}, axis=1)
+    data[[('C', field) for field in a.columns]] = np.nan
+    return data
+
+
+def test_split_grouped(grouped):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        frames = split_grouped(grouped, ['A', 'B', 'C', 'D'])
+        # Analyzers add indicator columns and overwrite values; neither warns or reaches the bulk frame
+        for frame in frames.values():
+            frame['EMA24'] = frame['Close']
+            frame.iloc[0, frame.columns.get_loc('Close')] = -1.0
+
+    assert list(frames) == ['A', 'B']
+    assert grouped[('A', 'Close')].iloc[0] > 0 and grouped[('B', 'Close')].dropna().iloc[0] > 0
+    assert list(frames['A'].index) == list(grouped.index)
+    # Shorter history: only B's own dates
+    assert len(frames['B']) == 40 and frames['B']['Close'].notna().all()
+    assert list(frames['B'].columns[:-1]) == list(grouped['B'].columns)
+
+
+def test_split_grouped_single_ticker(make_ohlcv):
+    # A single-ticker download comes back without the ticker level
+    frame = make_ohlcv(10)
+    assert split_grouped(frame, ['A'])['A'] is frame
+    assert split_grouped(frame.iloc[:0], ['A']) == {}
+
+
+class CountingCsvProvider(CsvProvider):
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.downloads = []
+
+    def download(self, ticker, start, end):
+        self.downloads.append(ticker)
+        return super().download(ticker, start, end)
+
+
+@pytest.fixture
+def csv_directory(tmp_path, make_ohlcv):
+    for seed, ticker in enumerate(['A', 'B']):
+        make_ohlcv(30, seed=seed, end='2024-06-28').to_csv(tmp_path / f'{ticker}.csv')
+    return tmp_path
+
+
+def test_prefetch_serves_the_batched_frames(csv_directory):
+    provider = CountingCsvProvider(csv_directory)
+    prefetched = prefetch(provider, ['A', 'B'], '2024-06-01', '2024-07-01')
+    assert isinstance(prefetched, PrefetchedProvider) and set(prefetched.frames) == {'A', 'B'}
+
+    provider.downloads.clear()
+    frame = prefetched.download('A', '2024-06-01', '2024-07-01')
+    assert frame is prefetched.frames['A'] and provider.downloads == []
+    expected = CsvProvider(csv_directory).download('A', '2024-06-01', '2024-07-01')
+    pd.testing.assert_frame_equal(frame, expected)
+
+
+def test_prefetch_falls_back_to_per_ticker_downloads(csv_directory, capsys):
+    provider = CountingCsvProvider(csv_directory)
+    # No C.csv: the batched call fails as a whole
+    prefetched = prefetch(provider, ['A', 'B', 'C'], '2024-06-01', '2024-07-01')
+    assert 'falling back to per-ticker requests' in capsys.readouterr().out
+    assert prefetched.frames == {}
+
+    provider.downloads.clear()
+    for ticker in ('A', 'B'):
+        frame = prefetched.download(ticker, '2024-06-01', '2024-07-01')
+        pd.testing.assert_frame_equal(frame, CsvProvider(csv_directory).download(ticker, '2024-06-01', '2024-07-01'))
+    with pytest.raises(FileNotFoundError):
+        prefetched.download('C', '2024-06-01', '2024-07-01')
+    assert provider.downloads == ['A', 'B', 'C']
@@ -0,0 +1,90 @@
+import json
+import os
+import threading
+import warnings
+
+import pandas as pd
+import pytest
+
+from stockinsight.calendar_parser import EVENT_COLUMNS
+from stockinsight.eco_calendar import SERVICE_URL, date_windows, fetch_events_http, fetch_window
+
+# Calendar service answers saved per window start (dateFrom), one per page (limit_from)
+PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'calendar_service.json')
+
+
+class Response:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class ServiceSession:
+    """Stands in for the requests session: answers each POST from the saved pages and records the form."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.posts = []
+        self._lock = threading.Lock()
+
+    def post(self, url, data, timeout):
+        assert url == SERVICE_URL
+        with self._lock:
+            self.posts.append(dict(data))
+        window = self.pages.get(data['dateFrom'], [{'data': '', 'bind_scroll_handler': False}])
+        return Response(window[data['limit_from']])
+
+
+@pytest.fixture
+def session():
+    with open(PAGES) as f:
+        return ServiceSession(json.load(f))
+
+
+def test_date_windows_cover_the_range_once():
+    assert date_windows('01-10-2024', '01-16-2024', 3) == [
+        ('2024-01-10', '2024-01-12'), ('2024-01-13', '2024-01-15'), ('2024-01-16', '2024-01-16')]
+    assert date_windows('01-10-2024', '01-10-2024', 7) == [('2024-01-10', '2024-01-10')]
+    assert date_windows('01-11-2024', '01-10-2024') == []
+    # Across a month end, consecutive and without overlap
+    windows = date_windows('01-25-2024', '02-20-2024', 7)
+    days = [day for start, end in windows for day in pd.date_range(start, end)]
+    assert days == list(pd.date_range('2024-01-25', '2024-02-20'))
+
+
+def test_fetch_window_follows_the_scroll(session):
+    pages = fetch_window(session, '2024-01-10', '2024-01-12')
+    assert [len(page) for page in pages] == [2, 3, 0]
+    assert [post['limit_from'] for post in session.posts] == [0, 1, 2]
+    # Every later page asks from where the previous one stopped
+    assert 'last_time_scope' not in session.posts[0]
+    assert [post['last_time_scope'] for post in session.posts[1:]] == [1704961800, 1705066200]
+    assert all(post['dateFrom'] == '2024-01-10' and post['dateTo'] == '2024-01-12' for post in session.posts)
+
+
+def test_fetch_events_http_joins_windows_in_order(session):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        events = fetch_events_http('01-10-2024', '01-16-2024', window_days=3, max_workers=3, session=session)
+
+    assert events['Date'].tolist() == ['11/Jan/2024'] * 3 + ['12/Jan/2024'] * 2 + ['15/Jan/2024']
+    assert events['Event'].tolist() == ['Retail Sales (MoM)  (Nov)', 'Core CPI (MoM)  (Dec)', 'Initial Jobless Claims',
+                                        'GDP (MoM)  (Nov)', 'ECB President Lagarde Speaks',
+                                        'United States - Martin Luther King, Jr. Day']
+    assert events['Importance'].tolist() == [2, 3, 1, 3, 2, 0] and events['Importance'].dtype == 'int64'
+    assert list(events.index) == list(range(6))
+    assert sorted((post['dateFrom'], post['limit_from']) for post in session.posts) == [
+        ('2024-01-10', 0), ('2024-01-10', 1), ('2024-01-10', 2), ('2024-01-13', 0), ('2024-01-16', 0)]
+
+
+def test_fetch_events_http_without_any_events(session):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        events = fetch_events_http('03-01-2024', '03-20-2024', window_days=7, session=session, date_format=None)
+    assert events.empty and list(events.columns) == EVENT_COLUMNS
+    assert events['Date'].dtype == 'datetime64[ns]' and events['Importance'].dtype == 'int64'
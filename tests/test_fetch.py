@@ -0,0 +1,128 @@
+import threading
+
+import pytest
+import requests
+
+from fixtures import FakeProvider, StubServer
+from stockinsight.fetch import HttpProvider, ResilientProvider, TokenBucket, is_retryable
+
+EXPIRY = '2030-01-18'
+
+
+@pytest.fixture
+def server():
+    servers = []
+
+    def start(**kwargs):
+        servers.append(StubServer(FakeProvider(), seed=0, **kwargs).start())
+        return servers[-1]
+    yield start
+    for stub in servers:
+        stub.stop()
+
+
+def resilient(server, sleeps, **kwargs):
+    return ResilientProvider(HttpProvider(server.url), seed=0, sleep=sleeps.append, **kwargs)
+
+
+def test_retries_recover_from_failed_requests(server):
+    stub = server(fail_first=2)
+    sleeps = []
+    provider = resilient(stub, sleeps, retries=3, backoff=0.5)
+    data = provider.download('AAA', '2024-01-01', '2024-03-01')
+
+    expected = FakeProvider().download('AAA', '2024-01-01', '2024-03-01')
+    assert list(data.index) == list(expected.index)
+    assert (data['Close'].to_numpy() == pytest.approx(expected['Close'].to_numpy()))
+    assert stub.statuses == {503: 2, 200: 1}
+    assert provider.stats['requests'] == 3 and provider.stats['retries'] == 2 and provider.stats['failures'] == 0
+    # Full jitter: each wait is within [0, backoff * 2 ** attempt]
+    assert len(sleeps) == 2 and 0 <= sleeps[0] <= 0.5 and 0 <= sleeps[1] <= 1.0
+    assert provider.stats['backoff_seconds'] == pytest.approx(sum(sleeps))
+
+
+def test_backoff_is_reproducible_with_a_seed(server):
+    waits = []
+    for _ in range(2):
+        sleeps = []
+        resilient(server(fail_first=3), sleeps, retries=3).option_expiries('AAA')
+        waits.append(sleeps)
+    assert waits[0] == waits[1]
+
+
+def test_gives_up_after_the_last_retry(server):
+    stub = server(fail_first=5)
+    sleeps = []
+    provider = resilient(stub, sleeps, retries=2)
+    with pytest.raises(requests.HTTPError) as raised:
+        provider.option_expiries('AAA')
+    assert raised.value.response.status_code == 503
+    assert stub.hits['/expiries/AAA'] == 3
+    assert provider.stats['failures'] == 1 and len(sleeps) == 2
+
+
+def test_retry_after_sets_the_least_wait(server):
+    stub = server(throttle_rate=1.0, retry_after=7)
+    sleeps = []
+    provider = resilient(stub, sleeps, retries=3, backoff=0.01)
+    with pytest.raises(requests.HTTPError) as raised:
+        provider.option_expiries('AAA')
+    assert raised.value.response.status_code == 429
+    assert sleeps == [7.0, 7.0, 7.0]
+
+    # ... but never more than max_backoff
+    sleeps.clear()
+    with pytest.raises(requests.HTTPError):
+        resilient(stub, sleeps, retries=1, max_backoff=2.0).option_expiries('AAA')
+    assert sleeps == [2.0]
+
+
+def test_client_errors_are_not_retried(server):
+    stub = server()
+    sleeps = []
+    provider = resilient(stub, sleeps, retries=3)
+    with pytest.raises(requests.HTTPError) as raised:
+        provider.download('AAA', 'not a date', 'nor this')
+    assert raised.value.response.status_code == 404 and not is_retryable(raised.value)
+    assert provider.stats['requests'] == 1 and sleeps == []
+
+
+def test_identical_requests_in_flight_are_coalesced(server):
+    stub = server(latency=0.3)
+    provider = ResilientProvider(HttpProvider(stub.url))
+    barrier = threading.Barrier(8)
+    chains = [None] * 8
+
+    def fetch(i):
+        barrier.wait()
+        chains[i] = provider.option_chain('AAA', EXPIRY)
+    threads = [threading.Thread(target=fetch, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stub.hits == {f'/options/AAA?expiry={EXPIRY}': 1}
+    assert provider.stats['coalesced'] == 7
+    assert all(chain.calls.equals(chains[0].calls) for chain in chains)
+    # Every caller gets frames of its own to modify
+    assert len({id(chain.calls) for chain in chains}) == 8
+
+
+def test_token_bucket_spaces_requests_after_the_burst():
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+    bucket = TokenBucket(rate=10, burst=3, clock=lambda: now[0], sleep=sleep)
+    waits = [bucket.acquire() for _ in range(6)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3:] == pytest.approx([0.1, 0.1, 0.1])
+    assert now[0] == pytest.approx(0.3)
+
+    # Idle time refills up to the burst, no further
+    now[0] += 10
+    assert [bucket.acquire() for _ in range(4)] == pytest.approx([0.0, 0.0, 0.0, 0.1])
+
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
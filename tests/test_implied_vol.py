@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from stockinsight.implied_vol import VolSurface, implied_volatility
+from stockinsight.option_pricing import black_scholes_batch
+
+
+def price(S, K, T, sigma, option_type, r=0.02):
+    S, K, T, sigma = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float)) for x in (S, K, T, sigma)))
+    option_type = np.broadcast_to(np.asarray(option_type), S.shape)
+    return black_scholes_batch(S, K, T, sigma, option_type, np.full(S.shape, r))['price']
+
+
+def test_round_trip_on_a_random_chain():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    K, T = rng.uniform(40, 200, n), rng.uniform(0.005, 2, n)
+    sigma = rng.uniform(0.05, 1.5, n)
+    option_type = np.where(rng.random(n) < 0.5, 'call', 'put')
+    iv, converged = implied_volatility(price(100.0, K, T, sigma, option_type), 100.0, K, T, option_type)
+    assert converged.mean() > 0.95
+    assert np.abs(iv - sigma)[converged].max() < 1e-4
+    assert np.isnan(iv[~converged]).all()
+
+
+@pytest.mark.parametrize('K, T, sigma', [(62.9, 0.048, 0.387), (154.2, 0.011, 0.541), (70.0, 0.02, 0.3)])
+def test_deep_in_the_money_is_right_or_nan(K, T, sigma):
+    # The price barely moves with sigma here; a wrong sigma must not pass as converged
+    option_type = 'call' if K < 100 else 'put'
+    iv, converged = implied_volatility(price(100.0, K, T, sigma, option_type), 100.0, K, T, option_type)
+    assert (converged and abs(iv[0] - sigma) < 1e-4) or (not converged and np.isnan(iv[0]))
+
+
+def test_prices_outside_the_no_arbitrage_range_are_nan():
+    iv, converged = implied_volatility(np.array([0.0, 150.0, np.nan]), 100.0, 100.0, 0.5, 'call')
+    assert np.isnan(iv).all() and not converged.any()
+
+
+def test_surface_recovers_a_quadratic_smile():
+    K = np.tile(np.linspace(70, 130, 25), 2)
+    T = np.repeat([0.1, 0.5], 25)
+    k = np.log(K / (100 * np.exp(0.02 * T)))
+    iv = np.sqrt(0.04 - 0.02 * k + 0.1 * k ** 2)
+    surface = VolSurface.fit(K, T, iv, 100.0)
+    assert np.allclose(surface(K, T), iv, atol=1e-3)
+
+
+@pytest.mark.parametrize('iv_source', ['yahoo', 'mid', 'smoothed'])
+def test_download_option_times_expiry_in_hours_for_every_iv_source(tmp_path, monkeypatch, iv_source):
+    from fixtures import FakeProvider
+    from stockinsight.monte_carlo import time_to_expiry
+    from stockinsight.option_pricing import itm_probability
+    from stockinsight.stock_analyzer import StockAnalyzer
+
+    monkeypatch.chdir(tmp_path)
+    # A couple of days out, where whole days and hours to the close differ the most
+    expiry = (date.today() + timedelta(days=2)).isoformat()
+    analyzer = StockAnalyzer('AAA', '2024-01-01', expiry=expiry, provider=FakeProvider(), iv_source=iv_source)
+    analyzer.download_data()
+    analyzer.download_option()
+    T = time_to_expiry(expiry)
+    for frame, side in ((analyzer.calls, 'call'), (analyzer.puts, 'put')):
+        expected = itm_probability(analyzer.close_price, frame['strike'].to_numpy(), T,
+                                   frame['impliedVolatility'].to_numpy(), side)
+        np.testing.assert_allclose(frame['InTheMoney_probability'].to_numpy(), expected, rtol=1e-4, atol=1e-6)
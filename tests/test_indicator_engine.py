@@ -0,0 +1,117 @@
+import json
+import warnings
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stockinsight.indicator_engine import INDICATOR_COLUMNS, IndicatorState, IndicatorStore, compute_indicators
+from stockinsight.price_cache import PriceCache
+
+
+def stream(state, stock_data):
+    rows = [state.update(h, l, c, v, d) for d, h, l, c, v in zip(stock_data.index,
+                                                                 stock_data['High'].to_numpy(dtype=float),
+                                                                 stock_data['Low'].to_numpy(dtype=float),
+                                                                 stock_data['Close'].to_numpy(dtype=float),
+                                                                 stock_data['Volume'].to_numpy(dtype=float))]
+    return pd.DataFrame(rows, index=stock_data.index, columns=INDICATOR_COLUMNS)
+
+
+def assert_matches_ta(values, expected):
+    pd.testing.assert_frame_equal(values[INDICATOR_COLUMNS], expected[INDICATOR_COLUMNS],
+                                  check_freq=False, rtol=1e-9, atol=1e-9)
+
+
+def test_streaming_every_bar_matches_ta(make_ohlcv):
+    stock_data = make_ohlcv(400)
+    assert_matches_ta(stream(IndicatorState(), stock_data), compute_indicators(stock_data))
+
+
+def test_streaming_flat_prices_matches_ta(make_ohlcv):
+    # No gains or losses and unchanged typical prices: the RSI and MFI edge cases
+    stock_data = make_ohlcv(60)
+    stock_data[['High', 'Low', 'Close']] = 50.0
+    assert_matches_ta(stream(IndicatorState(), stock_data), compute_indicators(stock_data))
+
+
+@pytest.mark.parametrize('split', [1, 13, 199, 250])
+def test_resume_from_history_matches_ta(make_ohlcv, split):
+    stock_data = make_ohlcv(300, seed=split)
+    state = IndicatorState.from_history(stock_data.iloc[:split])
+    expected = compute_indicators(stock_data)
+    assert_matches_ta(stream(state, stock_data.iloc[split:]), expected.iloc[split:])
+
+
+def test_resume_from_saved_state_matches_ta(make_ohlcv):
+    stock_data = make_ohlcv(300, seed=1)
+    saved = json.loads(json.dumps(IndicatorState.from_history(stock_data.iloc[:220]).to_dict()))
+    state = IndicatorState.from_dict(saved)
+    assert state.last_date == stock_data.index[219]
+    assert_matches_ta(stream(state, stock_data.iloc[220:]), compute_indicators(stock_data).iloc[220:])
+
+
+def test_copy_does_not_advance_the_state(make_ohlcv):
+    stock_data = make_ohlcv(100)
+    state = IndicatorState.from_history(stock_data)
+    before = state.to_dict()
+    state.copy().update(1.0, 1.0, 1.0, 1.0)
+    assert state.to_dict() == before
+
+
+def test_store_resumes_from_saved_state(make_ohlcv, tmp_path, monkeypatch):
+    cache = PriceCache(tmp_path)
+    store = IndicatorStore(cache)
+    stock_data = make_ohlcv(300, seed=2)
+    assert_matches_ta(store.compute('T', stock_data.iloc[:250]), compute_indicators(stock_data.iloc[:250]))
+
+    # The rerun must stream the new bars from the saved state, not recompute with ta
+    import stockinsight.indicator_engine as engine
+    monkeypatch.setattr(engine, 'compute_indicators', lambda *_: pytest.fail('recomputed with ta'))
+    values = store.compute('T', stock_data)
+    assert_matches_ta(values, compute_indicators(stock_data))
+    assert pd.Timestamp(json.load(open(cache.path('T', store.state_file)))['last_date']) == stock_data.index[-1]
+    assert len(cache.load('T', store.history_file)) == len(stock_data)
+
+
+def test_store_fully_cached_rerun(make_ohlcv, tmp_path, monkeypatch):
+    cache = PriceCache(tmp_path)
+    store = IndicatorStore(cache)
+    stock_data = make_ohlcv(260, seed=3)
+    first = store.compute('T', stock_data)
+
+    # Nothing new: no concat warning, no recompute and nothing rewritten
+    import stockinsight.indicator_engine as engine
+    monkeypatch.setattr(engine, 'compute_indicators', lambda *_: pytest.fail('recomputed with ta'))
+    monkeypatch.setattr(cache, 'save', lambda *_: pytest.fail('rewrote an unchanged cache'))
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        again = store.compute('T', stock_data)
+    pd.testing.assert_frame_equal(again, first, check_freq=False)
+
+
+def test_store_does_not_save_the_current_session(make_ohlcv, tmp_path):
+    cache = PriceCache(tmp_path)
+    store = IndicatorStore(cache)
+    stock_data = make_ohlcv(260, seed=4)
+    stock_data.index = stock_data.index[:-1].append(pd.DatetimeIndex([pd.Timestamp(date.today())], name='Date'))
+    values = store.compute('T', stock_data)
+    assert_matches_ta(values, compute_indicators(stock_data))
+    saved = json.load(open(cache.path('T', store.state_file)))
+    assert pd.Timestamp(saved['last_date']) == stock_data.index[-2]
+
+    # The session bar moves on the next download; the store must use the new close
+    stock_data.iloc[-1, stock_data.columns.get_loc('Close')] *= 1.05
+    assert_matches_ta(store.compute('T', stock_data), compute_indicators(stock_data))
+
+
+def test_store_recomputes_when_history_changed(make_ohlcv, tmp_path):
+    store = IndicatorStore(PriceCache(tmp_path))
+    stock_data = make_ohlcv(260, seed=5)
+    store.compute('T', stock_data.iloc[:200])
+    # e.g. a split adjustment rewrote past closes
+    adjusted = stock_data.assign(Close=stock_data['Close'] / 2, High=stock_data['High'] / 2,
+                                 Low=stock_data['Low'] / 2)
+    assert_matches_ta(store.compute('T', adjusted), compute_indicators(adjusted))
+    assert np.isfinite(store.compute('T', adjusted)['SMA200'].iloc[-1])
@@ -0,0 +1,68 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stockinsight.monte_carlo import Leg, simulate, single_legs, vertical_spreads
+from stockinsight.option_pricing import profit_probability
+
+SPOT = 100.0
+T = 30 / 365
+
+
+@pytest.mark.parametrize('option_type', ['call', 'put'])
+def test_single_legs_converge_to_closed_form(option_type):
+    strikes = np.linspace(80, 120, 9)
+    sigma = np.linspace(0.2, 0.5, 9)
+    premium = np.full(9, 1.5)
+    strategies = [[Leg(option_type, k, 1, p)] for k, p in zip(strikes, premium)]
+    result = simulate(SPOT, T, sigma, strategies, n_paths=200_000, seed=7)
+    expected = profit_probability(SPOT, strikes, T, sigma, option_type, premium)
+    assert (np.abs(result['pop'].to_numpy() - expected) <= 4 * result['pop_stderr'].to_numpy() + 1e-12).all()
+
+    # A short leg profits on the other paths
+    short = simulate(SPOT, T, sigma, [[leg._replace(quantity=-1)] for [leg] in strategies], n_paths=200_000, seed=7)
+    assert np.allclose(result['pop'] + short['pop'], 1.0)
+
+
+def test_expected_pnl_of_a_call_matches_black_scholes():
+    # Risk-neutral E[max(S_T - K, 0)] is the Black-Scholes price grown at r
+    from scipy.stats import norm
+    K, sigma, r = 105.0, 0.3, 0.02
+    d1 = (np.log(SPOT / K) + (r + sigma ** 2 / 2) * T) / (sigma * np.sqrt(T))
+    forward_price = SPOT * np.exp(r * T) * norm.cdf(d1) - K * norm.cdf(d1 - sigma * np.sqrt(T))
+    result = simulate(SPOT, T, sigma, [[Leg('call', K, 1, 0.0)]], r=r, n_paths=400_000, seed=3).iloc[0]
+    assert abs(result['expected_pnl'] - forward_price) <= 4 * result['expected_pnl_stderr']
+
+
+def test_same_seed_same_result_across_workers():
+    strategies = [[Leg('call', 100.0, 1, 2.0)], [Leg('put', 95.0, -1, 1.0)]]
+    a = simulate(SPOT, T, 0.3, strategies, n_paths=50_000, memory_cap=2 ** 20)
+    b = simulate(SPOT, T, 0.3, strategies, n_paths=50_000, memory_cap=2 ** 20, workers=2)
+    assert a.equals(b)
+
+
+def test_memory_cap_includes_the_kept_tail():
+    strikes = np.linspace(50, 150, 101)
+    chain = pd.DataFrame({'strike': strikes, 'bid': 1.0, 'ask': 1.2, 'impliedVolatility': 0.3})
+    strategies, sigma = vertical_spreads(chain, 'call')
+    cap = 8 * 2 ** 20
+    tracemalloc.start()
+    simulate(SPOT, T, sigma, strategies, n_paths=200_000, memory_cap=cap)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < 1.1 * cap, peak / cap
+
+
+def test_premium_needs_an_offer():
+    # download_option drops lastPrice: a strike quoted on one side only is bought at the ask
+    chain = pd.DataFrame({'strike': [90.0, 100.0, 110.0, 120.0], 'bid': [10.2, 0.0, 0.0, 1.0],
+                          'ask': [10.6, 0.4, 0.0, 0.0], 'impliedVolatility': 0.3})
+    strategies, _ = single_legs(chain, 'call')
+    premium = [leg.premium for [leg] in strategies]
+    np.testing.assert_allclose(premium[:2], [10.4, 0.4])
+    # Without an offer there is no price, unless the chain still has the last trade
+    assert np.isnan(premium[2:]).all()
+    strategies, _ = single_legs(chain.assign(lastPrice=[10.0, 0.3, 0.05, 1.1]), 'call')
+    np.testing.assert_allclose([leg.premium for [leg] in strategies], [10.4, 0.4, 0.05, 1.1])
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from stockinsight.option_pricing import ItmPricer, black_scholes_batch, itm_probability
+from stockinsight.stock_analyzer import StockAnalyzer
+
+
+def test_known_values():
+    # Hull, Options, Futures and Other Derivatives: examples 15.6 and 19.1-19.5
+    call, put = (black_scholes_batch(42, 40, 0.5, 0.2, side, r=0.1) for side in ('call', 'put'))
+    assert call['price'] == pytest.approx(4.7594, abs=1e-4)
+    assert put['price'] == pytest.approx(0.8086, abs=1e-4)
+
+    greeks = black_scholes_batch(49, 50, 20 / 52, 0.2, 'call', r=0.05)
+    assert greeks['price'] == pytest.approx(2.4005, abs=1e-4)
+    assert greeks['delta'] == pytest.approx(0.5216, abs=1e-4)
+    assert greeks['gamma'] == pytest.approx(0.0655, abs=1e-4)
+    assert greeks['vega'] == pytest.approx(12.105, abs=1e-3)
+    assert greeks['theta'] == pytest.approx(-4.3053, abs=1e-4)
+
+
+def test_greeks_are_derivatives_of_the_price():
+    S, K, T, sigma, r = 100.0, np.array([80.0, 95.0, 100.0, 110.0, 140.0]), 0.4, 0.35, 0.03
+    for side in ('call', 'put'):
+        out = black_scholes_batch(S, K, T, sigma, side, r)
+        price = lambda **kw: black_scholes_batch(kw.get('S', S), K, kw.get('T', T), kw.get('sigma', sigma), side,
+                                                 r)['price']
+        h = 1e-4
+        np.testing.assert_allclose(out['delta'], (price(S=S + h) - price(S=S - h)) / (2 * h), atol=1e-6)
+        np.testing.assert_allclose(out['gamma'], (price(S=S + h) - 2 * out['price'] + price(S=S - h)) / h ** 2,
+                                   atol=1e-4)
+        np.testing.assert_allclose(out['vega'], (price(sigma=sigma + h) - price(sigma=sigma - h)) / (2 * h), rtol=1e-6)
+        # Theta is per year of calendar time passing, i.e. minus the derivative in T
+        np.testing.assert_allclose(out['theta'], -(price(T=T + h) - price(T=T - h)) / (2 * h), rtol=1e-5)
+
+    # Put-call parity
+    calls, puts = black_scholes_batch(S, K, T, sigma, 'call', r), black_scholes_batch(S, K, T, sigma, 'put', r)
+    np.testing.assert_allclose(calls['price'] - puts['price'], S - K * np.exp(-r * T), atol=1e-10)
+
+
+def test_matches_the_row_wise_black_scholes():
+    analyzer = StockAnalyzer.__new__(StockAnalyzer)
+    rng = np.random.default_rng(0)
+    K = rng.uniform(50, 150, 200)
+    sigma = rng.uniform(0.05, 1.5, 200)
+    T = rng.uniform(1 / 365, 2, 200)
+    # Zero volatility and zero time fall back to intrinsic, as in the scalar version
+    sigma[:5] = 0.0
+    T[5:10] = 0.0
+    side = np.where(rng.random(200) < 0.5, 'call', 'put')
+    expected = [analyzer.black_scholes(100.0, k, t, s, o) for k, t, s, o in zip(K, T, sigma, side)]
+
+    np.testing.assert_allclose(black_scholes_batch(100.0, K, T, sigma, side)['itm_probability'], expected,
+                               rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(itm_probability(100.0, K, T, sigma, side), expected, rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(ItmPricer(K, T, sigma, side)(100.0), expected, rtol=1e-10, atol=1e-15)
+
+
+def test_degenerate_strikes_use_intrinsic_values():
+    S, K, r = 100.0, np.array([90.0, 100.0, 110.0]), 0.05
+    for T, sigma in ((0.5, 0.0), (0.0, 0.3), (-0.1, 0.3), (0.5, np.nan)):
+        calls = black_scholes_batch(S, K, T, sigma, 'call', r)
+        puts = black_scholes_batch(S, K, T, sigma, 'put', r)
+        discount = np.exp(-r * max(T, 0))
+
+        # Priced at the (discounted) intrinsic value, never below zero
+        np.testing.assert_allclose(calls['price'], np.maximum(S - K * discount, 0))
+        np.testing.assert_allclose(puts['price'], np.maximum(K * discount - S, 0))
+        # In the money now: 1 or 0, at the money counts as out
+        np.testing.assert_array_equal(calls['itm_probability'], [1.0, 0.0, 0.0])
+        np.testing.assert_array_equal(puts['itm_probability'], [0.0, 0.0, 1.0])
+        np.testing.assert_array_equal(itm_probability(S, K, T, sigma, 'call', r), [1.0, 0.0, 0.0])
+        for out in (calls, puts):
+            assert np.isfinite(np.stack(list(out.values()))).all()
+            np.testing.assert_array_equal(out['gamma'], 0.0)
+            np.testing.assert_array_equal(out['vega'], 0.0)
+        # Delta is 1 (-1 for puts) once the discounted strike is passed, theta the carry of the strike
+        forward_itm = S > K * discount
+        np.testing.assert_array_equal(calls['delta'], np.where(forward_itm, 1.0, 0.0))
+        np.testing.assert_allclose(calls['theta'], np.where(forward_itm, -r * K * discount, 0.0))
+        np.testing.assert_array_equal(puts['delta'], np.where(S < K * discount, -1.0, 0.0))
+
+    # Degenerate rows do not disturb their neighbours
+    mixed = black_scholes_batch(S, K, np.array([0.5, 0.0, 0.5]), 0.3, 'call', r)
+    regular = black_scholes_batch(S, K, 0.5, 0.3, 'call', r)
+    for name in mixed:
+        np.testing.assert_array_equal(mixed[name][[0, 2]], regular[name][[0, 2]])
+
+
+def test_option_types_broadcast_with_the_other_inputs():
+    out = black_scholes_batch(42, 40, 0.5, 0.2, ['call', 'put'], r=0.1)
+    assert out['price'].shape == (2,)
+    np.testing.assert_allclose(out['price'], [4.7594, 0.8086], atol=1e-4)
+    np.testing.assert_allclose(itm_probability(42, 40, 0.5, 0.2, ['CALL', 'Put'], r=0.1), out['itm_probability'])
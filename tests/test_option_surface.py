@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stockinsight.data_providers import CsvProvider
+from stockinsight.monte_carlo import time_to_expiry
+from stockinsight.option_pricing import itm_probability
+from stockinsight.option_surface import (CATEGORICAL_COLUMNS, STORAGE_DTYPES, SURFACE_COLUMNS, fetch_surface,
+                                         load_surface, partition_path, save_surface)
+
+# Recorded chains in the yfinance layout, read back through CsvProvider; BBB's 2030-03-15 puts are missing
+CHAINS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'option_chains')
+SPOTS = {'AAA': 100.0, 'BBB': 42.5}
+
+
+@pytest.fixture(scope='module')
+def provider():
+    return CsvProvider(CHAINS)
+
+
+def recorded(ticker, side, expiry):
+    return pd.read_csv(os.path.join(CHAINS, f'{ticker}_{side}_{expiry}.csv'))
+
+
+def test_fetch_surface_from_recorded_chains(provider):
+    surface = fetch_surface('AAA', provider, SPOTS['AAA'], max_workers=2)
+
+    assert list(surface.columns) == SURFACE_COLUMNS
+    assert all(surface[col].dtype == 'category' for col in CATEGORICAL_COLUMNS)
+    assert list(surface['expiry'].cat.categories) == ['2030-01-18', '2030-02-15']
+    assert surface.attrs['failed_expiries'] == []
+    # The expiry x type x strike grid of the recorded files, row for row
+    for (expiry, option_type), rows in surface.groupby(['expiry', 'type'], observed=True):
+        chain = recorded('AAA', f'{option_type}s', expiry)
+        np.testing.assert_array_equal(rows['strike'].to_numpy(), chain['strike'].to_numpy())
+        np.testing.assert_array_equal(rows['impliedVolatility'].to_numpy(), chain['impliedVolatility'].to_numpy())
+        # Missing volume and open interest are read as zero
+        np.testing.assert_array_equal(rows['volume'].to_numpy(), chain['volume'].fillna(0).to_numpy())
+        np.testing.assert_array_equal(rows['openInterest'].to_numpy(), chain['openInterest'].fillna(0).to_numpy())
+        expected = itm_probability(SPOTS['AAA'], chain['strike'].to_numpy(), time_to_expiry(expiry),
+                                   chain['impliedVolatility'].to_numpy(), option_type)
+        np.testing.assert_allclose(rows['InTheMoney_probability'].to_numpy(), expected, rtol=1e-6)
+    assert len(surface) == 4 * 6
+
+    # An expiry that cannot be read is skipped and reported
+    partial = fetch_surface('BBB', provider, SPOTS['BBB'])
+    assert list(partial['expiry'].unique()) == ['2030-01-18']
+    assert [expiry for expiry, _ in partial.attrs['failed_expiries']] == ['2030-03-15']
+    assert 'FileNotFoundError' in partial.attrs['failed_expiries'][0][1]
+
+
+def test_save_and_load_round_trip(provider, tmp_path):
+    surface = pd.concat([fetch_surface(ticker, provider, spot) for ticker, spot in SPOTS.items()], ignore_index=True)
+    paths = save_surface(surface, root=tmp_path, snapshot='2029-12-31')
+    assert paths == [partition_path(tmp_path, ticker, '2029-12-31') for ticker in ('AAA', 'BBB')]
+    # Written through a temporary file that is renamed into place, so nothing else is left behind
+    for path in paths:
+        assert os.listdir(os.path.dirname(path)) == ['2029-12-31.npz']
+
+    # Each partition stores dictionary codes into its own categories, plus the downcast columns
+    with np.load(paths[1]) as stored:
+        assert list(stored['ticker.categories']) == ['BBB']
+        assert list(stored['expiry.categories']) == ['2030-01-18']
+        assert stored['expiry.codes'].tolist() == [0] * 12
+        assert stored['type.codes'].tolist() == [0] * 6 + [1] * 6
+        assert all(stored[col].dtype == dtype for col, dtype in STORAGE_DTYPES.items())
+
+    loaded = load_surface(tmp_path, snapshot='2029-12-31')
+    assert list(loaded.columns) == SURFACE_COLUMNS
+    assert list(loaded['ticker'].cat.categories) == ['AAA', 'BBB']
+    assert list(loaded['expiry'].cat.categories) == ['2030-01-18', '2030-02-15']
+    assert list(loaded['type'].cat.categories) == ['call', 'put']
+    for col in CATEGORICAL_COLUMNS:
+        assert loaded[col].astype(str).tolist() == surface[col].astype(str).tolist()
+    for col, dtype in STORAGE_DTYPES.items():
+        np.testing.assert_array_equal(loaded[col].to_numpy(), surface[col].to_numpy(dtype=dtype))
+
+    # One ticker, or a snapshot that was never written
+    assert load_surface(tmp_path, tickers=['BBB'], snapshot='2029-12-31')['ticker'].unique().tolist() == ['BBB']
+    assert load_surface(tmp_path, snapshot='2030-01-02').empty
@@ -0,0 +1,135 @@
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fixtures import FakeProvider
+from stockinsight import price_cache
+from stockinsight.price_cache import CachedProvider, PriceCache
+
+
+class RecordingProvider(FakeProvider):
+    """FakeProvider that records the range of every request it serves."""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def download(self, ticker, start, end):
+        self.requests.append((ticker, start, end))
+        return super().download(ticker, start, end)
+
+    def download_many(self, tickers, start, end):
+        self.requests.append((tuple(tickers), start, end))
+        return super().download_many(tickers, start, end)
+
+
+@pytest.fixture
+def today(monkeypatch):
+    # Thursday 2024-02-29, so whether the last stored bar is today does not depend on when the tests run
+    class Today(date):
+        @classmethod
+        def today(cls):
+            return cls(2024, 2, 29)
+
+    monkeypatch.setattr(price_cache, 'date', Today)
+    return Today.today()
+
+
+def test_round_trip(tmp_path, make_ohlcv):
+    cache = PriceCache(tmp_path)
+    frame = make_ohlcv(20, end='2024-02-29')
+    assert cache.load('AAA') is None and cache.tickers() == []
+    cache.save('AAA', frame)
+    pd.testing.assert_frame_equal(cache.load('AAA'), frame, check_freq=False, check_names=False)
+    assert cache.tickers() == ['AAA']
+
+
+def test_fetches_only_the_missing_tail(tmp_path, today):
+    provider, cache = RecordingProvider(), PriceCache(tmp_path)
+    cached = CachedProvider(provider, cache)
+    expected = provider.download('AAA', '2024-01-02', '2024-03-01')
+    provider.requests.clear()
+
+    first = cached.download('AAA', '2024-01-02', '2024-02-15')
+    assert provider.requests == [('AAA', '2024-01-02', '2024-02-15')]
+    pd.testing.assert_frame_equal(first, expected[expected.index < '2024-02-15'], check_freq=False)
+
+    # Later end: only from the last stored bar onwards, which is refetched in case it changed
+    second = cached.download('AAA', '2024-01-02', '2024-02-27')
+    assert provider.requests[1] == ('AAA', '2024-02-14', '2024-02-27')
+    pd.testing.assert_frame_equal(second, expected[expected.index < '2024-02-27'], check_freq=False)
+    assert cache.stats == {'hits': 0, 'partial_hits': 1, 'misses': 1, 'rows_from_cache': 31, 'rows_fetched': 41}
+
+    # Covered by past bars: nothing is fetched
+    third = cached.download('AAA', '2024-01-10', '2024-02-20')
+    assert len(provider.requests) == 2 and cache.stats['hits'] == 1
+    pd.testing.assert_frame_equal(third, expected[(expected.index >= '2024-01-10') & (expected.index < '2024-02-20')],
+                                  check_freq=False)
+
+
+def test_refetches_a_bar_saved_mid_session(tmp_path, today):
+    provider, cache = RecordingProvider(), PriceCache(tmp_path)
+    expected = provider.download('AAA', '2024-01-02', '2024-03-01')
+    provider.requests.clear()
+    # Stored while today's session was still trading: the last close is not final
+    partial = expected.copy()
+    partial.iloc[-1, partial.columns.get_loc('Close')] *= 0.9
+    cache.save('AAA', partial)
+
+    result = CachedProvider(provider, cache).download('AAA', '2024-01-02', '2024-03-01')
+    assert provider.requests == [('AAA', '2024-02-29', '2024-03-01')]
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+    assert cache.load('AAA')['Close'].iloc[-1] == expected['Close'].iloc[-1]
+
+
+def test_refetches_everything_before_the_cache(tmp_path, today):
+    provider, cache = RecordingProvider(), PriceCache(tmp_path)
+    cached = CachedProvider(provider, cache)
+    cached.download('AAA', '2024-02-01', '2024-02-15')
+
+    # An earlier start than anything stored is a miss from start, and replaces the stored bars
+    result = cached.download('AAA', '2024-01-02', '2024-02-15')
+    assert provider.requests[1] == ('AAA', '2024-01-02', '2024-02-15')
+    pd.testing.assert_frame_equal(result, provider.download('AAA', '2024-01-02', '2024-02-15'), check_freq=False)
+    assert cache.stats['misses'] == 2 and cache.stats['rows_from_cache'] == 0
+    assert cache.load('AAA').index[0] == pd.Timestamp('2024-01-02')
+
+
+def test_download_many_groups_the_stale_tickers(tmp_path, today):
+    provider, cache = RecordingProvider(), PriceCache(tmp_path)
+    cached = CachedProvider(provider, cache)
+    cached.download('AAA', '2024-01-02', '2024-02-27')
+    cached.download('BBB', '2024-01-02', '2024-02-13')
+    provider.requests.clear()
+
+    frames = cached.download_many(['AAA', 'BBB', 'CCC'], '2024-01-02', '2024-02-27')
+    # AAA is current; BBB and CCC share one request from the earliest date either needs
+    assert provider.requests == [(('BBB', 'CCC'), '2024-01-02', '2024-02-27')]
+    for ticker, frame in frames.items():
+        pd.testing.assert_frame_equal(frame, provider.download(ticker, '2024-01-02', '2024-02-27'), check_freq=False)
+    assert list(frames) == ['AAA', 'BBB', 'CCC']
+
+
+def test_save_replaces_the_file_atomically(tmp_path, make_ohlcv, monkeypatch):
+    cache = PriceCache(tmp_path)
+    old = make_ohlcv(10, end='2024-02-29')
+    cache.save('AAA', old)
+    cache.save('AAA', make_ohlcv(12, seed=1, end='2024-02-29'))
+    assert os.listdir(tmp_path / 'AAA') == ['prices.npy'] and len(cache.load('AAA')) == 12
+
+    # A write that fails half-way leaves the previous file in place and no temporary behind
+    cache.save('AAA', old)
+
+    def interrupted(f, records):
+        f.write(b'\x93NUMPY')
+        raise OSError('No space left on device')
+
+    monkeypatch.setattr(price_cache.np, 'save', interrupted)
+    with pytest.raises(OSError):
+        cache.save('AAA', make_ohlcv(12, seed=1, end='2024-02-29'))
+    monkeypatch.undo()
+    assert os.listdir(tmp_path / 'AAA') == ['prices.npy']
+    np.testing.assert_array_equal(cache.load('AAA')['Close'].to_numpy(), old['Close'].to_numpy())
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from stockinsight.indicator_engine import FIB_RATIOS, compute_indicators
+from stockinsight.price_cache import PriceCache
+from stockinsight.screener import panel_from_frames, panel_indicators, screen
+
+
+def gapped_frames(make_ohlcv):
+    # A has every bar, B misses one 10 days back and a few early ones, C starts late
+    a = make_ohlcv(400, seed=1)
+    b = make_ohlcv(400, seed=2).drop(index=[a.index[-10], a.index[5], a.index[120], a.index[121]])
+    c = make_ohlcv(400, seed=3).iloc[150:]
+    return {'A': a, 'B': b, 'C': c}
+
+
+def expected_indicators(frame):
+    expected = compute_indicators(frame)
+    recent_max, recent_min = frame['Close'].rolling(30).max(), frame['Close'].rolling(30).min()
+    for ratio in FIB_RATIOS:
+        expected[f'Fib_{ratio}'] = recent_max - (recent_max - recent_min) * ratio
+    return expected
+
+
+def test_panel_indicators_match_ta_with_gaps(make_ohlcv):
+    frames = gapped_frames(make_ohlcv)
+    panel = panel_from_frames(frames)
+    values = panel_indicators(panel)
+    for col, (ticker, frame) in enumerate(frames.items()):
+        rows = panel.dates.get_indexer(frame.index)
+        actual = pd.DataFrame({name: array[rows, col] for name, array in values.items()}, index=frame.index)
+        expected = expected_indicators(frame)
+        pd.testing.assert_frame_equal(actual[expected.columns], expected, check_freq=False, rtol=1e-8, atol=1e-8)
+        # Dates the ticker did not trade carry no values
+        absent = np.setdiff1d(np.arange(len(panel.dates)), rows)
+        assert all(np.isnan(array[absent, col]).all() for array in values.values()), ticker
+
+
+def test_screen_keeps_tickers_with_gaps(make_ohlcv, tmp_path):
+    cache = PriceCache(tmp_path)
+    frames = gapped_frames(make_ohlcv)
+    for ticker, frame in frames.items():
+        cache.save(ticker, frame)
+    result = screen(cache, list(frames), 'SMA200 > 0 and MFI >= 0 and Fib_0_618 > 0')
+    assert list(result.index) == ['A', 'B', 'C']
+    expected = expected_indicators(frames['B']).iloc[-1]
+    assert np.isclose(result.loc['B', 'SMA200'], expected['SMA200'])
+    assert np.isclose(result.loc['B', 'MFI'], expected['MFI'])
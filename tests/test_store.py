@@ -0,0 +1,101 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stockinsight.store import AnalyticsStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    with AnalyticsStore(str(tmp_path / 'analytics.db')) as store:
+        yield store
+
+
+def chain(spot, strikes, iv, expiry='2024-02-16'):
+    strikes = np.asarray(strikes, dtype=float)
+    return pd.DataFrame({
+        'contractSymbol': [f'AAA240216C{int(k * 1000):08d}' for k in strikes],
+        'strike': strikes, 'last_price': spot, 'bid': 1.0, 'ask': 1.2, 'volume': 10.0, 'openInterest': 100.0,
+        'impliedVolatility': iv, 'InTheMoney_probability': 0.5, 'expiry_date': pd.Timestamp(expiry),
+    })
+
+
+def test_appends_replace_rows_with_the_same_key(store, make_ohlcv):
+    prices = make_ohlcv(10, end='2024-01-31')
+    assert store.append_prices('AAA', prices) == 10
+    assert store.append_prices('AAA', prices) == 10
+    assert store.counts()['prices'] == 10
+
+    # Rerunning a day overwrites it rather than adding a second row
+    revised = prices.iloc[-2:].copy()
+    revised['Close'] = [1.0, 2.0]
+    revised['RSI'] = [40.0, np.nan]
+    store.append_prices('AAA', revised)
+    stored = store.prices('AAA')
+    assert len(stored) == 10 and stored['close'].tolist()[-3:] == [prices['Close'].iloc[-3], 1.0, 2.0]
+    assert stored['rsi'].iloc[-2] == 40.0 and stored['rsi'].iloc[:-2].isna().all() and pd.isna(stored['rsi'].iloc[-1])
+    assert stored['date'].iloc[0] == prices.index[0]
+
+    calls = chain(100.0, [95, 100, 105], 0.3)
+    store.append_options('AAA', calls, calls.iloc[:0], as_of='2024-01-10')
+    store.append_options('AAA', calls.assign(impliedVolatility=0.4), None, as_of='2024-01-10')
+    store.append_options('AAA', calls, None, as_of='2024-01-11')
+    options = store.options('AAA')
+    assert len(options) == 6
+    assert options.groupby('date')['implied_volatility'].first().tolist() == [0.4, 0.3]
+    assert (options['expiry'] == pd.Timestamp('2024-02-16')).all() and (options['type'] == 'call').all()
+
+
+def test_events_from_calendar_rows(store):
+    events = pd.DataFrame({'Date': ['10/Jan/2024', '10/Jan/2024'], 'Currency': ['USD', 'EUR'], 'Importance': [3, 2],
+                           'Event': ['CPI', 'ECB Minutes'], 'Actual': ['0.3%', 'NULL'], 'Forecast': ['0.2%', ''],
+                           'Previous': ['0.1%', 'NULL']})
+    assert store.append_events(events) == 2
+    store.append_events(events)
+    stored = store.events(min_importance=2)
+    assert len(stored) == 2 and stored['time'].tolist() == [pd.Timestamp('2024-01-10')] * 2
+    assert stored.set_index('currency')['actual'].to_dict() == {'USD': '0.3%', 'EUR': None}
+    assert store.events(currencies='USD', start='2024-01-10', end='2024-01-11')['event'].tolist() == ['CPI']
+    assert store.events(end='2024-01-10').empty
+
+
+def test_iv_around_events(store):
+    # One chain a day from Jan 3 to Jan 19; near-the-money IV is 0.20 plus a hundredth per day
+    for day in pd.bdate_range('2024-01-03', '2024-01-19'):
+        iv = 0.20 + 0.01 * (day.day - 3)
+        # 120 is 20% away from the spot, outside moneyness, and must not move the average
+        store.append_options('AAA', chain(100.0, [96, 100, 104, 120], [iv - 0.01, iv, iv + 0.01, 0.9]), None,
+                             as_of=day)
+        store.append_options('BBB', chain(50.0, [50], 0.5), None, as_of=day)
+    store.append_events(pd.DataFrame({
+        'Date': pd.to_datetime(['2024-01-11 13:30', '2024-01-11 15:00', '2024-01-16 13:30', '2024-01-30 13:30']),
+        'Currency': ['USD', 'EUR', 'USD', 'USD'], 'Importance': [3, 3, 1, 3],
+        'Event': ['CPI', 'ECB Rate', 'Empire State', 'GDP'],
+        'Actual': None, 'Forecast': None, 'Previous': None}))
+
+    result = store.iv_around_events(tickers='AAA', days=3)
+    # Only the important USD events; GDP has no chains within three days
+    assert result['event'].unique().tolist() == ['CPI']
+    assert result['event_time'].iloc[0] == pd.Timestamp('2024-01-11 13:30')
+    # Calendar days either side: Jan 8 to Jan 14, of which the weekend has no chains
+    assert result['date'].dt.day.tolist() == [8, 9, 10, 11, 12]
+    assert result['days_from_event'].tolist() == [-3, -2, -1, 0, 1]
+    np.testing.assert_allclose(result['implied_volatility'], 0.20 + 0.01 * (result['date'].dt.day - 3))
+    assert (result['strikes'] == 3).all() and (result['ticker'] == 'AAA').all()
+
+    # Every ticker, a wider window and a lower bar on importance
+    wide = store.iv_around_events(days=5, min_importance=1)
+    assert sorted(wide['ticker'].unique()) == ['AAA', 'BBB']
+    assert wide.groupby('event')['date'].agg(lambda d: (d.min().day, d.max().day)).to_dict() == {
+        'CPI': (8, 16), 'Empire State': (11, 19)}
+    assert store.iv_around_events(start='2024-01-12').empty
+
+
+def test_store_pickles_as_its_path(store, make_ohlcv):
+    store.append_prices('AAA', make_ohlcv(5, end='2024-01-31'))
+    copy = pickle.loads(pickle.dumps(store))
+    # A fresh connection onto the same file
+    assert copy.path == store.path and copy.counts()['prices'] == 5
+    copy.close()
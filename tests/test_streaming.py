@@ -0,0 +1,65 @@
+import asyncio
+from datetime import date, datetime
+
+import pandas as pd
+
+from stockinsight.data_providers import DataProvider
+from stockinsight.indicator_engine import INDICATOR_COLUMNS, compute_indicators
+from stockinsight.streaming import Bar, LiveTicker, PollingSource, StreamService
+
+
+class SessionProvider(DataProvider):
+    """Answers every poll with the next of a list of session bars dated today."""
+
+    def __init__(self, bars):
+        self.bars = list(bars)
+
+    def download_many(self, tickers, start, end):
+        bar = self.bars.pop(0) if len(self.bars) > 1 else self.bars[0]
+        frame = pd.DataFrame([bar], index=pd.DatetimeIndex([pd.Timestamp(date.today())], name='Date'),
+                             columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+        return {ticker: frame for ticker in tickers}
+
+
+def polled(source, count):
+    async def collect():
+        events = []
+        async for event in source.ticks():
+            events.append(event)
+            if len(events) == count:
+                return events
+    return asyncio.run(asyncio.wait_for(collect(), 10))
+
+
+def test_polled_bars_become_the_session_bar(make_ohlcv):
+    history = make_ohlcv(260, seed=5)
+    last = float(history['Close'].iloc[-1])
+    bars = [(last, last * 1.03, last * 0.98, last * 1.01, 2_500_000.0),
+            (last, last * 1.03, last * 0.98, last * 1.01, 2_500_000.0),
+            (last, last * 1.04, last * 0.97, last * 0.99, 4_000_000.0)]
+    events = polled(PollingSource(SessionProvider(bars), ['T'], interval=0), 2)
+    # The unchanged second poll yields nothing
+    assert [tuple(event[2:]) for event in events] == [bars[0], bars[2]]
+    assert all(isinstance(event, Bar) for event in events)
+
+    live = LiveTicker('T', history)
+    service = StreamService({'T': live}, source=None)
+    for event, bar in zip(events, (bars[0], bars[2])):
+        assert service.apply(event)
+        snapshot = live.snapshot(options=False)
+        # The session keeps the provider's open, high, low and volume, not ones rebuilt from closes
+        assert tuple(snapshot['bar'].values()) == bar
+        assert snapshot['price'] == bar[3]
+        session = pd.DataFrame([bar], index=pd.DatetimeIndex([pd.Timestamp(date.today())], name='Date'),
+                               columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+        expected = compute_indicators(pd.concat([history, session]))[INDICATOR_COLUMNS].iloc[-1]
+        pd.testing.assert_series_equal(pd.Series(live.values)[INDICATOR_COLUMNS], expected,
+                                       check_names=False, rtol=1e-9, atol=1e-9)
+
+
+def test_set_bar_ignores_bars_of_a_completed_session(make_ohlcv):
+    history = make_ohlcv(100, seed=6)
+    live = LiveTicker('T', history)
+    stale = datetime.combine(history.index[-1].date(), datetime.min.time())
+    assert not live.set_bar(Bar(stale, 'T', 1.0, 1.0, 1.0, 1.0, 0.0))
+    assert live.bar is None